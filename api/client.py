@@ -1,12 +1,105 @@
 # deepseek_chat/api/client.py
 import os
-import requests
-from typing import List, Dict, Any, Optional, Tuple, Union
-import json
-import datetime
+import httpx
+from typing import List, Dict, Any, Callable, Iterator, Optional, Tuple, Union
+import hashlib
+import io
+import re
+import sqlite3
+import time
+import orjson
+
+# Responses are only cached for near-deterministic requests
+CACHE_MAX_TEMPERATURE = 0.2
+
+# Cached responses expire after this long (seconds); at most this many are kept
+CACHE_TTL = 7 * 24 * 3600
+CACHE_MAX_ENTRIES = 5000
+
+
+def default_cache_path() -> str:
+    """Per-user response cache file ($XDG_CACHE_HOME/deepseek_chat, else ~/.cache/deepseek_chat)."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    cache_dir = os.path.join(cache_home, "deepseek_chat")
+    os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+    return os.path.join(cache_dir, "response_cache.sqlite3")
+
+
+# Cheap local prefilters that settle the search decision without a remote call
+_NEEDS_SEARCH_RE = re.compile(r"\b(today|latest|news|stock|weather|202[4-9]|current)\b", re.I)
+_NO_SEARCH_RE = re.compile(r"^\s*(?:(?:hi|hello|thanks|thank you|write|refactor|explain this code)\b|def |class )", re.I)
+
+def prefilter_search_need(user_query: str) -> Optional[bool]:
+    """Return True/False when the query clearly does/doesn't need a web search, None if unsure."""
+    if _NEEDS_SEARCH_RE.search(user_query):
+        return True
+    if _NO_SEARCH_RE.match(user_query):
+        return False
+    return None
+
+# Static system prompts, built once at import. Plain dicts (not MappingProxyType) so they
+# serialize with json; they are never mutated.
+_MEMORY_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": (
+        "Your task is to extract important information from the following conversation "
+        "that would be valuable to remember for future interactions. "
+        "Focus on preferences, interests, facts about the user, and ongoing projects. "
+        "Format your response as a single, concise bullet point (starting with •) "
+        "that captures key information without explanations or meta-commentary. "
+        "Keep it under 200 characters. Example: • User is working on a Python project "
+        "with Deepseek API integration and prefers detailed technical explanations."
+    )
+}
+
+_FILE_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": (
+        "Analyze the following assistant response and identify any file creation directives. "
+        "A file creation directive is indicated by triple backticks followed by a file type and filename, "
+        "and content enclosed within the backticks. Example: ```python:app.py\ndef hello():\n    print('Hello')\n```\n"
+        "For each file found, output a JSON object with 'filename', 'file_type', and 'content' fields. "
+        "Return an array of these objects, or an empty array if no files are found."
+    )
+}
+
+# Tool offered to the model so it can request a web search within the main completion
+WEB_SEARCH_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "web_search",
+        "description": (
+            "Search the web for CURRENT information (news, weather, current events), "
+            "SPECIFIC FACTS you might not know, or RECENT developments and products. "
+            "Only call this when the answer requires it."
+        ),
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Optimized search terms"
+                }
+            },
+            "required": ["query"]
+        }
+    }
+}
+
+# A JSON reply wrapped in a markdown code fence; anchored to the final fence so fenced
+# code inside JSON strings (e.g. generated file contents) is not cut short
+_JSON_BLOCK = re.compile(r"\s*```(?:json)?\s*(.*?)\s*```\s*\Z", re.DOTALL)
+
+def get_message_content(response: Dict[str, Any], default: str = "") -> str:
+    """Return the first choice's message content from a chat completion response."""
+    try:
+        content = response["choices"][0]["message"]["content"]
+    except (KeyError, IndexError, TypeError):
+        return default
+    return content if content is not None else default
 
 class DeepseekClient:
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, cache_path: Optional[str] = None):
         """Initialize Deepseek API client."""
         self.api_key = api_key or os.environ.get("DEEPSEEK_API_KEY")
         if not self.api_key:
@@ -17,148 +110,306 @@ class DeepseekClient:
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
+        
+        # Long-lived HTTP/2 connection pool reused across all API calls
+        self._http = httpx.Client(
+            base_url=self.base_url,
+            headers=self.headers,
+            http2=True,
+            timeout=60.0,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        )
+        
+        # Persistent exact-match response cache shared across Streamlit reruns
+        self.cache_path = cache_path or default_cache_path()
+        self._cache = sqlite3.connect(self.cache_path, check_same_thread=False)
+        self._cache.execute("CREATE TABLE IF NOT EXISTS kv (hash TEXT PRIMARY KEY, resp BLOB, ts INT)")
+        self._cache.execute("CREATE INDEX IF NOT EXISTS kv_ts ON kv (ts)")
+        self._cache.commit()
+    
+    def close(self) -> None:
+        """Close the HTTP connection pool and the response cache."""
+        self._http.close()
+        self._cache.close()
+    
+    def __enter__(self) -> "DeepseekClient":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+    
+    @staticmethod
+    def _cache_key(messages: List[Dict[str, str]],
+                   model: str,
+                   temperature: float,
+                   max_tokens: int,
+                   extra: Optional[Dict[str, Any]] = None) -> str:
+        """Build a stable SHA-256 key for a chat completion request."""
+        key = {"m": model, "t": temperature, "x": max_tokens, "msgs": messages}
+        if extra:
+            key["extra"] = extra
+        return hashlib.sha256(orjson.dumps(key, option=orjson.OPT_SORT_KEYS)).hexdigest()
+    
+    def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached response for the key, if any and not expired."""
+        row = self._cache.execute(
+            "SELECT resp FROM kv WHERE hash = ? AND ts >= ?", (key, int(time.time()) - CACHE_TTL)
+        ).fetchone()
+        if row is None:
+            return None
+        return orjson.loads(row[0])
+    
+    def _cache_put(self, key: str, response: Dict[str, Any]) -> None:
+        """Store a response in the cache, dropping expired and the oldest surplus entries."""
+        now = int(time.time())
+        self._cache.execute(
+            "INSERT OR REPLACE INTO kv (hash, resp, ts) VALUES (?, ?, ?)",
+            (key, orjson.dumps(response), now)
+        )
+        self._cache.execute("DELETE FROM kv WHERE ts < ?", (now - CACHE_TTL,))
+        self._cache.execute(
+            "DELETE FROM kv WHERE hash IN (SELECT hash FROM kv ORDER BY ts DESC, rowid DESC LIMIT -1 OFFSET ?)",
+            (CACHE_MAX_ENTRIES,)
+        )
+        self._cache.commit()
+    
+    def _lookup(self,
+                messages: List[Dict[str, str]],
+                model: str,
+                temperature: float,
+                max_tokens: int,
+                extra: Optional[Dict[str, Any]] = None,
+                cache: bool = True) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """Return (cache_key, cached_response); the key is None when caching is disabled."""
+        if not cache or temperature > CACHE_MAX_TEMPERATURE:
+            return None, None
+        cache_key = self._cache_key(messages, model, temperature, max_tokens, extra)
+        return cache_key, self._cache_get(cache_key)
+    
+    def _handle_response(self, response: httpx.Response, cache_key: Optional[str]) -> Dict[str, Any]:
+        """Validate an API response and store it in the cache if applicable."""
+        if response.status_code != 200:
+            raise Exception(f"API request failed with status {response.status_code}: {response.text}")
+        
+        result = orjson.loads(response.content)
+        if cache_key:
+            self._cache_put(cache_key, result)
+        return result
     
     def chat_completion(self, 
                         messages: List[Dict[str, str]], 
                         model: str = "deepseek-chat", 
                         temperature: float = 0.7,
-                        max_tokens: int = 1000) -> Dict[str, Any]:
-        """Send a chat completion request to Deepseek API."""
-        endpoint = f"{self.base_url}/chat/completions"
+                        max_tokens: int = 1000,
+                        tools: Optional[List[Dict[str, Any]]] = None,
+                        tool_choice: Optional[str] = None,
+                        cache: bool = True) -> Dict[str, Any]:
+        """Send a chat completion request to Deepseek API.
+        
+        Pass cache=False for prompts that change on every call (e.g. ones embedding
+        the current time), which could never produce a cache hit.
+        """
+        extra = {}
+        if tools:
+            extra["tools"] = tools
+        if tool_choice:
+            extra["tool_choice"] = tool_choice
+        
+        cache_key, cached = self._lookup(messages, model, temperature, max_tokens, extra, cache)
+        if cached is not None:
+            return cached
         
         payload = {
             "model": model,
             "messages": messages,
             "temperature": temperature,
-            "max_tokens": max_tokens
+            "max_tokens": max_tokens,
+            **extra
         }
         
-        response = requests.post(endpoint, headers=self.headers, json=payload)
-        
-        if response.status_code != 200:
-            raise Exception(f"API request failed with status {response.status_code}: {response.text}")
-        
-        return response.json()
+        response = self._http.post("/chat/completions", content=orjson.dumps(payload))
+        return self._handle_response(response, cache_key)
     
-    def detect_search_need(self, user_query: str, model: str = "deepseek-chat") -> Tuple[bool, Optional[str]]:
-        """Detect if a search is needed for the given user query."""
-        current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        system_message = {
-            "role": "system", 
-            "content": (
-                f"Current time: {current_time}\n\n"
-                "You are a helpful assistant that determines if a web search is needed to answer user queries accurately. "
-                "Evaluate the query and determine:\n"
-                "1. If it likely requires CURRENT information (e.g., news, weather, current events)\n"
-                "2. If it contains requests for SPECIFIC FACTS you might not know\n"
-                "3. If it asks about RECENT developments or products\n"
-                "Output a JSON object with two fields:\n"
-                "- 'search_needed': true/false\n"
-                "- 'search_query': optimized search terms if search is needed, null otherwise"
-            )
-        }
+    def turn(self,
+             messages: List[Dict[str, Any]],
+             search_client=None,
+             model: str = "deepseek-chat",
+             temperature: float = 0.7,
+             max_tokens: int = 1000,
+             on_search: Optional[Callable[[str], None]] = None,
+             force_search: bool = False,
+             cache: bool = True) -> Tuple[Dict[str, Any], Optional[str], Optional[str]]:
+        """Answer a conversation turn, letting the model request a web search via tool calling.
         
+        Without a search client this is a plain chat_completion. Otherwise the model
+        either answers directly (one call) or asks for a web search, in which case
+        the search runs and the completion is re-issued with the results as tool output.
+        With force_search the model is required to call the search tool. The cache
+        flag is passed through to chat_completion.
         
-        user_message = {
-            "role": "user",
-            "content": f"Query: {user_query}"
-        }
+        Returns:
+            Tuple of (response, search_query, formatted_search_results); the search
+            fields are None when no search was performed.
+        """
+        if search_client is None:
+            return self.chat_completion(messages, model, temperature, max_tokens, cache=cache), None, None
         
         response = self.chat_completion(
-            messages=[system_message, user_message],
+            messages,
             model=model,
-            temperature=0.1
+            temperature=temperature,
+            max_tokens=max_tokens,
+            tools=[WEB_SEARCH_TOOL],
+            tool_choice="required" if force_search else "auto",
+            cache=cache
         )
         
         try:
-            content = response.get("choices", [{}])[0].get("message", {}).get("content", "{}")
-            # Extract JSON from the potentially messy content
-            content = content.strip()
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.endswith("```"):
-                content = content[:-3]
+            assistant_message = response["choices"][0]["message"]
+        except (KeyError, IndexError, TypeError):
+            return response, None, None
+        tool_calls = assistant_message.get("tool_calls") or []
+        if not tool_calls:
+            return response, None, None
+        
+        follow_up = list(messages)
+        follow_up.append(assistant_message)
+        search_queries = []
+        formatted_parts = []
+        for tool_call in tool_calls:
+            try:
+                query = orjson.loads(tool_call["function"]["arguments"]).get("query") or ""
+            except (KeyError, ValueError, AttributeError):
+                query = ""
+            
+            if query:
+                if on_search:
+                    on_search(query)
+                formatted = search_client.format_search_results(search_client.search(query))
+                search_queries.append(query)
+                formatted_parts.append(formatted)
+            else:
+                formatted = "No search query provided."
+            
+            follow_up.append({
+                "role": "tool",
+                "tool_call_id": tool_call.get("id", ""),
+                "content": formatted
+            })
+        
+        response = self.chat_completion(
+            follow_up,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            tools=[WEB_SEARCH_TOOL],
+            tool_choice="none",
+            cache=cache
+        )
+        search_query = "; ".join(search_queries) or None
+        formatted_results = "\n".join(formatted_parts) or None
+        return response, search_query, formatted_results
+    
+    def chat_completion_stream(self,
+                               messages: List[Dict[str, str]],
+                               model: str = "deepseek-chat",
+                               temperature: float = 0.7,
+                               max_tokens: int = 1000,
+                               cache: bool = True) -> Iterator[str]:
+        """Stream a chat completion, yielding content deltas as they arrive (cache as in chat_completion)."""
+        cache_key, cached = self._lookup(messages, model, temperature, max_tokens, cache=cache)
+        if cached is not None:
+            yield get_message_content(cached)
+            return
+        
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True
+        }
+        
+        parts = []
+        with self._http.stream("POST", "/chat/completions", content=orjson.dumps(payload)) as response:
+            if response.status_code != 200:
+                response.read()
+                raise Exception(f"API request failed with status {response.status_code}: {response.text}")
             
-            result = json.loads(content.strip())
-            return result.get("search_needed", False), result.get("search_query")
-        except json.JSONDecodeError:
-            # If we can't parse the JSON, default to not searching
-            return False, None
+            # Server-sent events: one "data: {...}" line per chunk, terminated by "data: [DONE]"
+            for line in response.iter_lines():
+                if not line.startswith("data: "):
+                    continue
+                data = line[6:]
+                if data == "[DONE]":
+                    break
+                choices = orjson.loads(data).get("choices")
+                if not choices:
+                    continue
+                delta = choices[0].get("delta", {}).get("content")
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        
+        if cache_key:
+            self._cache_put(cache_key, {
+                "choices": [{"message": {"role": "assistant", "content": "".join(parts)}}]
+            })
     
     def extract_memory(self, 
                        chat_history: List[Dict[str, str]], 
                        model: str = "deepseek-chat") -> str:
         """Extract a memory summary from chat history using Deepseek API."""
-        # Create a system message specifically for memory extraction
-        system_message = {
-            "role": "system", 
-            "content": (
-                "Your task is to extract important information from the following conversation "
-                "that would be valuable to remember for future interactions. "
-                "Focus on preferences, interests, facts about the user, and ongoing projects. "
-                "Format your response as a single, concise bullet point (starting with •) "
-                "that captures key information without explanations or meta-commentary. "
-                "Keep it under 200 characters. Example: • User is working on a Python project "
-                "with Deepseek API integration and prefers detailed technical explanations."
-            )
-        }
+        # Create a user message containing the chat history, written once into a buffer
+        buf = io.StringIO()
+        buf.write("Here is the conversation to extract memory from:\n\n")
+        separator = ""
+        for msg in chat_history:
+            buf.write(separator)
+            buf.write(msg["role"])
+            buf.write(": ")
+            buf.write(msg["content"])
+            separator = "\n"
         
-        # Create a user message containing the chat history
         user_message = {
             "role": "user",
-            "content": "Here is the conversation to extract memory from:\n\n" + 
-                      "\n".join([f"{msg['role']}: {msg['content']}" for msg in chat_history])
+            "content": buf.getvalue()
         }
         
         # Call the API with these messages
         response = self.chat_completion(
-            messages=[system_message, user_message],
+            messages=[_MEMORY_SYSTEM_MESSAGE, user_message],
             model=model,
             temperature=0.3,  # Lower temperature for more focused extraction
             max_tokens=200
         )
         
         # Extract and return the memory
-        memory_text = response.get("choices", [{}])[0].get("message", {}).get("content", "")
+        memory_text = get_message_content(response)
         return memory_text.strip()
     
     def detect_file_creation(self, response_content: str) -> List[Dict[str, str]]:
         """Parse the response to detect file creation directives."""
-        system_message = {
-            "role": "system", 
-            "content": (
-                "Analyze the following assistant response and identify any file creation directives. "
-                "A file creation directive is indicated by triple backticks followed by a file type and filename, "
-                "and content enclosed within the backticks. Example: ```python:app.py\ndef hello():\n    print('Hello')\n```\n"
-                "For each file found, output a JSON object with 'filename', 'file_type', and 'content' fields. "
-                "Return an array of these objects, or an empty array if no files are found."
-            )
-        }
-        
         user_message = {
             "role": "user",
             "content": f"Assistant response: {response_content}"
         }
         
         response = self.chat_completion(
-            messages=[system_message, user_message],
+            messages=[_FILE_SYSTEM_MESSAGE, user_message],
             model="deepseek-chat",
             temperature=0.1
         )
         
         try:
-            content = response.get("choices", [{}])[0].get("message", {}).get("content", "[]")
+            content = get_message_content(response, "[]")
             # Extract JSON from the potentially messy content
-            content = content.strip()
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.endswith("```"):
-                content = content[:-3]
+            match = _JSON_BLOCK.match(content)
+            body = match.group(1) if match else content.strip()
             
-            result = json.loads(content.strip())
+            result = orjson.loads(body)
             if isinstance(result, list):
                 return result
             return []
-        except json.JSONDecodeError:
+        except (orjson.JSONDecodeError, ValueError):
             return []
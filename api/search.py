@@ -1,9 +1,11 @@
 # deepseek_chat/api/search.py
 import os
-import requests
+import httpx
 import json
 from typing import List, Dict, Any, Optional
 
+SEARCH_ENDPOINT = "https://www.googleapis.com/customsearch/v1"
+
 class GoogleSearchClient:
     def __init__(self, api_key: Optional[str] = None, cse_id: Optional[str] = None):
         """Initialize Google Search API client."""
@@ -14,19 +16,36 @@ class GoogleSearchClient:
             raise ValueError("Google API key not provided. Set GOOGLE_API_KEY environment variable or pass as parameter.")
         if not self.cse_id:
             raise ValueError("Google CSE ID not provided. Set GOOGLE_CSE_ID environment variable or pass as parameter.")
+        
+        # Long-lived HTTP/2 connection pool reused across searches
+        self._http = httpx.Client(
+            http2=True,
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        )
     
-    def search(self, query: str, num_results: int = 5) -> List[Dict[str, str]]:
-        """Perform a Google search with the given query."""
-        endpoint = "https://www.googleapis.com/customsearch/v1"
-        params = {
+    def close(self) -> None:
+        """Close the HTTP connection pool."""
+        self._http.close()
+    
+    def __enter__(self) -> "GoogleSearchClient":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+    
+    def _search_params(self, query: str, num_results: int) -> Dict[str, Any]:
+        """Build the Custom Search API query parameters."""
+        return {
             "key": self.api_key,
             "cx": self.cse_id,
             "q": query,
             "num": min(num_results, 10)  # Google API allows max 10 results per query
         }
-        
-        response = requests.get(endpoint, params=params)
-        
+    
+    @staticmethod
+    def _parse_results(response: httpx.Response) -> List[Dict[str, str]]:
+        """Validate a search response and extract the result items."""
         if response.status_code != 200:
             raise Exception(f"Google search failed with status {response.status_code}: {response.text}")
         
@@ -42,7 +61,12 @@ class GoogleSearchClient:
                 })
         
         return results
-
+    
+    def search(self, query: str, num_results: int = 5) -> List[Dict[str, str]]:
+        """Perform a Google search with the given query."""
+        response = self._http.get(SEARCH_ENDPOINT, params=self._search_params(query, num_results))
+        return self._parse_results(response)
+    
     def format_search_results(self, results: List[Dict[str, str]]) -> str:
         """Format search results for inclusion in conversation."""
         if not results:
@@ -1,11 +1,10 @@
 # deepseek_chat/app.py
 import streamlit as st
-import os
-from typing import List, Dict, Any
 
 # Import our new modules
-from system_api.task_manager import TaskManager, initialize_session_state, process_user_message
+from system_api.task_manager import initialize_session_state, process_user_message
 from ui.components import (
+    load_css,
     render_sidebar, 
     render_chat_interface, 
     render_controls
@@ -20,44 +19,9 @@ st.set_page_config(
 )
 
 # Setup custom CSS
-st.markdown("""
-<style>
-.file-upload-section {
-    padding: 10px;
-    border: 1px solid #ccc;
-    border-radius: 5px;
-    margin-bottom: 20px;
-}
-.file-content {
-    max-height: 300px;
-    overflow-y: auto;
-    padding: 10px;
-    border: 1px solid #eee;
-    border-radius: 5px;
-    background-color: #f9f9f9;
-    margin-top: 10px;
-}
-.memory-section {
-    padding: 10px;
-    border: 1px solid #d0f0c0;
-    border-radius: 5px;
-    background-color: #f0fff0;
-    margin-top: 10px;
-}
-.search-results {
-    padding: 10px;
-    border: 1px solid #b0e0e6;
-    border-radius: 5px;
-    background-color: #f0f8ff;
-    margin-top: 10px;
-}
-</style>
-""", unsafe_allow_html=True)
+st.markdown(load_css(), unsafe_allow_html=True)
 
-# Initialize the task manager
-# task_manager = TaskManager()
-
-# Initialize session state
+# Initialize session state (managers are shared via st.cache_resource)
 initialize_session_state()
 
 # Render the sidebar and get settings
@@ -83,16 +47,16 @@ if prompt:
     )
     
     if success:
-        # Display assistant message
-        with st.chat_message("assistant"):
-            st.write(st.session_state.messages[-1]["content"], unsafe_allow_html=True)
+        # The assistant message is rendered (streamed) by process_user_message
         
         # Play notification sound if enabled
         if settings["enable_notifications"]:
-            from system_api.notifications import send_notification, play_sound
-            send_notification("Deepseek Chat", "New response received")
-            if settings["enable_sounds"]:
-                play_sound("notification")
+            from system_api.notifications import notify_in_background
+            notify_in_background(
+                "Deepseek Chat",
+                "New response received",
+                sound_name="notification" if settings["enable_sounds"] else None
+            )
     
     st.rerun()
 
@@ -0,0 +1,50 @@
+"""
+Deferred imports for optional and heavy dependencies.
+
+Provider backends (langchain_openai, langchain_google_genai,
+google.generativeai) take hundreds of milliseconds to import, and only one
+of them is used per process. ``lazy_import`` returns a module proxy that
+performs the real import on first attribute access.
+"""
+
+import importlib
+import types
+from typing import Any
+
+
+class LazyModule(types.ModuleType):
+    """Module proxy that imports the target module on first attribute access."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._module = None
+
+    def _load(self) -> types.ModuleType:
+        """Import the target module (once) and return it.
+
+        Raises:
+            ImportError: If the module is not installed. Nothing is cached in
+                that case, so a later access retries the import.
+        """
+        if self._module is None:
+            self._module = importlib.import_module(self.__name__)
+        return self._module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Return a proxy for module ``name`` without importing it yet.
+
+    Args:
+        name: Fully qualified module name, e.g. ``"google.generativeai"``
+
+    Returns:
+        A LazyModule that imports ``name`` on first attribute access
+    """
+    return LazyModule(name)
@@ -3,6 +3,8 @@ Configuration management for the personal assistant.
 """
 
 import os
+import sys
+from functools import lru_cache
 from typing import Optional, Dict, Any
 from enum import Enum
 
@@ -17,79 +19,131 @@ class LLMProvider(str, Enum):
 class Config:
     """Configuration manager for the assistant."""
     
+    # Fixed attribute set: no per-instance __dict__, and typos in assignments fail loudly
+    __slots__ = (
+        "llm_provider", "openai_api_key", "deepseek_api_key", "gemini_api_key",
+        "openai_model", "deepseek_model", "gemini_model",
+        "memory_repo_url", "memory_repo_token", "memory_repo_path",
+        "google_api_key", "google_cse_id", "github_token", "feishu_webhook_url",
+        "temperature", "max_tokens", "agent_verbose",
+        "embedding_provider", "openai_embedding_model",
+        "llm_api_key", "model_name",
+        "_needs_repo_token", "_missing_feishu", "_validation",
+    )
+    
     def __init__(self):
+        # Read the process environment once; every setting below is a local dict lookup
+        env = dict(os.environ)
+        
         # LLM Configuration
-        self.llm_provider = os.environ.get("LLM_PROVIDER", LLMProvider.DEEPSEEK.value)
-        self.openai_api_key = os.environ.get("OPENAI_API_KEY")
-        self.deepseek_api_key = os.environ.get("DEEPSEEK_API_KEY")
-        self.gemini_api_key = os.environ.get("GEMINI_API_KEY")
+        provider = env.get("LLM_PROVIDER", LLMProvider.DEEPSEEK.value)
+        try:
+            self.llm_provider = LLMProvider(provider.lower())
+        except ValueError:
+            raise ValueError(
+                f"Unsupported LLM_PROVIDER: {provider!r}. "
+                f"Expected one of: {', '.join(p.value for p in LLMProvider)}"
+            ) from None
+        self.openai_api_key = env.get("OPENAI_API_KEY")
+        self.deepseek_api_key = env.get("DEEPSEEK_API_KEY")
+        self.gemini_api_key = env.get("GEMINI_API_KEY")
         
-        # Model selection
-        self.openai_model = os.environ.get("OPENAI_MODEL", "gpt-4o-mini")
-        self.deepseek_model = os.environ.get("DEEPSEEK_MODEL", "deepseek-chat")
-        self.gemini_model = os.environ.get("GEMINI_MODEL", "gemini-2.5-flash")
+        # Model selection (interned: compared and used as keys throughout)
+        self.openai_model = sys.intern(env.get("OPENAI_MODEL", "gpt-4o-mini"))
+        self.deepseek_model = sys.intern(env.get("DEEPSEEK_MODEL", "deepseek-chat"))
+        self.gemini_model = sys.intern(env.get("GEMINI_MODEL", "gemini-2.5-flash"))
         
         # Memory Repository Configuration
-        self.memory_repo_url = os.environ.get("MEMORY_REPO_URL")
-        self.memory_repo_token = os.environ.get("MEMORY_REPO_TOKEN")  # For private repos
-        self.memory_repo_path = os.environ.get("MEMORY_REPO_PATH", "./memory_repo")
+        self.memory_repo_url = env.get("MEMORY_REPO_URL")
+        self.memory_repo_token = env.get("MEMORY_REPO_TOKEN")  # For private repos
+        self.memory_repo_path = env.get("MEMORY_REPO_PATH", "./memory_repo")
         
         # Google Search Configuration
-        self.google_api_key = os.environ.get("GOOGLE_API_KEY")
-        self.google_cse_id = os.environ.get("GOOGLE_CSE_ID")
+        self.google_api_key = env.get("GOOGLE_API_KEY")
+        self.google_cse_id = env.get("GOOGLE_CSE_ID")
         
         # GitHub Configuration
-        self.github_token = os.environ.get("GH_TOKEN") or os.environ.get("GITHUB_TOKEN")
+        self.github_token = env.get("GH_TOKEN") or env.get("GITHUB_TOKEN")
         
         # Feishu Configuration
-        self.feishu_webhook_url = os.environ.get("FEISHU_WEBHOOK_URL")
+        self.feishu_webhook_url = env.get("FEISHU_WEBHOOK_URL")
         
         # Assistant Configuration
-        self.temperature = float(os.environ.get("TEMPERATURE", "0.1"))
-        self.max_tokens = int(os.environ.get("MAX_TOKENS", "10000"))
+        self.temperature = float(env.get("TEMPERATURE", "0.1"))
+        self.max_tokens = int(env.get("MAX_TOKENS", "10000"))
+        self.agent_verbose = env.get("AGENT_VERBOSE", "false").lower() in ("1", "true", "yes")  # Log agent steps at DEBUG
         
         # Embedding Configuration
-        self.embedding_provider = os.environ.get("EMBEDDING_PROVIDER", "simple")  # auto, openai, gemini, simple
-        self.openai_embedding_model = os.environ.get("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+        self.embedding_provider = sys.intern(env.get("EMBEDDING_PROVIDER", "simple"))  # auto, openai, gemini, simple
+        self.openai_embedding_model = env.get("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+        
+        # Resolve the active provider's key and model once
+        self.llm_api_key = {
+            LLMProvider.OPENAI: self.openai_api_key,
+            LLMProvider.DEEPSEEK: self.deepseek_api_key,
+            LLMProvider.GEMINI: self.gemini_api_key,
+        }.get(self.llm_provider)
+        self.model_name = {
+            LLMProvider.OPENAI: self.openai_model,
+            LLMProvider.DEEPSEEK: self.deepseek_model,
+            LLMProvider.GEMINI: self.gemini_model,
+        }.get(self.llm_provider, self.deepseek_model)
         
+        # Inputs and result of validate(), computed on first call
+        self._set_validation_flags()
+        self._validation: Optional[Dict[str, Any]] = None
+    
     def get_llm_api_key(self) -> Optional[str]:
         """Get the API key for the configured LLM provider."""
-        if self.llm_provider == LLMProvider.OPENAI.value:
-            return self.openai_api_key
-        elif self.llm_provider == LLMProvider.DEEPSEEK.value:
-            return self.deepseek_api_key
-        elif self.llm_provider == LLMProvider.GEMINI.value:
-            return self.gemini_api_key
-        return None
+        return self.llm_api_key
     
     def get_model_name(self) -> str:
         """Get the model name for the configured LLM provider."""
-        if self.llm_provider == LLMProvider.OPENAI.value:
-            return self.openai_model
-        elif self.llm_provider == LLMProvider.DEEPSEEK.value:
-            return self.deepseek_model
-        elif self.llm_provider == LLMProvider.GEMINI.value:
-            return self.gemini_model
-        return self.deepseek_model
+        return self.model_name
     
     def validate(self) -> Dict[str, Any]:
-        """Validate configuration and return missing required fields."""
-        missing = []
-        
-        # Check LLM API key
-        if not self.get_llm_api_key():
-            missing.append(f"{self.llm_provider.upper()}_API_KEY")
-        
-        # Check memory repo if configured
-        if self.memory_repo_url and not self.memory_repo_token:
-            missing.append("MEMORY_REPO_TOKEN (required for private repos)")
+        """Validate configuration and return missing required fields.
         
-        # Check Feishu webhook
-        if not self.feishu_webhook_url:
-            missing.append("FEISHU_WEBHOOK_URL")
+        The result is computed once per instance; call invalidate_validation()
+        after changing settings on an existing Config.
+        """
+        if self._validation is None:
+            self._validation = self._validate()
+        return self._validation
+    
+    def invalidate_validation(self) -> None:
+        """Drop the cached validate() result and re-read the settings it checks."""
+        self._set_validation_flags()
+        self._validation = None
+    
+    def _set_validation_flags(self) -> None:
+        """Precompute the optional-setting checks used by validate()."""
+        self._needs_repo_token = bool(self.memory_repo_url) and not self.memory_repo_token
+        self._missing_feishu = not self.feishu_webhook_url
+    
+    def _validate(self) -> Dict[str, Any]:
+        """Check required settings."""
+        checks = (
+            # LLM API key
+            (not self.llm_api_key, f"{self.llm_provider.value.upper()}_API_KEY"),
+            # Memory repo token, if a repo is configured
+            (self._needs_repo_token, "MEMORY_REPO_TOKEN (required for private repos)"),
+            # Feishu webhook
+            (self._missing_feishu, "FEISHU_WEBHOOK_URL"),
+        )
+        missing = tuple(field for failed, field in checks if failed)
         
         return {
-            "valid": len(missing) == 0,
-            "missing": missing
+            "valid": not missing,
+            "missing": list(missing)
         }
 
+
+@lru_cache(maxsize=1)
+def get_config() -> Config:
+    """Get the process-wide configuration.
+    
+    The environment is parsed once on first use. Call ``get_config.cache_clear()``
+    after changing environment variables to force a reload.
+    """
+    return Config()
@@ -6,168 +6,244 @@ Supports OpenAI, Deepseek, and Gemini providers.
 
 import os
 import logging
-from typing import Optional, Any, List, Dict
+from functools import lru_cache
+from typing import Optional, Any, List, Dict, Iterator, AsyncIterator
 from langchain_core.language_models import BaseChatModel
-from langchain_openai import ChatOpenAI
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, AIMessage
 
+from assistant.core._lazy import lazy_import
 from assistant.core.config import Config, LLMProvider
 
 logger = logging.getLogger(__name__)
 
+# Provider backends are imported on first use; only one of them is needed per process
+langchain_openai = lazy_import("langchain_openai")
+langchain_google_genai = lazy_import("langchain_google_genai")
+genai = lazy_import("google.generativeai")
+
 # Google Gemini support - optional due to version compatibility
 # Using lazy import to avoid metaclass conflicts with incompatible versions
 ChatGoogleGenerativeAI = None
 
+# Which Gemini backend this process uses: "langchain", "direct" (google-generativeai
+# fallback after a metaclass conflict) or "failed". None until first resolved.
+_GEMINI_BACKEND: Optional[str] = None
+_GEMINI_ERROR: Optional[str] = None
 
-class LLMProviderManager:
-    """Manages LLM provider initialization and usage."""
+
+def __getattr__(name: str) -> Any:
+    """Resolve heavy provider classes on first access (PEP 562)."""
+    if name == "ChatOpenAI":
+        return langchain_openai.ChatOpenAI
+    if name == "GeminiChatWrapper":
+        return _get_gemini_wrapper_cls()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _resolve_gemini_backend() -> str:
+    """Import langchain-google-genai once and remember which Gemini backend to use."""
+    global ChatGoogleGenerativeAI, _GEMINI_BACKEND, _GEMINI_ERROR
+    if _GEMINI_BACKEND is None:
+        try:
+            chat_cls = langchain_google_genai.ChatGoogleGenerativeAI
+        except (ImportError, TypeError) as e:
+            _GEMINI_ERROR = str(e)
+            _GEMINI_BACKEND = "direct" if "metaclass" in _GEMINI_ERROR.lower() else "failed"
+        else:
+            ChatGoogleGenerativeAI = chat_cls
+            _GEMINI_BACKEND = "langchain"
+    return _GEMINI_BACKEND
+
+
+def _load_genai() -> Any:
+    """Import google-generativeai on first Gemini use.
     
-    def __init__(self, config: Config):
-        self.config = config
-        self.llm: Optional[BaseChatModel] = None
-        self._initialize_llm()
+    The package loads protobuf descriptors at import time, so it is never
+    imported unless the Gemini fallback is selected.
+    """
+    try:
+        return genai._load()
+    except ImportError:
+        raise ImportError(
+            "google-generativeai is not installed. "
+            "Install with: pip install google-generativeai"
+        )
+
+
+@lru_cache(maxsize=None)
+def _get_gemini_wrapper_cls() -> type:
+    """Define the direct google-generativeai chat wrapper on first use.
     
-    def _initialize_llm(self) -> None:
-        """Initialize the LLM based on configuration."""
-        provider = self.config.llm_provider
-        api_key = self.config.get_llm_api_key()
-        model_name = self.config.get_model_name()
+    Subclassing BaseChatModel builds a pydantic schema, so the class is
+    created at most once per process. Raises ImportError if
+    google-generativeai is not installed.
+    """
+    _load_genai()
+    from langchain_core.outputs import ChatGeneration, ChatResult
+    
+    class GeminiChatWrapper(BaseChatModel):
+        """Wrapper for Google Generative AI to work with LangChain."""
         
-        if not api_key:
-            raise ValueError(f"API key not found for provider: {provider}")
+        model_name: str
+        temperature: float
+        max_tokens: int
         
-        if provider == LLMProvider.OPENAI.value:
-            self.llm = ChatOpenAI(
-                api_key=api_key,
-                model=model_name,
-                temperature=self.config.temperature,
-                max_tokens=self.config.max_tokens
+        def __init__(self, model_name: str, temperature: float, max_tokens: int):
+            super().__init__(
+                model_name=model_name,
+                temperature=temperature,
+                max_tokens=max_tokens
             )
+            self._model = genai.GenerativeModel(model_name)
         
-        elif provider == LLMProvider.DEEPSEEK.value:
-            # Deepseek uses OpenAI-compatible API
-            self.llm = ChatOpenAI(
-                api_key=api_key,
-                model=model_name,
-                base_url="https://api.deepseek.com/v1",
-                temperature=self.config.temperature,
-                max_tokens=self.config.max_tokens
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            # Convert LangChain messages to Gemini format
+            prompt_parts = []
+            for msg in messages:
+                if isinstance(msg, SystemMessage):
+                    prompt_parts.append(f"System: {msg.content}")
+                elif isinstance(msg, HumanMessage):
+                    prompt_parts.append(msg.content)
+                elif isinstance(msg, AIMessage):
+                    prompt_parts.append(f"Assistant: {msg.content}")
+            
+            full_prompt = "\n".join(prompt_parts)
+            
+            # Generate response
+            response = self._model.generate_content(
+                full_prompt,
+                generation_config=genai.types.GenerationConfig(
+                    temperature=self.temperature,
+                    max_output_tokens=self.max_tokens
+                )
             )
-        
-        elif provider == LLMProvider.GEMINI.value:
-            # Try to use langchain-google-genai, but fallback to direct API if there's a conflict
-            global ChatGoogleGenerativeAI
-            if ChatGoogleGenerativeAI is None:
-                try:
-                    from langchain_google_genai import ChatGoogleGenerativeAI
-                except (ImportError, TypeError) as e:
-                    error_msg = str(e)
-                    if "metaclass conflict" in error_msg.lower() or "metaclass" in error_msg.lower():
-                        # Use direct Google Generative AI library as fallback
-                        logger.warning(
-                            f"langchain-google-genai has compatibility issues. "
-                            f"Using direct Google Generative AI API instead."
-                        )
-                        try:
-                            # Try to import google-generativeai (optional dependency)
-                            try:
-                                import google.generativeai as genai
-                            except ImportError:
-                                raise ImportError(
-                                    "google-generativeai is not installed. "
-                                    "Install with: pip install google-generativeai"
-                                )
-                            genai.configure(api_key=api_key)
-                            # Create a wrapper class for LangChain compatibility
-                            from langchain_core.language_models import BaseChatModel
-                            from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, AIMessage
-                            from langchain_core.outputs import ChatGeneration, ChatResult
-                            
-                            class GeminiChatWrapper(BaseChatModel):
-                                """Wrapper for Google Generative AI to work with LangChain."""
-                                
-                                model_name: str
-                                temperature: float
-                                max_tokens: int
-                                
-                                def __init__(self, model_name: str, temperature: float, max_tokens: int):
-                                    super().__init__(
-                                        model_name=model_name,
-                                        temperature=temperature,
-                                        max_tokens=max_tokens
-                                    )
-                                    self._model = genai.GenerativeModel(model_name)
-                                
-                                def _generate(self, messages, stop=None, run_manager=None, **kwargs):
-                                    # Convert LangChain messages to Gemini format
-                                    prompt_parts = []
-                                    for msg in messages:
-                                        if isinstance(msg, SystemMessage):
-                                            prompt_parts.append(f"System: {msg.content}")
-                                        elif isinstance(msg, HumanMessage):
-                                            prompt_parts.append(msg.content)
-                                        elif isinstance(msg, AIMessage):
-                                            prompt_parts.append(f"Assistant: {msg.content}")
-                                    
-                                    full_prompt = "\n".join(prompt_parts)
-                                    
-                                    # Generate response
-                                    response = self._model.generate_content(
-                                        full_prompt,
-                                        generation_config=genai.types.GenerationConfig(
-                                            temperature=self.temperature,
-                                            max_output_tokens=self.max_tokens
-                                        )
-                                    )
-                                    
-                                    # Convert to LangChain format
-                                    message = AIMessage(content=response.text)
-                                    generation = ChatGeneration(message=message)
-                                    return ChatResult(generations=[generation])
-                                
-                                @property
-                                def _llm_type(self) -> str:
-                                    return "gemini"
-                            
-                            self.llm = GeminiChatWrapper(model_name, self.config.temperature, self.config.max_tokens)
-                            logger.info(f"Using direct Google Generative AI API (model: {model_name})")
-                            return
-                        except ImportError:
-                            raise ValueError(
-                                f"Gemini provider requires either langchain-google-genai or google-generativeai. "
-                                f"Install with: pip install google-generativeai. "
-                                f"Original error: {error_msg}"
-                            )
-                        except Exception as fallback_error:
-                            raise ValueError(
-                                f"Failed to initialize Gemini with both langchain-google-genai and direct API. "
-                                f"Please use 'openai' or 'deepseek' as your LLM_PROVIDER instead. "
-                                f"Errors: {error_msg}, {fallback_error}"
-                            )
-                    else:
-                        raise ValueError(
-                            f"Gemini provider requires langchain-google-genai. "
-                            f"Install with: pip install langchain-google-genai>=3.0.0. "
-                            f"Error: {error_msg}"
-                        )
             
-            # Use langchain-google-genai if available
+            # Convert to LangChain format
+            message = AIMessage(content=response.text)
+            generation = ChatGeneration(message=message)
+            return ChatResult(generations=[generation])
+        
+        @property
+        def _llm_type(self) -> str:
+            return "gemini"
+    
+    return GeminiChatWrapper
+
+
+@lru_cache(maxsize=8)
+def _build_llm(
+    provider: LLMProvider,
+    model_name: str,
+    api_key: str,
+    temperature: float,
+    max_tokens: int
+) -> BaseChatModel:
+    """Create the chat model for a provider configuration.
+    
+    Instances are shared between managers with identical settings, so their
+    HTTP clients and connection pools are reused. Failures are not cached.
+    """
+    if provider is LLMProvider.OPENAI:
+        return langchain_openai.ChatOpenAI(
+            api_key=api_key,
+            model=model_name,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+    
+    elif provider is LLMProvider.DEEPSEEK:
+        # Deepseek uses OpenAI-compatible API
+        return langchain_openai.ChatOpenAI(
+            api_key=api_key,
+            model=model_name,
+            base_url="https://api.deepseek.com/v1",
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+    
+    elif provider is LLMProvider.GEMINI:
+        # Try to use langchain-google-genai, but fallback to direct API if there's a conflict
+        backend = _resolve_gemini_backend()
+        if backend == "direct":
+            # Use direct Google Generative AI library as fallback
+            logger.warning(
+                "langchain-google-genai has compatibility issues. "
+                "Using direct Google Generative AI API instead."
+            )
             try:
-                self.llm = ChatGoogleGenerativeAI(
-                    google_api_key=api_key,
-                    model=model_name,
-                    temperature=self.config.temperature,
-                    max_output_tokens=self.config.max_tokens
+                # Import google-generativeai (optional dependency) only on this path
+                _load_genai()
+                genai.configure(api_key=api_key)
+                # Wrapper class for LangChain compatibility (built once per process)
+                GeminiChatWrapper = _get_gemini_wrapper_cls()
+                
+                llm = GeminiChatWrapper(model_name, temperature, max_tokens)
+                logger.info("Using direct Google Generative AI API (model: %s)", model_name)
+                return llm
+            except ImportError:
+                raise ValueError(
+                    f"Gemini provider requires either langchain-google-genai or google-generativeai. "
+                    f"Install with: pip install google-generativeai. "
+                    f"Original error: {_GEMINI_ERROR}"
                 )
-            except Exception as e:
+            except Exception as fallback_error:
                 raise ValueError(
-                    f"Failed to initialize Gemini LLM. This may be due to version incompatibility. "
+                    f"Failed to initialize Gemini with both langchain-google-genai and direct API. "
                     f"Please use 'openai' or 'deepseek' as your LLM_PROVIDER instead. "
-                    f"Error: {e}"
+                    f"Errors: {_GEMINI_ERROR}, {fallback_error}"
                 )
+        elif backend == "failed":
+            raise ValueError(
+                f"Gemini provider requires langchain-google-genai. "
+                f"Install with: pip install langchain-google-genai>=3.0.0. "
+                f"Error: {_GEMINI_ERROR}"
+            )
         
-        else:
-            raise ValueError(f"Unsupported LLM provider: {provider}")
+        # Use langchain-google-genai if available
+        try:
+            return ChatGoogleGenerativeAI(
+                google_api_key=api_key,
+                model=model_name,
+                temperature=temperature,
+                max_output_tokens=max_tokens
+            )
+        except Exception as e:
+            raise ValueError(
+                f"Failed to initialize Gemini LLM. This may be due to version incompatibility. "
+                f"Please use 'openai' or 'deepseek' as your LLM_PROVIDER instead. "
+                f"Error: {e}"
+            )
+    
+    else:
+        raise ValueError(f"Unsupported LLM provider: {provider}")
+
+
+class LLMProviderManager:
+    """Manages LLM provider initialization and usage."""
+    
+    # Chat roles mapped to their LangChain message classes
+    _ROLE_MAP = {
+        "system": SystemMessage,
+        "assistant": AIMessage,
+        "user": HumanMessage,
+    }
+    
+    def __init__(self, config: Config):
+        self.config = config
+        self.llm: Optional[BaseChatModel] = None
+        self._initialize_llm()
+    
+    def _initialize_llm(self) -> None:
+        """Initialize the LLM based on configuration."""
+        cfg = self.config
+        provider = cfg.llm_provider
+        api_key = cfg.llm_api_key
+        model_name = cfg.model_name
+        
+        if not api_key:
+            raise ValueError(f"API key not found for provider: {provider.value}")
+        
+        self.llm = _build_llm(provider, model_name, api_key, cfg.temperature, cfg.max_tokens)
     
     def get_llm(self) -> BaseChatModel:
         """Get the initialized LLM instance."""
@@ -180,21 +256,40 @@ class LLMProviderManager:
         if self.llm is None:
             raise RuntimeError("LLM not initialized")
         
-        # Convert messages to LangChain format
-        from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
-        
-        langchain_messages = []
-        for msg in messages:
-            role = msg.get("role", "user")
-            content = msg.get("content", "")
-            
-            if role == "system":
-                langchain_messages.append(SystemMessage(content=content))
-            elif role == "assistant":
-                langchain_messages.append(AIMessage(content=content))
-            else:
-                langchain_messages.append(HumanMessage(content=content))
+        response = self.llm.invoke(self._to_langchain_messages(messages))
+        return response.content
+    
+    async def ainvoke(self, messages: List[Dict[str, str]]) -> str:
+        """Invoke the LLM with messages without blocking the event loop."""
+        if self.llm is None:
+            raise RuntimeError("LLM not initialized")
         
-        response = self.llm.invoke(langchain_messages)
+        response = await self.llm.ainvoke(self._to_langchain_messages(messages))
         return response.content
+    
+    def stream(self, messages: List[Dict[str, str]]) -> Iterator[str]:
+        """Stream the LLM's reply to messages as text chunks."""
+        if self.llm is None:
+            raise RuntimeError("LLM not initialized")
+        
+        for chunk in self.llm.stream(self._to_langchain_messages(messages)):
+            if isinstance(chunk.content, str) and chunk.content:
+                yield chunk.content
+    
+    async def astream(self, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        """Stream the LLM's reply to messages as text chunks."""
+        if self.llm is None:
+            raise RuntimeError("LLM not initialized")
+        
+        async for chunk in self.llm.astream(self._to_langchain_messages(messages)):
+            if isinstance(chunk.content, str) and chunk.content:
+                yield chunk.content
+    
+    def _to_langchain_messages(self, messages: List[Dict[str, str]]) -> List[BaseMessage]:
+        """Convert messages to LangChain format (unknown roles are sent as user messages)."""
+        role_map = self._ROLE_MAP
+        return [
+            role_map.get(msg.get("role"), HumanMessage)(content=msg.get("content", ""))
+            for msg in messages
+        ]
 
@@ -4,36 +4,186 @@ Main Orchestrator
 Coordinates all components using LangChain agents.
 """
 
+import re
+import time
+import queue
+import asyncio
+import atexit
+import string
 import logging
-from typing import Dict, Any, Optional, List
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple, AsyncIterator
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
-# Import agent creation for LangChain 1.0+
-# LangChain 1.0 uses create_agent from langchain.agents (replaces AgentExecutor and create_openai_tools_agent)
-try:
-    from langchain.agents import create_agent
-    logger.debug("Successfully imported create_agent from langchain.agents")
-except ImportError as e:
-    logger.warning(f"Failed to import create_agent from langchain.agents: {e}")
-    logger.warning("Agent functionality will be disabled. Tools will be called manually.")
-    create_agent = None
+# Words in deletion descriptions ("any memory asserting the latest version ...") that say
+# nothing about which memory is meant
+DELETE_STOP_WORDS = frozenset({"any", "memory", "asserting", "specific", "version", "latest", "stable"})
+# Words, keeping dotted tokens such as version numbers ("1.13.1") intact
+_WORD_RE = re.compile(r"\w+(?:\.\w+)*")
 
-from langchain_core.messages import HumanMessage
+
+def _key_terms(text: str) -> frozenset:
+    """Lowercased words longer than three characters."""
+    return frozenset(w for w in _WORD_RE.findall(text.lower()) if len(w) > 3)
+
+
+def _memory_key_terms(memory: Dict[str, Any]) -> frozenset:
+    """Key terms of a memory's content and source, as matched by deletion descriptions."""
+    return _key_terms(f"{memory.get('content', '')} {memory.get('source', '')}")
+
+
+# Questions that explicitly ask to remember or forget something; these always run
+# memory analysis instead of reusing a cached answer
+_MEMORY_REQUEST_RE = re.compile(r"\b(?:remember|forget|memori[sz]e|note that|from now on)\b", re.I)
+
+
+def _matches_description(key_terms: frozenset, memory_terms: frozenset) -> bool:
+    """
+    Whether a memory matches a deletion description.
+    
+    At least half of the description's key terms must appear as whole terms of the
+    memory (so "python" does not match "pythonic").
+    """
+    return len(key_terms & memory_terms) >= len(key_terms) * 0.5
+
+
+# Long memories are indexed as overlapping token windows. The windows stay below the
+# memory store's 1000-character splitter, so each window is embedded as one chunk.
+MEMORY_CHUNK_TOKENS = 200
+MEMORY_CHUNK_OVERLAP = 25
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """Load the tiktoken encoding, or None if tiktoken or its data is unavailable."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"tiktoken unavailable, chunking memories by words instead: {e}")
+        return None
+
+
+def _split_into_token_windows(text: str) -> List[str]:
+    """Split text into overlapping windows of MEMORY_CHUNK_TOKENS tokens."""
+    encoding = _get_encoding()
+    tokens = encoding.encode(text) if encoding is not None else text.split()
+    if len(tokens) <= MEMORY_CHUNK_TOKENS:
+        return [text]
+    
+    step = MEMORY_CHUNK_TOKENS - MEMORY_CHUNK_OVERLAP
+    windows = []
+    for start in range(0, len(tokens) - MEMORY_CHUNK_OVERLAP, step):
+        window = tokens[start:start + MEMORY_CHUNK_TOKENS]
+        windows.append(encoding.decode(window) if encoding is not None else " ".join(window))
+    return windows
+
+
+# Prompt templates, compiled once. $tools_list is filled per orchestrator (it depends on
+# the configured tools); the user template is filled per question.
+AGENT_SYSTEM_PROMPT = string.Template("""You are a helpful personal assistant with access to the following tools and capabilities:
+
+$tools_list
+
+You have access to these tools through the LangChain agent framework. The tools will be automatically invoked when you need them - you don't need to describe using them, just use them directly.
+
+IMPORTANT: 
+- When you need current information or to search the web, automatically use the google_search tool
+- When asked about GitHub repositories or operations, automatically use the github_operations tool
+- When users ask about your capabilities, list the tools and their purposes
+- Use tools automatically when needed - don't describe what you will do, just do it
+
+Use the available tools to answer questions accurately:
+- When you have relevant memories in the context, use them
+- When you need current information, automatically invoke the search tool
+- When asked about GitHub repositories, automatically invoke the GitHub tool
+
+Always be helpful, accurate, and concise. Use tools automatically when needed.""")
+
+DIRECT_SYSTEM_PROMPT = string.Template("""You are a helpful personal assistant with access to the following tools and capabilities:
+
+$tools_list
+
+You have access to these tools through the LangChain agent framework. When users ask about your capabilities, tools, or what you can do, you should:
+- List all available tools and their purposes
+- Explain how you use each tool
+- Be specific about what operations you can perform
+
+Use the provided context to answer questions accurately and comprehensively.
+
+CRITICAL: When search results are provided in the context, they have ALREADY been obtained. Use those search results directly to answer the question. Do NOT suggest searching again or mention that you need to search. The search has been done for you - just use the results to provide a comprehensive answer.
+
+When search results are provided, prioritize that information as it contains the most current data. Combine search results with memories when relevant.
+
+Provide clear, direct answers based on the available information. If search results are provided, use them to answer the question immediately.""")
+
+DIRECT_USER_TEMPLATE = string.Template(
+    "$context\n\nQuestion: $question\n\nIMPORTANT: If search results are provided above, they have already been obtained. "
+    "Use them directly to answer the question. Do not suggest searching again.\n\n"
+    "Please provide a helpful, comprehensive answer based on the context above."
+)
+
+
+@lru_cache(maxsize=1)
+def _load_create_agent():
+    """
+    Import agent creation for LangChain 1.0+ on first use.
+    
+    LangChain 1.0 uses create_agent from langchain.agents (replaces AgentExecutor and
+    create_openai_tools_agent). langchain.agents is slow to import and only needed when
+    tools are configured, so it is not imported with this module.
+    
+    Returns:
+        create_agent, or None if it cannot be imported
+    """
+    try:
+        from langchain.agents import create_agent
+        logger.debug("Successfully imported create_agent from langchain.agents")
+        return create_agent
+    except ImportError as e:
+        logger.warning(f"Failed to import create_agent from langchain.agents: {e}")
+        logger.warning("Agent functionality will be disabled. Tools will be called manually.")
+        return None
+
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import AIMessageChunk, HumanMessage
 
 from assistant.core.config import Config
 from assistant.core.llm_provider import LLMProviderManager
-from assistant.memory.repository_manager import MemoryRepositoryManager
+from assistant.memory.repository_manager import MemoryRepositoryManager, JSON_MEMORY_SUFFIXES
 from assistant.memory.memory_store import MemoryStore
 from assistant.memory.memory_analyzer import MemoryAnalyzer
+from assistant.memory.semantic_cache import SemanticCache
 from assistant.tools.search_tool import GoogleSearchTool, SearchDecisionMaker
 from assistant.tools.github_tool import GitHubTool
 
 
+class AgentDebugCallbackHandler(BaseCallbackHandler):
+    """Routes the agent's intermediate steps to the debug log (enabled by AGENT_VERBOSE)."""
+    
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, **kwargs: Any) -> None:
+        logger.debug("Agent tool call: %s(%s)", (serialized or {}).get("name", "unknown"), input_str[:200])
+    
+    def on_tool_end(self, output: Any, **kwargs: Any) -> None:
+        logger.debug("Agent tool result: %s", str(output)[:200])
+    
+    def on_llm_end(self, response: Any, **kwargs: Any) -> None:
+        logger.debug("Agent model step returned %d generation(s)", len(response.generations))
+
+
 class PersonalAssistantOrchestrator:
     """Main orchestrator for the personal assistant system."""
     
+    # Background memory writer: commit at most this many memories at once, and wait
+    # at most this many seconds for more memories before committing a batch
+    MEMORY_BATCH_SIZE = 16
+    MEMORY_FLUSH_INTERVAL = 30.0
+    
     def __init__(self, config: Config):
         """
         Initialize the orchestrator.
@@ -50,8 +200,21 @@ class PersonalAssistantOrchestrator:
         logger.info("Initializing memory store...")
         self.memory_store = MemoryStore(config)
         
+        logger.info("Initializing semantic answer cache...")
+        self.semantic_cache = SemanticCache(
+            self.memory_store.embeddings,
+            persist_directory=str(self.memory_store.persist_directory)
+        )
+        
         # Initialize memory repository manager if configured
         self.memory_repo_manager: Optional[MemoryRepositoryManager] = None
+        # Serializes working-tree edits and commits between requests and the memory writer
+        self._repo_lock = threading.Lock()
+        self._memory_queue: "queue.Queue[Optional[Tuple[Dict[str, Any], str]]]" = queue.Queue()
+        self._memory_writer_thread: Optional[threading.Thread] = None
+        # Every key term in the repository's memories (None until the memories are loaded);
+        # lets _delete_memories skip loading the repository for descriptions matching nothing
+        self._memory_terms: Optional[set] = None
         if config.memory_repo_url:
             logger.info("Initializing memory repository manager...")
             self.memory_repo_manager = MemoryRepositoryManager(
@@ -65,6 +228,13 @@ class PersonalAssistantOrchestrator:
             memories = self.memory_repo_manager.load_memories()
             if memories:
                 self.memory_store.add_memories(memories)
+            self._memory_terms = set().union(*map(_memory_key_terms, memories))
+            # Save, commit and push new memories off the request path
+            self._memory_writer_thread = threading.Thread(
+                target=self._memory_writer_loop, name="memory-writer", daemon=True
+            )
+            self._memory_writer_thread.start()
+            atexit.register(self.close)
         
         logger.info("Initializing memory analyzer...")
         self.memory_analyzer = MemoryAnalyzer(self.llm_manager, self.memory_store)
@@ -85,16 +255,32 @@ class PersonalAssistantOrchestrator:
             self.github_tool = GitHubTool(config.github_token, self.memory_store)
             self.tools.append(self.github_tool)
         
+        # Agent step tracing is opt-in; by default agent runs carry no callbacks
+        self._agent_run_config = {"callbacks": [AgentDebugCallbackHandler()]} if config.agent_verbose else None
+        
+        # System message for direct LLM calls, built on first use
+        self._direct_system_message: Optional[Dict[str, str]] = None
+        
         # Initialize agent (LangChain 1.0+ uses create_agent which returns a graph)
         self.agent_graph = None
         self._initialize_agent()
     
+    def _tools_list(self) -> str:
+        """Numbered description of the assistant's capabilities for system prompts."""
+        tool_descriptions = ["1. Personal Memory Repository: Stores and retrieves past interactions, preferences, and information about the user"]
+        for tool in self.tools:
+            if hasattr(tool, 'name') and hasattr(tool, 'description'):
+                tool_name = tool.name.replace('_', ' ').title()
+                tool_descriptions.append(f"{len(tool_descriptions) + 1}. {tool_name}: {tool.description}")
+        return "\n".join(tool_descriptions)
+    
     def _initialize_agent(self) -> None:
         """Initialize the LangChain 1.0+ agent using create_agent."""
         if not self.tools:
             logger.warning("No tools available, agent will be LLM-only")
             return
         
+        create_agent = _load_create_agent()
         if create_agent is None:
             logger.warning("create_agent not available, using LLM-only mode")
             return
@@ -104,36 +290,8 @@ class PersonalAssistantOrchestrator:
             llm_type = type(llm).__name__
             logger.debug(f"Attempting to create agent with LLM type: {llm_type}")
             
-            # Build comprehensive system prompt with all available tools
-            tool_descriptions = []
-            tool_descriptions.append("1. Personal Memory Repository: Stores and retrieves past interactions, preferences, and information about the user")
-            
-            for tool in self.tools:
-                if hasattr(tool, 'name') and hasattr(tool, 'description'):
-                    tool_name = tool.name.replace('_', ' ').title()
-                    tool_descriptions.append(f"{len(tool_descriptions) + 1}. {tool_name}: {tool.description}")
-            
-            tools_list = "\n".join(tool_descriptions)
-            
-            # Create agent using LangChain 1.0+ API
-            system_prompt = f"""You are a helpful personal assistant with access to the following tools and capabilities:
-
-{tools_list}
-
-You have access to these tools through the LangChain agent framework. The tools will be automatically invoked when you need them - you don't need to describe using them, just use them directly.
-
-IMPORTANT: 
-- When you need current information or to search the web, automatically use the google_search tool
-- When asked about GitHub repositories or operations, automatically use the github_operations tool
-- When users ask about your capabilities, list the tools and their purposes
-- Use tools automatically when needed - don't describe what you will do, just do it
-
-Use the available tools to answer questions accurately:
-- When you have relevant memories in the context, use them
-- When you need current information, automatically invoke the search tool
-- When asked about GitHub repositories, automatically invoke the GitHub tool
-
-Always be helpful, accurate, and concise. Use tools automatically when needed."""
+            # Create agent using LangChain 1.0+ API, with all available tools in the system prompt
+            system_prompt = AGENT_SYSTEM_PROMPT.substitute(tools_list=self._tools_list())
             
             # Log system prompt and tools for debugging
             logger.info(f"Initializing agent with {len(self.tools)} tool(s)")
@@ -169,12 +327,146 @@ Always be helpful, accurate, and concise. Use tools automatically when needed.""
         Returns:
             Dictionary with response and metadata
         """
-        logger.info(f"Processing question from {user}: {question[:100]}")
-        logger.debug(f"Full question: {question}")
+        state = self._prepare_question(question, user)
+        if state["cached_result"] is not None:
+            return state["cached_result"]
+        
+        answer = self._generate_answer(question, state)
+        return self._finish_question(question, user, state, answer)
+    
+    async def astream_question(self, question: str, user: str, time: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process a question, streaming the answer while it is generated.
+        
+        Agent and direct LLM answers are streamed token by token; cached answers
+        and GitHub tool answers arrive as a single chunk.
+        
+        Args:
+            question: User's question
+            user: User identifier
+            time: Timestamp of the question
+            
+        Yields:
+            ``{"type": "chunk", "content": str}`` events with pieces of the answer,
+            then one ``{"type": "result", "result": dict}`` event carrying the same
+            dictionary process_question returns
+        """
+        state = await self._aprepare_question(question, user)
+        cached_result = state["cached_result"]
+        if cached_result is not None:
+            yield {"type": "chunk", "content": cached_result["answer"]}
+            yield {"type": "result", "result": cached_result}
+            return
+        
+        if state["is_github_question"] and hasattr(self, 'github_tool'):
+            # The GitHub tool produces its answer in one piece
+            stream = None
+        elif state["use_agent"]:
+            stream = self._astream_agent(state["agent_prompt"])
+        else:
+            stream = self.llm_manager.astream(self._direct_messages(question, state["full_context"]))
+        
+        answer = ""
+        if stream is not None:
+            chunks = []
+            try:
+                async for text in stream:
+                    chunks.append(text)
+                    yield {"type": "chunk", "content": text}
+            except Exception as e:
+                logger.error(f"Error streaming answer: {e}")
+            answer = "".join(chunks)
+        
+        if not answer:
+            # Nothing was streamed: produce the answer the blocking way
+            answer = await asyncio.to_thread(self._generate_answer, question, state)
+            yield {"type": "chunk", "content": answer}
+        
+        result = await asyncio.to_thread(self._finish_question, question, user, state, answer)
+        yield {"type": "result", "result": result}
+    
+    async def _astream_agent(self, prompt: str) -> AsyncIterator[str]:
+        """Stream the text the agent's model generates for a prompt."""
+        async for message, _ in self.agent_graph.astream(
+            {"messages": [HumanMessage(content=prompt)]},
+            config=self._agent_run_config,
+            stream_mode="messages"
+        ):
+            # Tool results are streamed as ToolMessages; only forward model output
+            if isinstance(message, AIMessageChunk) and isinstance(message.content, str) and message.content:
+                yield message.content
+    
+    def _prepare_question(self, question: str, user: str) -> Dict[str, Any]:
+        """
+        Run the steps that precede answer generation: cache lookup, memory
+        analysis and context building.
+        
+        Returns:
+            State dictionary for _generate_answer and _finish_question; only
+            "cached_result" is set when a cached answer can be reused
+        """
+        lookup = self._lookup_question(question, user)
+        if lookup["cached_result"] is not None:
+            return lookup
+        
+        # Step 1: Analyze question and load relevant memories
+        logger.debug("Step 1: Analyzing question and loading memories...")
+        memory_analysis = self.memory_analyzer.analyze_question(
+            question, user, embedding=lookup["question_embedding"]
+        )
+        return self._build_question_state(question, lookup, memory_analysis)
+    
+    async def _aprepare_question(self, question: str, user: str) -> Dict[str, Any]:
+        """Async variant of _prepare_question; the memory analysis runs on the event loop."""
+        lookup = await asyncio.to_thread(self._lookup_question, question, user)
+        if lookup["cached_result"] is not None:
+            return lookup
         
         # Step 1: Analyze question and load relevant memories
         logger.debug("Step 1: Analyzing question and loading memories...")
-        memory_analysis = self.memory_analyzer.analyze_question(question, user)
+        memory_analysis = await self.memory_analyzer.aanalyze_question(
+            question, user, embedding=lookup["question_embedding"]
+        )
+        return self._build_question_state(question, lookup, memory_analysis)
+    
+    def _lookup_question(self, question: str, user: str) -> Dict[str, Any]:
+        """
+        Embed the question and look for a cached answer to it.
+        
+        Returns:
+            Dictionary with "cached_result" (None on a miss), "now", "timestamp"
+            and "question_embedding"
+        """
+        logger.info(f"Processing question from {user}: {question[:100]}")
+        logger.debug(f"Full question: {question}")
+        
+        # One clock reading per request, shared by the result and any new memory
+        now = datetime.now()
+        timestamp = now.isoformat()
+        
+        # Step 0: Reuse the answer to a near-identical earlier question from the same user
+        # The question is embedded once and reused by the cache and memory search
+        question_embedding = self.memory_store.embed_query(question)
+        cached_result = None
+        if not _MEMORY_REQUEST_RE.search(question):
+            cached_result = self.semantic_cache.lookup(question, embedding=question_embedding, user=user)
+        if cached_result is not None:
+            cached_result.update(timestamp=timestamp, user=user, question=question)
+        
+        return {
+            "cached_result": cached_result,
+            "now": now,
+            "timestamp": timestamp,
+            "question_embedding": question_embedding
+        }
+    
+    def _build_question_state(
+        self,
+        question: str,
+        lookup: Dict[str, Any],
+        memory_analysis: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Build the memory context and agent prompt from the memory analysis."""
         logger.debug(f"Memory analysis returned {len(memory_analysis.get('all_memories', []))} memories")
         
         memory_context = self.memory_analyzer.format_memories_for_context(
@@ -193,16 +485,37 @@ Always be helpful, accurate, and concise. Use tools automatically when needed.""
             "check repos", "list repos", "what repos", "github repos"
         ])
         
-        # Step 3: Build context for LLM
-        context_parts = []
-        
-        if memory_context:
-            context_parts.append(f"**Relevant Memories:**\n{memory_context}")
+        # Without a search tool, only GitHub questions can need the agent's tools; the rest
+        # are answered in a single step, so skip the agent machinery for them
+        needs_tools = hasattr(self, 'search_tool') or "github" in question_lower or "repo" in question_lower
+        use_agent = self.agent_graph is not None and needs_tools
         
-        full_context = "\n\n".join(context_parts)
+        # Step 3: Build context for LLM, and the agent prompt from it; both are built
+        # once here and reused by every branch below
+        full_context = f"**Relevant Memories:**\n{memory_context}" if memory_context else ""
+        agent_prompt = f"{full_context}\n\nQuestion: {question}" if full_context else question
         logger.info(f"Built context for LLM (length: {len(full_context)} chars)")
         logger.debug(f"Full context being passed: {full_context[:500]}...")
         
+        return {
+            **lookup,
+            "memory_analysis": memory_analysis,
+            "memory_context": memory_context,
+            "full_context": full_context,
+            "agent_prompt": agent_prompt,
+            "is_github_question": is_github_question,
+            "use_agent": use_agent
+        }
+    
+    def _generate_answer(self, question: str, state: Dict[str, Any]) -> str:
+        """Generate the answer using the GitHub tool, the agent or a direct LLM call."""
+        memory_analysis = state["memory_analysis"]
+        memory_context = state["memory_context"]
+        full_context = state["full_context"]
+        agent_prompt = state["agent_prompt"]
+        is_github_question = state["is_github_question"]
+        use_agent = state["use_agent"]
+        
         # Step 4: Generate response using agent or direct LLM call
         # Priority: GitHub tool (direct) > Agent (automatic tool usage) > Direct LLM
         # Let the agent automatically decide when to use tools (search, GitHub, etc.)
@@ -213,7 +526,6 @@ Always be helpful, accurate, and concise. Use tools automatically when needed.""
                 # Extract GitHub username from memory if available
                 github_username = None
                 if memory_context:
-                    import re
                     # Try to find GitHub username in memories - check multiple patterns
                     patterns = [
                         r"github[_\s]?username[:\s]+([a-zA-Z0-9_-]+)",
@@ -266,9 +578,10 @@ Always be helpful, accurate, and concise. Use tools automatically when needed.""
                 # Fallback to agent or direct LLM call
                 if self.agent_graph:
                     try:
-                        from langchain_core.messages import HumanMessage
-                        prompt = f"{full_context}\n\nQuestion: {question}\n\nUse the GitHub tool to list repositories."
-                        response = self.agent_graph.invoke({"messages": [HumanMessage(content=prompt)]})
+                        prompt = f"{agent_prompt}\n\nUse the GitHub tool to list repositories."
+                        response = self.agent_graph.invoke(
+                            {"messages": [HumanMessage(content=prompt)]}, config=self._agent_run_config
+                        )
                         if isinstance(response, dict) and "messages" in response:
                             messages = response["messages"]
                             if messages:
@@ -282,18 +595,12 @@ Always be helpful, accurate, and concise. Use tools automatically when needed.""
                         answer = self._direct_llm_call(question, full_context)
                 else:
                     answer = self._direct_llm_call(question, full_context)
-        elif self.agent_graph:
+        elif use_agent:
             # Use agent - let it automatically decide when to use tools
             logger.info("Using agent graph - agent will automatically decide tool usage")
             try:
-                from langchain_core.messages import HumanMessage
-                
-                # Build prompt with context and question
                 # The agent will automatically invoke tools (search, GitHub) when needed
-                if full_context:
-                    prompt = f"{full_context}\n\nQuestion: {question}"
-                else:
-                    prompt = question
+                prompt = agent_prompt
                 
                 logger.info(f"Invoking agent with prompt length: {len(prompt)} chars")
                 logger.debug(f"Agent prompt preview: {prompt[:500]}...")
@@ -304,10 +611,11 @@ Always be helpful, accurate, and concise. Use tools automatically when needed.""
                 # The agent will automatically call tools when it determines they're needed
                 response = self.agent_graph.invoke({
                     "messages": [HumanMessage(content=prompt)]
-                })
+                }, config=self._agent_run_config)
                 
                 logger.info(f"Agent response type: {type(response)}")
-                logger.debug(f"Agent response: {str(response)[:500]}...")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Agent response: {str(response)[:500]}...")
                 
                 # Extract answer from response
                 if isinstance(response, dict):
@@ -317,13 +625,14 @@ Always be helpful, accurate, and concise. Use tools automatically when needed.""
                         logger.info(f"Agent returned {len(messages)} message(s)")
                         if messages:
                             # Log all messages for debugging
-                            for i, msg in enumerate(messages):
-                                msg_type = type(msg).__name__
-                                if hasattr(msg, 'content'):
-                                    content_preview = str(msg.content)[:200] if msg.content else "None"
-                                    logger.debug(f"  Message {i} ({msg_type}): {content_preview}...")
-                                else:
-                                    logger.debug(f"  Message {i} ({msg_type}): {str(msg)[:200]}...")
+                            if logger.isEnabledFor(logging.DEBUG):
+                                for i, msg in enumerate(messages):
+                                    msg_type = type(msg).__name__
+                                    if hasattr(msg, 'content'):
+                                        content_preview = str(msg.content)[:200] if msg.content else "None"
+                                        logger.debug(f"  Message {i} ({msg_type}): {content_preview}...")
+                                    else:
+                                        logger.debug(f"  Message {i} ({msg_type}): {str(msg)[:200]}...")
                             
                             answer = messages[-1].content if hasattr(messages[-1], 'content') else str(messages[-1])
                             logger.info(f"Extracted answer length: {len(answer)} chars")
@@ -365,9 +674,23 @@ Always be helpful, accurate, and concise. Use tools automatically when needed.""
                 answer = self._direct_llm_call(question, full_context)
         else:
             # Direct LLM call without tools
+            if self.agent_graph is not None:
+                logger.info("Question needs no tools - using direct LLM call")
             answer = self._direct_llm_call(question, full_context)
         
+        return answer
+    
+    def _finish_question(self, question: str, user: str, state: Dict[str, Any], answer: str) -> Dict[str, Any]:
+        """Apply memory changes, build the result dictionary and cache it."""
+        memory_analysis = state["memory_analysis"]
+        is_github_question = state["is_github_question"]
+        use_agent = state["use_agent"]
+        now = state["now"]
+        timestamp = state["timestamp"]
+        question_embedding = state["question_embedding"]
+        
         # Step 5: Handle memory creation/deletion
+        memory_changes = False
         should_create_tuple = memory_analysis.get("should_create_memory", (False, ""))
         if isinstance(should_create_tuple, tuple) and len(should_create_tuple) == 2:
             should_create, memory_content = should_create_tuple
@@ -376,10 +699,13 @@ Always be helpful, accurate, and concise. Use tools automatically when needed.""
                 if not isinstance(memory_content, str):
                     memory_content = str(memory_content) if memory_content else ""
                 if memory_content.strip():  # Only create if not empty
-                    self._create_memory(memory_content, user, question)
+                    self._create_memory(memory_content, user, question, now)
+                    memory_changes = True
         
         if memory_analysis["memories_to_delete"]:
-            self._delete_memories(memory_analysis["memories_to_delete"])
+            memory_changes = True
+            with self._repo_lock:
+                self._delete_memories(memory_analysis["memories_to_delete"])
         
         # Step 6: Prepare response
         logger.info(f"Final answer prepared, length: {len(answer)} chars")
@@ -388,7 +714,7 @@ Always be helpful, accurate, and concise. Use tools automatically when needed.""
         # Detect if search was used (agent automatically invokes tools, so we can't directly track it)
         # We'll infer from the answer content or assume agent used tools if available
         search_used = False
-        if self.agent_graph and self.tools:
+        if use_agent and self.tools:
             # Agent has tools available - it may have used search automatically
             # We can't directly detect this without execution trace, so we'll mark as potentially used
             search_used = any("search" in tool.name.lower() for tool in self.tools)
@@ -399,51 +725,31 @@ Always be helpful, accurate, and concise. Use tools automatically when needed.""
             "answer": answer,
             "memories_used": len(memory_analysis["all_memories"]),
             "search_used": search_used,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp,
             "user": user,
             "question": question
         }
         
+        # Answers to questions that changed memories are not reused: a repeat must run
+        # the memory analysis again
+        if not memory_changes:
+            self.semantic_cache.insert(question, result, embedding=question_embedding, user=user)
+        
         return result
     
-    def _direct_llm_call(self, question: str, context: str) -> str:
-        """Make a direct LLM call without agent."""
-        logger.info("Making direct LLM call (bypassing agent)")
-        logger.debug(f"Direct LLM call - question: {question[:100]}...")
-        logger.debug(f"Direct LLM call - context length: {len(context)} chars")
-        logger.debug(f"Direct LLM call - context preview: {context[:300]}...")
-        
-        # Build tool information for system prompt
-        tool_info = []
-        tool_info.append("1. Personal Memory Repository: Stores and retrieves past interactions, preferences, and information about the user")
-        for tool in self.tools:
-            if hasattr(tool, 'name') and hasattr(tool, 'description'):
-                tool_name = tool.name.replace('_', ' ').title()
-                tool_info.append(f"{len(tool_info) + 1}. {tool_name}: {tool.description}")
-        
-        tools_list = "\n".join(tool_info)
-        
-        system_prompt = f"""You are a helpful personal assistant with access to the following tools and capabilities:
-
-{tools_list}
-
-You have access to these tools through the LangChain agent framework. When users ask about your capabilities, tools, or what you can do, you should:
-- List all available tools and their purposes
-- Explain how you use each tool
-- Be specific about what operations you can perform
-
-Use the provided context to answer questions accurately and comprehensively.
-
-CRITICAL: When search results are provided in the context, they have ALREADY been obtained. Use those search results directly to answer the question. Do NOT suggest searching again or mention that you need to search. The search has been done for you - just use the results to provide a comprehensive answer.
-
-When search results are provided, prioritize that information as it contains the most current data. Combine search results with memories when relevant.
-
-Provide clear, direct answers based on the available information. If search results are provided, use them to answer the question immediately."""
-        
-        user_prompt = f"{context}\n\nQuestion: {question}\n\nIMPORTANT: If search results are provided above, they have already been obtained. Use them directly to answer the question. Do not suggest searching again.\n\nPlease provide a helpful, comprehensive answer based on the context above."
+    def _direct_messages(self, question: str, context: str) -> List[Dict[str, str]]:
+        """Build the chat messages for a direct LLM call."""
+        # The system message is built once per orchestrator; only the user message is per call
+        if self._direct_system_message is None:
+            self._direct_system_message = {
+                "role": "system",
+                "content": DIRECT_SYSTEM_PROMPT.substitute(tools_list=self._tools_list())
+            }
+        system_prompt = self._direct_system_message["content"]
+        user_prompt = DIRECT_USER_TEMPLATE.substitute(context=context, question=question)
         
         messages = [
-            {"role": "system", "content": system_prompt},
+            self._direct_system_message,
             {"role": "user", "content": user_prompt}
         ]
         
@@ -451,13 +757,24 @@ Provide clear, direct answers based on the available information. If search resu
         logger.debug(f"Direct LLM call - system prompt includes {len(self.tools)} tool(s)")
         logger.debug(f"Direct LLM call - user prompt length: {len(user_prompt)} chars")
         
+        return messages
+    
+    def _direct_llm_call(self, question: str, context: str) -> str:
+        """Make a direct LLM call without agent."""
+        logger.info("Making direct LLM call (bypassing agent)")
+        logger.debug(f"Direct LLM call - question: {question[:100]}...")
+        logger.debug(f"Direct LLM call - context length: {len(context)} chars")
+        logger.debug(f"Direct LLM call - context preview: {context[:300]}...")
+        
+        messages = self._direct_messages(question, context)
+        
         result = self.llm_manager.invoke(messages)
         logger.info(f"Direct LLM call returned answer length: {len(result)} chars")
         logger.debug(f"Direct LLM answer preview: {result[:300]}...")
         return result
     
-    def _create_memory(self, content: str, user: str, question: str) -> None:
-        """Create a new memory."""
+    def _create_memory(self, content: str, user: str, question: str, now: Optional[datetime] = None) -> None:
+        """Create a new memory, stamped with ``now`` (the current time if not given)."""
         # Ensure content is a string
         if not isinstance(content, str):
             if content is None:
@@ -466,37 +783,125 @@ Provide clear, direct answers based on the available information. If search resu
             # Convert to string if it's not
             content = str(content)
         
-        # Truncate if too long
-        if len(content) > 1000:
-            content = content[:1000] + "..."
+        if now is None:
+            now = datetime.now()
         
         memory = {
             "content": content,
-            "source": f"interaction_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-            "timestamp": datetime.now().isoformat(),
+            "source": f"interaction_{now.strftime('%Y%m%d_%H%M%S')}",
+            "timestamp": now.isoformat(),
             "user": user,
             "related_question": question
         }
         
-        # Add to vector store
-        self.memory_store.add_memories([memory])
-        
-        # Save to repository if available
-        if self.memory_repo_manager:
-            if self.memory_repo_manager.save_memory(memory):
-                # Commit and push immediately to ensure persistence
-                commit_message = f"Add memory: {content[:100] if len(content) > 100 else content} (user: {user})"
-                if self.memory_repo_manager.commit_and_push(commit_message):
-                    logger.info("Memory saved, committed, and pushed to remote repository")
-                else:
-                    logger.warning("Memory saved but failed to commit/push to remote")
-            else:
-                logger.warning("Failed to save memory to repository")
+        # Save to the vector store and repository. With a repository, the writer thread
+        # indexes, commits and pushes queued memories in batches.
+        summary = f"{content[:100] if len(content) > 100 else content} (user: {user})"
+        if self._memory_writer_thread is not None and self._memory_writer_thread.is_alive():
+            self._memory_queue.put((memory, summary))
+        elif self.memory_repo_manager:
+            self._write_memories([(memory, summary)])
+        else:
+            self.memory_store.add_memories(self._memory_chunks(memory))
+            # Cached answers were built without this memory
+            self.semantic_cache.clear()
         
         # Log with safe string slicing
         content_preview = content[:50] if len(content) > 50 else content
         logger.info(f"Created new memory: {content_preview}")
     
+    def _memory_chunks(self, memory: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Split a long memory into separately indexed chunks.
+        
+        The repository keeps the full memory; only the vector store sees the
+        chunks, which link back to it through ``parent``.
+        
+        Args:
+            memory: Memory dictionary
+            
+        Returns:
+            The memory itself if it is short, otherwise one memory per chunk
+        """
+        windows = _split_into_token_windows(memory["content"])
+        if len(windows) == 1:
+            return [memory]
+        
+        base = memory["source"]
+        return [
+            {**memory, "content": window, "source": f"{base}#chunk{i}", "parent": base}
+            for i, window in enumerate(windows)
+        ]
+    
+    def _memory_writer_loop(self) -> None:
+        """Drain the memory queue, committing batches of memories until close() is called."""
+        stopping = False
+        while not stopping:
+            item = self._memory_queue.get()
+            if item is None:
+                break
+            batch = [item]
+            
+            # Collect more memories until the batch is full or the flush interval passes
+            deadline = time.monotonic() + self.MEMORY_FLUSH_INTERVAL
+            while len(batch) < self.MEMORY_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._memory_queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            try:
+                self._write_memories(batch)
+            except Exception as e:
+                logger.error(f"Memory writer failed to save {len(batch)} memory(ies): {e}")
+    
+    def _write_memories(self, batch: List[Tuple[Dict[str, Any], str]]) -> None:
+        """Index a batch of memories and save them to the repository with a single commit and push."""
+        # One add_memories call embeds the whole batch together
+        self.memory_store.add_memories([chunk for memory, _ in batch for chunk in self._memory_chunks(memory)])
+        # Cached answers were built without these memories
+        self.semantic_cache.clear()
+        
+        with self._repo_lock:
+            # The whole batch is written to one memory file in a single write
+            if not self.memory_repo_manager.save_memories([memory for memory, _ in batch]):
+                logger.warning(f"Failed to save {len(batch)} memory(ies) to repository")
+                return
+            saved = [summary for _, summary in batch]
+            if self._memory_terms is not None:
+                for memory, _ in batch:
+                    self._memory_terms.update(_memory_key_terms(memory))
+            
+            if len(saved) == 1:
+                commit_message = f"Add memory: {saved[0]}"
+            else:
+                commit_message = f"Add {len(saved)} memories: {'; '.join(s[:50] for s in saved[:3])}"
+                if len(saved) > 3:
+                    commit_message += f" and {len(saved) - 3} more"
+            
+            if self.memory_repo_manager.commit_and_push(commit_message):
+                logger.info(f"{len(saved)} memory(ies) saved, committed, and pushed to remote repository")
+            else:
+                logger.warning(f"{len(saved)} memory(ies) saved but failed to commit/push to remote")
+    
+    def close(self) -> None:
+        """Flush queued memories to the repository and stop the memory writer.
+        
+        Registered with atexit, so pending memories are pushed before the process exits.
+        """
+        thread = self._memory_writer_thread
+        if thread is None or not thread.is_alive():
+            return
+        self._memory_queue.put(None)
+        thread.join()
+    
     def _delete_memories(self, memory_sources: List[str]) -> None:
         """
         Delete memories by source/content description and commit/push changes.
@@ -513,18 +918,68 @@ Provide clear, direct answers based on the available information. If search resu
         
         deleted_count = 0
         deleted_sources = []
+        repo_manager = self.memory_repo_manager
         
-        # Load all memories to search by content
-        all_memories = self.memory_repo_manager.load_memories()
+        # All memories, loaded only if a description can match memory content
+        all_memories: Optional[List[Dict[str, Any]]] = None
+        
+        # Walk the repository once. JSON files are parsed on first use, edited in
+        # memory, and only the files that changed are written back at the end.
+        memory_files = [
+            str(file_path.relative_to(repo_manager.repo_path))
+            for file_path in repo_manager.get_memory_files()
+        ]
+        json_files = [file_source for file_source in memory_files if file_source.endswith(JSON_MEMORY_SUFFIXES)]
+        # Path lookups for Strategies 1 and 3: relative path set and file name -> path
+        file_index = set(memory_files)
+        basename_index: Dict[str, str] = {}
+        for file_source in memory_files:
+            basename_index.setdefault(Path(file_source).name, file_source)
+        file_cache: Dict[str, Optional[List[Dict[str, Any]]]] = {}
+        dirty_files = set()
+        content_index: Optional[Dict[str, List[str]]] = None
+        memory_tokens: Optional[List[frozenset]] = None
+        
+        def load_file(file_source: str) -> Optional[List[Dict[str, Any]]]:
+            if file_source not in file_cache:
+                file_cache[file_source] = repo_manager.load_memory_file(file_source)
+            return file_cache[file_source]
+        
+        def build_content_index() -> Dict[str, List[str]]:
+            # Map memory content and source ids to the files that contain them
+            index: Dict[str, List[str]] = {}
+            for file_source in json_files:
+                for memory in load_file(file_source) or []:
+                    for key in (str(memory.get("content", "")), memory.get("source")):
+                        if key:
+                            files = index.setdefault(key, [])
+                            if not files or files[-1] != file_source:
+                                files.append(file_source)
+            return index
+        
+        def delete_file(file_source: str) -> bool:
+            if not repo_manager.delete_memory_file(file_source):
+                return False
+            file_cache[file_source] = None
+            dirty_files.discard(file_source)
+            file_index.discard(file_source)
+            if basename_index.get(Path(file_source).name) == file_source:
+                del basename_index[Path(file_source).name]
+            if file_source in json_files:
+                json_files.remove(file_source)
+            return True
         
         for source_description in memory_sources:
             try:
                 success = False
-                matched_memories = []
                 
-                # Strategy 1: Try as direct file path
-                if "/" in source_description or source_description.endswith(".json"):
-                    if self.memory_repo_manager.delete_memory_file(source_description):
+                # Strategy 1: Try as direct file path (or a known file name)
+                if "/" in source_description or source_description.endswith(JSON_MEMORY_SUFFIXES):
+                    if source_description in file_index:
+                        target = source_description
+                    else:
+                        target = basename_index.get(Path(source_description).name)
+                    if target and delete_file(target):
                         deleted_count += 1
                         deleted_sources.append(source_description)
                         success = True
@@ -533,58 +988,74 @@ Provide clear, direct answers based on the available information. If search resu
                 # Strategy 2: Search memories by content similarity
                 # The LLM might return descriptions like "Any memory about PyTorch version X"
                 # We need to find memories that match this description
-                for memory in all_memories:
-                    memory_content = str(memory.get("content", "")).lower()
-                    memory_source = str(memory.get("source", "")).lower()
-                    
-                    # Check if the description matches memory content or source
-                    description_lower = source_description.lower()
-                    
-                    # Match if description keywords appear in memory content
-                    # Extract key terms from description (remove common words)
-                    key_terms = [term for term in description_lower.split() 
-                                if len(term) > 3 and term not in ["any", "memory", "asserting", "specific", "version", "latest", "stable"]]
-                    
+                
+                # Extract key terms from description (remove common words)
+                description_lower = source_description.lower()
+                key_terms = _key_terms(description_lower) - DELETE_STOP_WORDS
+                
+                if key_terms and self._memory_terms is not None and key_terms.isdisjoint(self._memory_terms):
+                    # No memory contains any of the terms; skip loading the repository
+                    matched_memories = []
+                else:
+                    if all_memories is None:
+                        all_memories = repo_manager.load_memories()
+                        memory_tokens = [_memory_key_terms(memory) for memory in all_memories]
+                        self._memory_terms = set().union(*memory_tokens)
                     if key_terms:
-                        # Check if any key terms match
-                        matches = sum(1 for term in key_terms if term in memory_content or term in memory_source)
-                        if matches >= len(key_terms) * 0.5:  # At least 50% of terms match
-                            matched_memories.append(memory)
-                    elif description_lower in memory_content or description_lower in memory_source:
-                        matched_memories.append(memory)
+                        matched_memories = [
+                            memory for memory, tokens in zip(all_memories, memory_tokens, strict=True)
+                            if _matches_description(key_terms, tokens)
+                        ]
+                    else:
+                        matched_memories = [
+                            memory for memory in all_memories
+                            if description_lower in str(memory.get("content", "")).lower()
+                            or description_lower in str(memory.get("source", "")).lower()
+                        ]
                 
-                # Delete matched memories
+                # Delete matched memories from the (cached) files that contain them
                 if matched_memories:
                     for memory in matched_memories:
                         memory_source = memory.get("source", "")
-                        # Try to find the file containing this memory
-                        memory_files = self.memory_repo_manager.get_memory_files()
-                        for file_path in memory_files:
-                            if file_path.suffix == ".json":
-                                file_source = str(file_path.relative_to(self.memory_repo_manager.repo_path))
-                                # Try to delete this specific memory from the file
-                                if self.memory_repo_manager.delete_memory_from_file(
-                                    file_source, 
-                                    memory_id=memory.get("content", "")
-                                ):
-                                    deleted_count += 1
-                                    if memory_source not in deleted_sources:
-                                        deleted_sources.append(memory_source)
-                                    success = True
-                                    break
+                        memory_id = str(memory.get("content", ""))
+                        # The repository's memory index answers directly; without it,
+                        # index every JSON file once
+                        memory_files_for_id = repo_manager.find_memory_files(memory_id)
+                        if memory_files_for_id is None:
+                            if content_index is None:
+                                content_index = build_content_index()
+                            memory_files_for_id = content_index.get(memory_id, [])
+                        for file_source in memory_files_for_id:
+                            file_memories = load_file(file_source)
+                            if not file_memories:
+                                continue
+                            remaining = [
+                                m for m in file_memories
+                                if m.get("source") != memory_id and str(m.get("content", "")) != memory_id
+                            ]
+                            if len(remaining) < len(file_memories):
+                                file_cache[file_source] = remaining
+                                dirty_files.add(file_source)
+                                deleted_count += 1
+                                if memory_source not in deleted_sources:
+                                    deleted_sources.append(memory_source)
+                                success = True
+                                break
                 
-                # Strategy 3: Try exact source match in files
+                # Strategy 3: Try exact source match in files, by file name before
+                # falling back to a substring scan of the paths
                 if not success:
-                    memory_files = self.memory_repo_manager.get_memory_files()
-                    for file_path in memory_files:
-                        if file_path.suffix == ".json":
-                            file_source = str(file_path.relative_to(self.memory_repo_manager.repo_path))
-                            if source_description in file_source:
-                                if self.memory_repo_manager.delete_memory_file(file_source):
-                                    deleted_count += 1
-                                    deleted_sources.append(source_description)
-                                    success = True
-                                    break
+                    target = (
+                        basename_index.get(source_description)
+                        or basename_index.get(f"{source_description}.json")
+                        or basename_index.get(f"{source_description}.jsonl")
+                    )
+                    if target is None or not target.endswith(JSON_MEMORY_SUFFIXES):
+                        target = next((f for f in json_files if source_description in f), None)
+                    if target and delete_file(target):
+                        deleted_count += 1
+                        deleted_sources.append(source_description)
+                        success = True
                 
                 if not success:
                     logger.debug(f"Could not find matching memories for: {source_description[:100]}")
@@ -592,7 +1063,14 @@ Provide clear, direct answers based on the available information. If search resu
             except Exception as e:
                 logger.error(f"Error deleting memory source {source_description}: {e}")
         
+        # Write back only the files whose contents changed
+        for file_source in dirty_files:
+            repo_manager.write_memory_file(file_source, file_cache[file_source])
+        
         if deleted_count > 0:
+            # Cached answers may have been built from the deleted memories
+            self.semantic_cache.clear()
+            
             # Commit and push deletions
             commit_message = f"Delete {deleted_count} outdated memory(ies): {', '.join([s[:50] for s in deleted_sources[:3]])}"
             if len(deleted_sources) > 3:
@@ -0,0 +1,155 @@
+"""
+Embedding Cache
+
+Wraps an embedding model so that text which has been embedded before is not
+sent to the model again. Vectors are kept in an in-memory LRU and, when a
+cache file is given, persisted in SQLite so they survive restarts.
+"""
+
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+import orjson
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings adapter that caches vectors by the SHA-256 of the embedded text."""
+    
+    def __init__(
+        self,
+        inner: Embeddings,
+        cache_path: Optional[Union[str, Path]] = None,
+        namespace: str = "",
+        maxsize: int = 4096
+    ):
+        """
+        Initialize the embedding cache.
+        
+        Args:
+            inner: Embedding model to cache
+            cache_path: SQLite file persisting the cache (in-memory only if None)
+            namespace: Identifies the model, so vectors from different models never mix
+            maxsize: Maximum number of vectors kept in memory
+        """
+        self.inner = inner
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self._memory: "OrderedDict[bytes, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        
+        if cache_path is not None:
+            try:
+                self._db = sqlite3.connect(str(cache_path), check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)"
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Embedding cache disabled, could not open {cache_path}: {e}")
+                self._db = None
+    
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a query, returning the cached vector if the text was seen before.
+        
+        Args:
+            text: Query text
+        
+        Returns:
+            Embedding vector
+        """
+        key = self._key(text)
+        with self._lock:
+            cached = self._get(key)
+        if cached is not None:
+            return cached
+        
+        embedding = self.inner.embed_query(text)
+        with self._lock:
+            self._put([(key, embedding)])
+        return embedding
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed documents, sending only the uncached texts to the model in one call.
+        
+        Args:
+            texts: List of texts to embed
+        
+        Returns:
+            List of embedding vectors
+        """
+        keys = [self._key(text) for text in texts]
+        with self._lock:
+            embeddings = [self._get(key) for key in keys]
+        
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            computed = self.inner.embed_documents([texts[i] for i in missing])
+            if len(computed) != len(missing):
+                raise ValueError(
+                    f"Embedding model returned {len(computed)} vectors for {len(missing)} texts"
+                )
+            for i, embedding in zip(missing, computed, strict=True):
+                embeddings[i] = embedding
+            with self._lock:
+                self._put([(keys[i], embeddings[i]) for i in missing])
+        
+        return embeddings
+    
+    def _key(self, text: str) -> bytes:
+        """Cache key for a text under this cache's namespace."""
+        return hashlib.sha256(f"{self.namespace}\0{text}".encode("utf-8")).digest()
+    
+    def _get(self, key: bytes) -> Optional[List[float]]:
+        """Look a vector up in memory, then on disk. Caller holds the lock."""
+        embedding = self._memory.get(key)
+        if embedding is not None:
+            self._memory.move_to_end(key)
+            return embedding
+        
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding cache lookup failed: {e}")
+            return None
+        if row is None:
+            return None
+        
+        embedding = orjson.loads(row[0])
+        self._remember(key, embedding)
+        return embedding
+    
+    def _put(self, items: List[Tuple[bytes, List[float]]]) -> None:
+        """Store (key, vector) pairs in memory and on disk. Caller holds the lock."""
+        for key, embedding in items:
+            self._remember(key, embedding)
+        
+        if self._db is None or not items:
+            return
+        try:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, orjson.dumps(embedding)) for key, embedding in items]
+            )
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to persist embeddings: {e}")
+    
+    def _remember(self, key: bytes, embedding: List[float]) -> None:
+        """Insert a vector into the in-memory LRU."""
+        self._memory[key] = embedding
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
@@ -7,20 +7,136 @@ Uses LLM to analyze questions and determine:
 - What old memories to delete
 """
 
-import json
+import re
+import asyncio
+import hashlib
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterator, AsyncIterator, Optional, Tuple
 from datetime import datetime
 
+import orjson
+
 from assistant.core.llm_provider import LLMProviderManager
 from assistant.memory.memory_store import MemoryStore
 
 logger = logging.getLogger(__name__)
 
+# Shared worker pool for the independent, I/O-bound steps of a question analysis
+_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="memory-analyzer")
+
+# Query used to fetch the memories that are always loaded
+BASIC_MEMORY_QUERY = "user profile preferences general information"
+
+
+# Characters that change the JSON scanner's state, outside and inside strings
+_JSON_STRUCTURE_RE = re.compile(r'[{}"]')
+_JSON_STRING_RE = re.compile(r'[\\"]')
+
+
+class _JsonObjectScanner:
+    """
+    Finds the first complete top-level JSON object in text fed to it in chunks.
+    
+    Braces are counted as chunks arrive (ignoring those inside strings), so the
+    object is known as soon as its closing brace is seen. Surrounding prose or
+    markdown code fences are skipped. The scanner jumps between structural
+    characters with compiled patterns rather than looping over every character.
+    """
+    
+    def __init__(self):
+        self._buffer: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+    
+    def feed(self, chunk: str) -> Optional[str]:
+        """Scan the next chunk; returns the JSON object text once it is complete."""
+        pos = 0
+        start = 0
+        if self._escaped and chunk:
+            # A backslash ended the previous chunk and escapes this chunk's first character
+            self._escaped = False
+            pos = 1
+        
+        while True:
+            if self._depth == 0:
+                pos = chunk.find("{", pos)
+                if pos == -1:
+                    return None
+                self._buffer.clear()
+                start = pos
+                self._depth = 1
+                pos += 1
+                continue
+            
+            pattern = _JSON_STRING_RE if self._in_string else _JSON_STRUCTURE_RE
+            match = pattern.search(chunk, pos)
+            if match is None:
+                self._buffer.append(chunk[start:])
+                return None
+            
+            char = match.group()
+            pos = match.end()
+            if char == "\\":
+                # Skip the escaped character, which may start the next chunk
+                if pos == len(chunk):
+                    self._escaped = True
+                pos += 1
+            elif char == '"':
+                self._in_string = not self._in_string
+            elif char == "{":
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._buffer.append(chunk[start:pos])
+                    return "".join(self._buffer)
+
+
+def _first_json_object(chunks: Iterator[str]) -> Optional[str]:
+    """
+    Return the first complete top-level JSON object in a stream of text chunks.
+    
+    The rest of the stream is never read once the object is complete.
+    
+    Args:
+        chunks: Text chunks, e.g. from LLMProviderManager.stream
+        
+    Returns:
+        The JSON object text, or None if the stream ended before one completed
+    """
+    scanner = _JsonObjectScanner()
+    for chunk in chunks:
+        json_str = scanner.feed(chunk)
+        if json_str is not None:
+            return json_str
+    return None
+
+
+async def _afirst_json_object(chunks: AsyncIterator[str]) -> Optional[str]:
+    """Async variant of _first_json_object, e.g. for LLMProviderManager.astream."""
+    scanner = _JsonObjectScanner()
+    try:
+        async for chunk in chunks:
+            json_str = scanner.feed(chunk)
+            if json_str is not None:
+                return json_str
+        return None
+    finally:
+        # Close the stream now rather than when it is garbage collected
+        aclose = getattr(chunks, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
 
 class MemoryAnalyzer:
     """Analyzes questions and manages memory operations."""
     
+    # Maximum number of remembered memory operation analyses
+    CACHE_SIZE = 512
+    
     def __init__(self, llm_manager: LLMProviderManager, memory_store: MemoryStore):
         """
         Initialize the memory analyzer.
@@ -31,8 +147,15 @@ class MemoryAnalyzer:
         """
         self.llm_manager = llm_manager
         self.memory_store = memory_store
+        self._operations_cache: "OrderedDict[bytes, Tuple[bool, str, List[str]]]" = OrderedDict()
     
-    def analyze_question(self, question: str, user: str, context: Optional[str] = None) -> Dict[str, Any]:
+    def analyze_question(
+        self,
+        question: str,
+        user: str,
+        context: Optional[str] = None,
+        embedding: Optional[List[float]] = None
+    ) -> Dict[str, Any]:
         """
         Analyze a question to determine memory operations needed.
         
@@ -40,21 +163,66 @@ class MemoryAnalyzer:
             question: User's question
             user: User identifier
             context: Additional context
+            embedding: Precomputed question embedding (computed if not given)
             
         Returns:
             Dictionary with analysis results
         """
-        # First, load basic memories (always loaded)
-        basic_memories = self._load_basic_memories()
+        # The vector searches and the LLM analysis are independent; run them
+        # concurrently so the analysis takes as long as the slowest of them
+        basic_future = _EXECUTOR.submit(self._load_basic_memories)
+        relevant_future = _EXECUTOR.submit(self._search_relevant_docs, question, embedding)
+        operations_future = _EXECUTOR.submit(self._analyze_memory_operations, question, user)
         
-        # Use LLM to determine what additional memories to load
-        relevant_memories = self._determine_relevant_memories(question, basic_memories)
+        return self._build_analysis(
+            basic_future.result(),
+            relevant_future.result(),
+            operations_future.result()
+        )
+    
+    async def aanalyze_question(
+        self,
+        question: str,
+        user: str,
+        context: Optional[str] = None,
+        embedding: Optional[List[float]] = None
+    ) -> Dict[str, Any]:
+        """
+        Async variant of analyze_question.
         
-        # Determine if new memory should be created
-        should_create, memory_content = self._should_create_memory(question, user)
+        The vector searches run on the shared worker pool, while the LLM
+        analysis streams its reply on the event loop itself, so concurrent
+        questions do not each hold a worker thread for the LLM round trip.
         
-        # Determine if old memories should be deleted
-        memories_to_delete = self._determine_memories_to_delete(question)
+        Args:
+            question: User's question
+            user: User identifier
+            context: Additional context
+            embedding: Precomputed question embedding (computed if not given)
+            
+        Returns:
+            Dictionary with analysis results
+        """
+        loop = asyncio.get_running_loop()
+        basic_memories, relevant_docs, operations = await asyncio.gather(
+            # Basic memories (always loaded)
+            loop.run_in_executor(_EXECUTOR, self._load_basic_memories),
+            # Memories relevant to the question
+            loop.run_in_executor(_EXECUTOR, self._search_relevant_docs, question, embedding),
+            # Determine if a new memory should be created and old memories deleted
+            self._aanalyze_memory_operations(question, user)
+        )
+        return self._build_analysis(basic_memories, relevant_docs, operations)
+    
+    def _build_analysis(
+        self,
+        basic_memories: List[Dict[str, Any]],
+        relevant_docs: List[Any],
+        operations: Tuple[bool, str, List[str]]
+    ) -> Dict[str, Any]:
+        """Assemble the analysis result from the outputs of the concurrent steps."""
+        should_create, memory_content, memories_to_delete = operations
+        relevant_memories = self._determine_relevant_memories(relevant_docs, basic_memories)
         
         return {
             "basic_memories": basic_memories,
@@ -67,7 +235,7 @@ class MemoryAnalyzer:
     def _load_basic_memories(self) -> List[Dict[str, Any]]:
         """Load basic memories that should always be available."""
         # Search for general/user profile memories
-        basic_docs = self.memory_store.search_memories("user profile preferences general information", k=3)
+        basic_docs = self.memory_store.search_memories(BASIC_MEMORY_QUERY, k=3)
         
         memories = []
         for doc in basic_docs:
@@ -79,11 +247,16 @@ class MemoryAnalyzer:
         
         return memories
     
-    def _determine_relevant_memories(self, question: str, basic_memories: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Use LLM to determine what additional memories are relevant to the question."""
-        # Search vector store for relevant memories
-        relevant_docs = self.memory_store.search_memories(question, k=5)
-        
+    def _search_relevant_docs(self, question: str, embedding: Optional[List[float]] = None) -> List[Any]:
+        """Search the vector store for memories relevant to the question."""
+        return self.memory_store.search_memories(question, k=5, embedding=embedding)
+    
+    def _determine_relevant_memories(
+        self,
+        relevant_docs: List[Any],
+        basic_memories: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Determine what additional memories are relevant to the question."""
         # Filter out duplicates with basic memories
         basic_sources = {m.get("source") for m in basic_memories}
         
@@ -99,140 +272,122 @@ class MemoryAnalyzer:
         
         return memories
     
-    def _should_create_memory(self, question: str, user: str) -> Tuple[bool, str]:
-        """Determine if a new memory should be created from this interaction.
+    def _analyze_memory_operations(self, question: str, user: str) -> Tuple[bool, str, List[str]]:
+        """Determine, in one LLM call, whether to create a new memory and which old memories to delete.
+        
+        Results are memoized per (question, user); failed analyses are not cached.
         
         Returns:
-            Tuple of (should_create: bool, memory_content: str)
+            Tuple of (should_create: bool, memory_content: str, memories_to_delete: List[str])
         """
-        prompt = f"""Analyze the following question and determine if it contains information worth remembering for future interactions.
-
-Question: {question}
-User: {user}
-
-Consider:
-1. Does it contain personal preferences, facts, or important information?
-2. Is it a one-time question or something that might be relevant later?
-3. Does it establish context about projects, interests, or ongoing work?
-
-Respond with JSON:
-{{
-    "should_remember": true/false,
-    "reason": "brief explanation",
-    "memory_content": "what to remember (if should_remember is true)"
-}}
-"""
+        key = self._operations_key(question, user)
+        cached = self._cached_operations(key)
+        if cached is not None:
+            return cached
         
         try:
-            messages = [{"role": "user", "content": prompt}]
-            response = self.llm_manager.invoke(messages)
-            
-            if not response or not response.strip():
-                logger.debug("Empty response from LLM for memory creation analysis")
-                return False, ""
-            
-            # Parse JSON response
-            response_text = response.strip()
-            
-            # Remove markdown code blocks if present
-            if response_text.startswith("```json"):
-                response_text = response_text[7:]
-            elif response_text.startswith("```"):
-                response_text = response_text[3:]
-            if response_text.endswith("```"):
-                response_text = response_text[:-3]
-            
-            response_text = response_text.strip()
-            
-            # Find JSON object in response
-            start_idx = response_text.find("{")
-            end_idx = response_text.rfind("}")
-            if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
-                json_str = response_text[start_idx:end_idx + 1]
-                result = json.loads(json_str)
-                should_remember = result.get("should_remember", False)
-                memory_content = result.get("memory_content", "")
-                return should_remember, memory_content
-            else:
-                logger.debug("Could not find JSON object in LLM response for memory creation analysis")
-                return False, ""
-            
-        except json.JSONDecodeError as e:
-            logger.debug(f"JSON parsing error in memory creation analysis: {e}")
-            return False, ""
+            # Stop reading the reply as soon as the JSON object is complete
+            json_str = _first_json_object(self.llm_manager.stream(self._memory_operations_messages(question, user)))
+        except Exception as e:
+            logger.warning(f"Error analyzing memory operations: {e}")
+            return False, "", []
+        return self._store_operations(key, self._parse_memory_operations(json_str))
+    
+    async def _aanalyze_memory_operations(self, question: str, user: str) -> Tuple[bool, str, List[str]]:
+        """Async variant of _analyze_memory_operations."""
+        key = self._operations_key(question, user)
+        cached = self._cached_operations(key)
+        if cached is not None:
+            return cached
+        
+        try:
+            json_str = await _afirst_json_object(self.llm_manager.astream(self._memory_operations_messages(question, user)))
         except Exception as e:
-            logger.warning(f"Error determining memory creation: {e}")
-            return False, ""
+            logger.warning(f"Error analyzing memory operations: {e}")
+            return False, "", []
+        return self._store_operations(key, self._parse_memory_operations(json_str))
     
-    def _determine_memories_to_delete(self, question: str) -> List[str]:
-        """Determine if any old memories should be deleted (e.g., outdated information)."""
-        # This is a simplified version - in practice, you'd want more sophisticated logic
-        # For now, we'll use LLM to identify potentially outdated memories
+    @staticmethod
+    def _operations_key(question: str, user: str) -> bytes:
+        """Cache key for the memory operations analysis of a question."""
+        return hashlib.blake2b(f"{question}\0{user}".encode("utf-8"), digest_size=16).digest()
+    
+    def _cached_operations(self, key: bytes) -> Optional[Tuple[bool, str, List[str]]]:
+        """Return a memoized memory operations analysis, if any."""
+        cached = self._operations_cache.get(key)
+        if cached is not None:
+            self._operations_cache.move_to_end(key)
+            logger.debug("Reusing cached memory analysis")
+        return cached
+    
+    def _store_operations(
+        self,
+        key: bytes,
+        operations: Optional[Tuple[bool, str, List[str]]]
+    ) -> Tuple[bool, str, List[str]]:
+        """Memoize a successful analysis; a failed one (None) means no memory operations."""
+        if operations is None:
+            return False, "", []
         
-        prompt = f"""Analyze the following question and determine if it suggests that any existing memories might be outdated or should be deleted.
+        self._operations_cache[key] = operations
+        if len(self._operations_cache) > self.CACHE_SIZE:
+            self._operations_cache.popitem(last=False)
+        return operations
+    
+    def _memory_operations_messages(self, question: str, user: str) -> List[Dict[str, str]]:
+        """Build the LLM messages for the memory operations analysis."""
+        prompt = f"""Analyze the following question and determine:
+A. If it contains information worth remembering for future interactions.
+B. If it suggests that any existing memories might be outdated or should be deleted.
 
 Question: {question}
+User: {user}
+
+For A, consider:
+1. Does it contain personal preferences, facts, or important information?
+2. Is it a one-time question or something that might be relevant later?
+3. Does it establish context about projects, interests, or ongoing work?
 
-Consider if the question:
+For B, consider if the question:
 1. Contradicts previous information
 2. Indicates a change in preferences or circumstances
 3. Suggests outdated information (e.g., asking for "latest" version implies old version info is outdated)
 4. Requests information that would make previous specific claims incorrect
 
 IMPORTANT: For memory_sources_to_delete, provide:
-- Specific file paths (e.g., "memories/memory_20251117_131316.json") if you know them, OR
+- Specific file paths (e.g., "memories/memory_20251117_131316.jsonl") if you know them, OR
 - Clear content descriptions that can be matched (e.g., "memory about PyTorch version 1.13.1 being latest" or "memory stating specific version number")
 
 Respond with JSON:
 {{
+    "should_remember": true/false,
+    "memory_content": "what to remember (if should_remember is true)",
     "should_delete": true/false,
     "memory_sources_to_delete": ["specific file path or clear content description"] or [],
-    "reason": "brief explanation of why these should be deleted"
+    "reason": "brief explanation of both decisions"
 }}
 """
         
+        return [{"role": "user", "content": prompt}]
+    
+    def _parse_memory_operations(self, json_str: Optional[str]) -> Optional[Tuple[bool, str, List[str]]]:
+        """Parse the LLM's memory operations JSON; returns None if there is none or it is invalid."""
+        if json_str is None:
+            logger.debug("Could not find JSON object in LLM response for memory operations analysis")
+            return None
+        
         try:
-            messages = [{"role": "user", "content": prompt}]
-            response = self.llm_manager.invoke(messages)
-            
-            if not response or not response.strip():
-                logger.debug("Empty response from LLM for memory deletion analysis")
-                return []
-            
-            # Parse JSON response
-            response_text = response.strip()
-            
-            # Remove markdown code blocks if present
-            if response_text.startswith("```json"):
-                response_text = response_text[7:]
-            elif response_text.startswith("```"):
-                response_text = response_text[3:]
-            if response_text.endswith("```"):
-                response_text = response_text[:-3]
-            
-            response_text = response_text.strip()
-            
-            # Find JSON object in response
-            start_idx = response_text.find("{")
-            end_idx = response_text.rfind("}")
-            if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
-                json_str = response_text[start_idx:end_idx + 1]
-                result = json.loads(json_str)
-                memory_sources = result.get("memory_sources_to_delete", [])
-                if memory_sources:
-                    logger.info(f"LLM identified {len(memory_sources)} memory source(s) to delete")
-                return memory_sources
-            else:
-                # No JSON found, return empty list
-                logger.debug("Could not find JSON object in LLM response for memory deletion analysis")
-                return []
-            
-        except json.JSONDecodeError as e:
-            logger.debug(f"JSON parsing error in memory deletion analysis: {e}")
-            return []
-        except Exception as e:
-            logger.warning(f"Error determining memories to delete: {e}")
-            return []
+            result = orjson.loads(json_str)
+        except orjson.JSONDecodeError as e:
+            logger.debug(f"JSON parsing error in memory operations analysis: {e}")
+            return None
+        
+        should_remember = result.get("should_remember", False)
+        memory_content = result.get("memory_content", "") if should_remember else ""
+        memory_sources = result.get("memory_sources_to_delete", []) or []
+        if memory_sources:
+            logger.info(f"LLM identified {len(memory_sources)} memory source(s) to delete")
+        return should_remember, memory_content, memory_sources
     
     def format_memories_for_context(self, memories: List[Dict[str, Any]]) -> str:
         """Format memories as context string for LLM."""
@@ -0,0 +1,181 @@
+"""
+Memory Index
+
+SQLite index from memory contents and source ids to the JSON memory files
+that hold them, so a memory can be found (or recognised as already saved)
+without parsing every file in the repository.
+"""
+
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryIndex:
+    """Maps memory content hashes and source ids to memory files."""
+    
+    def __init__(self, db_path: Union[str, Path]):
+        """
+        Open (or create) the index.
+        
+        Args:
+            db_path: SQLite file holding the index
+        """
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        try:
+            self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+            self._db.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS memories (file TEXT NOT NULL, source TEXT, content_hash BLOB NOT NULL);
+                CREATE INDEX IF NOT EXISTS memories_by_file ON memories (file);
+                CREATE INDEX IF NOT EXISTS memories_by_source ON memories (source);
+                CREATE INDEX IF NOT EXISTS memories_by_content ON memories (content_hash);
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+                """
+            )
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Memory index disabled, could not open {db_path}: {e}")
+            self._db = None
+    
+    @staticmethod
+    def content_hash(content: Any) -> bytes:
+        """Hash of a memory's content, as compared when matching memories."""
+        return hashlib.blake2b(str(content).encode("utf-8"), digest_size=16).digest()
+    
+    def fingerprint(self) -> Optional[str]:
+        """Repository state the index was last built for (None if never built or stale)."""
+        row = self._execute("SELECT value FROM meta WHERE key = 'fingerprint'", fetch=True)
+        return row[0][0] if row else None
+    
+    def set_fingerprint(self, fingerprint: Optional[str]) -> None:
+        """Record the repository state the index matches (None marks it stale)."""
+        if fingerprint is None:
+            self._execute("DELETE FROM meta WHERE key = 'fingerprint'")
+        else:
+            self._execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('fingerprint', ?)", (fingerprint,))
+    
+    def rebuild(self, fingerprint: str, files: Iterable[Tuple[str, List[Dict[str, Any]]]]) -> None:
+        """
+        Replace the whole index.
+        
+        Args:
+            fingerprint: Repository state the files were read from
+            files: (file, memories) pairs for every JSON memory file
+        """
+        rows = [row for file, memories in files for row in self._rows(file, memories)]
+        with self._lock:
+            if self._db is None:
+                return
+            try:
+                with self._db:
+                    self._db.execute("DELETE FROM memories")
+                    self._db.executemany("INSERT INTO memories (file, source, content_hash) VALUES (?, ?, ?)", rows)
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO meta (key, value) VALUES ('fingerprint', ?)", (fingerprint,)
+                    )
+            except sqlite3.Error as e:
+                self._disable(e)
+        logger.info(f"Indexed {len(rows)} memories")
+    
+    def add(self, file: str, memories: List[Dict[str, Any]]) -> None:
+        """Record memories appended to a file."""
+        self._executemany("INSERT INTO memories (file, source, content_hash) VALUES (?, ?, ?)", self._rows(file, memories))
+    
+    def replace(self, file: str, memories: List[Dict[str, Any]]) -> None:
+        """Record a file's full new list of memories (an empty list for a deleted file)."""
+        with self._lock:
+            if self._db is None:
+                return
+            try:
+                with self._db:
+                    self._db.execute("DELETE FROM memories WHERE file = ?", (file,))
+                    self._db.executemany(
+                        "INSERT INTO memories (file, source, content_hash) VALUES (?, ?, ?)",
+                        self._rows(file, memories)
+                    )
+            except sqlite3.Error as e:
+                self._disable(e)
+    
+    def files_for(self, memory_id: str) -> Optional[List[str]]:
+        """
+        Find the files holding a memory.
+        
+        Args:
+            memory_id: A memory's source id or its full content
+        
+        Returns:
+            Files containing a memory with that source or content, or None if the
+            index is unavailable
+        """
+        rows = self._execute(
+            "SELECT DISTINCT file FROM memories WHERE source = ? OR content_hash = ? ORDER BY file",
+            (memory_id, self.content_hash(memory_id)),
+            fetch=True
+        )
+        return None if rows is None else [row[0] for row in rows]
+    
+    def contains_content(self, content: Any) -> bool:
+        """Whether some indexed memory has exactly this content."""
+        rows = self._execute(
+            "SELECT 1 FROM memories WHERE content_hash = ? LIMIT 1", (self.content_hash(content),), fetch=True
+        )
+        return bool(rows)
+    
+    def close(self) -> None:
+        """Close the database connection; later calls treat the index as unavailable."""
+        with self._lock:
+            if self._db is None:
+                return
+            try:
+                self._db.close()
+            except sqlite3.Error as e:
+                logger.warning(f"Error closing memory index: {e}")
+            self._db = None
+    
+    def _rows(self, file: str, memories: List[Dict[str, Any]]) -> List[Tuple[str, Optional[str], bytes]]:
+        """Index rows for a file's memories."""
+        return [
+            (file, memory.get("source"), self.content_hash(memory.get("content", "")))
+            for memory in memories
+            if isinstance(memory, dict)
+        ]
+    
+    def _execute(self, sql: str, params: Tuple = (), fetch: bool = False) -> Optional[List[Tuple]]:
+        """Run one statement; returns its rows if fetch, or None if the index is unavailable."""
+        with self._lock:
+            if self._db is None:
+                return None
+            try:
+                with self._db:
+                    cursor = self._db.execute(sql, params)
+                    return cursor.fetchall() if fetch else []
+            except sqlite3.Error as e:
+                self._disable(e)
+                return None
+    
+    def _executemany(self, sql: str, rows: List[Tuple]) -> None:
+        """Run one statement for many rows."""
+        with self._lock:
+            if self._db is None or not rows:
+                return
+            try:
+                with self._db:
+                    self._db.executemany(sql, rows)
+            except sqlite3.Error as e:
+                self._disable(e)
+    
+    def _disable(self, error: sqlite3.Error) -> None:
+        """Stop using the index after a database error (it may no longer match the files)."""
+        logger.warning(f"Memory index disabled after an error: {error}")
+        try:
+            self._db.close()
+        except sqlite3.Error:
+            pass
+        self._db = None
@@ -4,13 +4,17 @@ Memory Store using LangChain for vector storage and retrieval.
 Uses cloud-based embeddings for GitHub Actions compatibility (no CUDA required).
 """
 
-import json
 import re
+import hashlib
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import logging
 
+import numpy as np
+import orjson
+import xxhash
+
 # Try to use langchain-chroma if available, otherwise fall back to langchain_community
 try:
     from langchain_chroma import Chroma
@@ -29,13 +33,39 @@ from langchain_core.embeddings import Embeddings
 GoogleGenerativeAIEmbeddings = None
 
 from assistant.core.config import Config, LLMProvider
+from assistant.memory.embedding_cache import CachedEmbeddings
+from assistant.memory.similarity_cache import SimilarityCache
 
 logger = logging.getLogger(__name__)
 
+# Word pattern and stop words used by the keyword embedding fallback
+_KEYWORD_RE = re.compile(r'\b[a-z0-9]+\b')
+KEYWORD_STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
+    'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did',
+    'will', 'would', 'should', 'could', 'may', 'might', 'must', 'can', 'this', 'that', 'these', 'those'
+})
+
 
 class MemoryStore:
     """Manages memory storage and retrieval using vector embeddings."""
     
+    # Chunks embedded per embedding-model request when adding memories
+    # (well under provider limits such as OpenAI's 2048 inputs per request)
+    EMBEDDING_BATCH_SIZE = 512
+    
+    # Maximum number of embeddings kept in memory (older ones stay in the on-disk cache)
+    EMBEDDING_CACHE_SIZE = 4096
+    
+    # HNSW graph parameters for the memories collection (applied when the collection is
+    # created): more neighbours per node and a wider candidate list than Chroma's defaults
+    # keep approximate search recall high as the memory repository grows
+    HNSW_METADATA = {
+        "hnsw:M": 32,
+        "hnsw:construction_ef": 200,
+        "hnsw:search_ef": 64,
+    }
+    
     def __init__(self, config: Config, persist_directory: str = "./memory_store"):
         """
         Initialize the memory store.
@@ -50,11 +80,23 @@ class MemoryStore:
         
         # Initialize embeddings
         self._initialize_embeddings()
+        keyword_embeddings = isinstance(self.embeddings, SimpleKeywordEmbeddings)
+        self._cache_embeddings()
+        # Recent searches, reused for near-duplicate queries
+        self.search_cache = SimilarityCache()
         
         # Initialize vector store
         self.vector_store: Optional[Chroma] = None
         self._initialize_vector_store()
         
+        # IDs of the stored chunks; a chunk's ID is the digest of its source and content,
+        # so chunks that are already stored are not embedded and added again
+        self._chunk_ids: set = set()
+        # With keyword embeddings, searches scan an in-memory matrix of every chunk
+        # embedding instead of Chroma: (embeddings, documents), replaced atomically
+        self._keyword_index: Optional[Tuple[np.ndarray, List[Document]]] = None
+        self._load_stored_chunks(keyword_embeddings)
+        
         # Text splitter
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=1000,
@@ -120,13 +162,35 @@ class MemoryStore:
         else:
             raise ValueError(f"Unknown embedding provider: {embedding_provider}. Use 'openai', 'gemini', 'simple', or 'auto'")
     
+    def _cache_embeddings(self) -> None:
+        """
+        Wrap the embedding model so repeated texts are not embedded again.
+        
+        Vectors from cloud models are persisted next to the vector store, so
+        repeated queries skip the embedding API across restarts. The keyword
+        fallback is cheaper to recompute than to read from disk and is only
+        cached in memory.
+        """
+        model = getattr(self.embeddings, "model", "")
+        namespace = f"{type(self.embeddings).__name__}:{model}"
+        cache_path = None
+        if not isinstance(self.embeddings, SimpleKeywordEmbeddings):
+            cache_path = self.persist_directory / "embedding_cache.sqlite3"
+        self.embeddings = CachedEmbeddings(
+            self.embeddings,
+            cache_path=cache_path,
+            namespace=namespace,
+            maxsize=self.EMBEDDING_CACHE_SIZE
+        )
+    
     def _initialize_vector_store(self) -> None:
         """Initialize or load the vector store."""
         try:
             self.vector_store = Chroma(
                 persist_directory=str(self.persist_directory),
                 embedding_function=self.embeddings,
-                collection_name="memories"
+                collection_name="memories",
+                collection_metadata=self.HNSW_METADATA
             )
             logger.info("Vector store initialized")
         except Exception as e:
@@ -134,9 +198,64 @@ class MemoryStore:
             # Create new store
             self.vector_store = Chroma(
                 embedding_function=self.embeddings,
-                collection_name="memories"
+                collection_name="memories",
+                collection_metadata=self.HNSW_METADATA
             )
     
+    def _load_stored_chunks(self, keyword_embeddings: bool) -> None:
+        """
+        Read the IDs of the chunks already in the collection, in one pass.
+        
+        Args:
+            keyword_embeddings: Also build the in-memory keyword index from the stored chunks
+        """
+        include = []
+        if keyword_embeddings:
+            include = ["embeddings", "documents", "metadatas"]
+            dim = self.embeddings.inner.embedding_dim
+            self._keyword_index = (np.zeros((0, dim), dtype=np.float32), [])
+        try:
+            raw = self.vector_store._collection.get(include=include)
+        except Exception as e:
+            logger.warning(f"Could not read the stored memory chunks: {e}")
+            return
+        
+        self._chunk_ids.update(raw["ids"])
+        if keyword_embeddings and raw["ids"]:
+            self._extend_keyword_index(
+                raw["embeddings"],
+                [
+                    Document(page_content=content, metadata=metadata or {})
+                    for content, metadata in zip(raw["documents"], raw["metadatas"], strict=True)
+                ]
+            )
+    
+    def _extend_keyword_index(self, embeddings: List[List[float]], documents: List[Document]) -> None:
+        """Append chunk embeddings and their documents to the keyword index."""
+        matrix, indexed = self._keyword_index
+        self._keyword_index = (
+            np.vstack([matrix, np.asarray(embeddings, dtype=np.float32)]),
+            indexed + documents
+        )
+    
+    def _search_keyword_index(self, embedding: List[float], k: int) -> List[Document]:
+        """
+        Find the k chunks closest to a query in the keyword index.
+        
+        Keyword embeddings are unit length, so a single matrix-vector product gives
+        the cosine similarity of the query with every chunk.
+        """
+        matrix, documents = self._keyword_index
+        if not documents:
+            return []
+        
+        scores = matrix @ np.asarray(embedding, dtype=np.float32)
+        if k < len(documents):
+            top = np.argpartition(-scores, k)[:k]
+        else:
+            top = np.arange(len(documents))
+        return [documents[i] for i in top[np.argsort(-scores[top], kind="stable")]]
+    
     def add_memories(self, memories: List[Dict[str, Any]]) -> None:
         """
         Add memories to the vector store.
@@ -148,13 +267,12 @@ class MemoryStore:
             return
         
         documents = []
-        metadatas = []
         
         for memory in memories:
             # Extract content
             content = memory.get("content", "")
             if isinstance(content, dict):
-                content = json.dumps(content, ensure_ascii=False)
+                content = orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS).decode()
             
             # Create document
             doc = Document(
@@ -165,37 +283,101 @@ class MemoryStore:
                     "file_type": memory.get("file_type", "unknown")
                 }
             )
+            # Chunks of a long memory link back to the memory they came from
+            if memory.get("parent"):
+                doc.metadata["parent"] = memory["parent"]
             
             documents.append(doc)
-            metadatas.append(doc.metadata)
         
         # Split documents if needed
-        split_docs = []
-        for doc in documents:
-            splits = self.text_splitter.split_documents([doc])
-            split_docs.extend(splits)
+        split_docs = self.text_splitter.split_documents(documents)
+        
+        # Skip chunks that are already stored (e.g. memories reloaded from the repository)
+        chunk_ids = []
+        new_docs = []
+        for doc in split_docs:
+            chunk_id = self._chunk_id(doc)
+            if chunk_id not in self._chunk_ids:
+                self._chunk_ids.add(chunk_id)
+                chunk_ids.append(chunk_id)
+                new_docs.append(doc)
+        if len(new_docs) < len(split_docs):
+            logger.info(f"Skipped {len(split_docs) - len(new_docs)} memory chunks already in vector store")
+        split_docs = new_docs
         
-        # Add to vector store
+        # Cached searches do not know about the new memories
+        self.search_cache.clear()
+        
+        # Embed each batch of chunks with a single model call and hand the vectors
+        # straight to the collection, so Chroma does not embed them again
+        for start in range(0, len(split_docs), self.EMBEDDING_BATCH_SIZE):
+            batch = split_docs[start:start + self.EMBEDDING_BATCH_SIZE]
+            texts = [doc.page_content for doc in batch]
+            embeddings = self.embeddings.embed_documents(texts)
+            self.vector_store._collection.add(
+                ids=chunk_ids[start:start + self.EMBEDDING_BATCH_SIZE],
+                embeddings=embeddings,
+                documents=texts,
+                metadatas=[doc.metadata for doc in batch]
+            )
+            if self._keyword_index is not None:
+                self._extend_keyword_index(embeddings, batch)
         if split_docs:
-            self.vector_store.add_documents(split_docs)
             logger.info(f"Added {len(split_docs)} memory chunks to vector store")
     
-    def search_memories(self, query: str, k: int = 5) -> List[Document]:
+    @staticmethod
+    def _chunk_id(doc: Document) -> str:
+        """Collection ID of a chunk: a digest of its source and content."""
+        key = f"{doc.metadata.get('source', 'unknown')}\0{doc.page_content}"
+        return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+    
+    def embed_query(self, text: str) -> Optional[List[float]]:
+        """
+        Embed a query, reusing the embedding of previously seen queries.
+        
+        Args:
+            text: Query text
+            
+        Returns:
+            Embedding vector, or None if the embedding model failed
+        """
+        try:
+            return self.embeddings.embed_query(text)
+        except Exception as e:
+            logger.warning(f"Failed to embed query: {e}")
+            return None
+    
+    def search_memories(self, query: str, k: int = 5, embedding: Optional[List[float]] = None) -> List[Document]:
         """
         Search for relevant memories.
         
         Args:
             query: Search query
             k: Number of results to return
+            embedding: Precomputed query embedding (looked up or computed if not given)
             
         Returns:
-            List of relevant document chunks
+            List of relevant document chunks (empty if the query could not be embedded)
         """
         if not self.vector_store:
             return []
         
         try:
-            results = self.vector_store.similarity_search(query, k=k)
+            if embedding is None:
+                embedding = self.embed_query(query)
+            if embedding is None:
+                # similarity_search would only ask the same failing model to embed the query again
+                return []
+            
+            results = self.search_cache.lookup(embedding, k)
+            if results is not None:
+                logger.info(f"Reused {len(results)} cached memories for similar query: {query[:50]}")
+                return results
+            if self._keyword_index is not None:
+                results = self._search_keyword_index(embedding, k)
+            else:
+                results = self.vector_store.similarity_search_by_vector(embedding, k=k)
+            self.search_cache.insert(embedding, k, results)
             logger.info(f"Found {len(results)} relevant memories for query: {query[:50]}")
             return results
         except Exception as e:
@@ -208,9 +390,12 @@ class MemoryStore:
             return []
         
         try:
-            # Get all documents (this might be memory intensive for large stores)
-            results = self.vector_store.similarity_search("", k=10000)  # Large k to get all
-            return results
+            # Read the collection directly: no query embedding and no nearest-neighbour search
+            raw = self.vector_store._collection.get(include=["documents", "metadatas"])
+            return [
+                Document(page_content=content, metadata=metadata or {})
+                for content, metadata in zip(raw["documents"], raw["metadatas"], strict=True)
+            ]
         except Exception as e:
             logger.error(f"Error retrieving all memories: {e}")
             return []
@@ -241,7 +426,7 @@ class SimpleKeywordEmbeddings(Embeddings):
     
     def __init__(self):
         """Initialize simple keyword embeddings."""
-        self.embedding_dim = 128  # Fixed dimension for compatibility
+        self.embedding_dim = 128  # Fixed dimension for compatibility (must be a power of two)
     
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
         """
@@ -253,14 +438,7 @@ class SimpleKeywordEmbeddings(Embeddings):
         Returns:
             List of embedding vectors
         """
-        embeddings = []
-        for text in texts:
-            # Extract keywords (simple word-based)
-            words = self._extract_keywords(text)
-            # Create a simple embedding vector
-            embedding = self._words_to_embedding(words)
-            embeddings.append(embedding)
-        return embeddings
+        return self._embed_array(texts).tolist()
     
     def embed_query(self, text: str) -> List[float]:
         """
@@ -272,42 +450,48 @@ class SimpleKeywordEmbeddings(Embeddings):
         Returns:
             Embedding vector
         """
-        words = self._extract_keywords(text)
-        return self._words_to_embedding(words)
+        return self._embed_array([text])[0].tolist()
     
     def _extract_keywords(self, text: str) -> List[str]:
         """Extract keywords from text."""
         # Simple word extraction (lowercase, alphanumeric)
-        words = re.findall(r'\b[a-z0-9]+\b', text.lower())
+        words = _KEYWORD_RE.findall(text.lower())
         # Filter out very short words and common stop words
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'should', 'could', 'may', 'might', 'must', 'can', 'this', 'that', 'these', 'those'}
-        keywords = [w for w in words if len(w) > 2 and w not in stop_words]
+        keywords = [w for w in words if len(w) > 2 and w not in KEYWORD_STOP_WORDS]
         return keywords[:50]  # Limit to top 50 keywords
     
-    def _words_to_embedding(self, words: List[str]) -> List[float]:
+    def _embed_array(self, texts: List[str]) -> np.ndarray:
         """
-        Convert keywords to a simple embedding vector.
+        Embed texts into one contiguous float32 matrix, one row per text.
         
-        Uses a hash-based approach to create a fixed-size vector.
+        Uses a hash-based approach to create fixed-size vectors: every keyword
+        adds a weight to a hashed position of its text's row. The rows are only
+        converted to lists at the Embeddings API boundary.
         """
-        import hashlib
-        
-        # Create a vector based on keyword hashes
-        embedding = [0.0] * self.embedding_dim
-        
-        for word in words:
-            # Hash the word to get consistent positions
-            hash_val = int(hashlib.md5(word.encode()).hexdigest(), 16)
-            # Map to embedding dimension
-            idx = hash_val % self.embedding_dim
-            # Add weight based on word length (longer words might be more important)
-            weight = min(len(word) / 10.0, 1.0)
-            embedding[idx] += weight
-        
-        # Normalize the vector
-        norm = sum(x * x for x in embedding) ** 0.5
-        if norm > 0:
-            embedding = [x / norm for x in embedding]
-        
-        return embedding
-
+        # Extract keywords (simple word-based) for every text, remembering each word's row
+        words: List[str] = []
+        rows: List[int] = []
+        for row, text in enumerate(texts):
+            keywords = self._extract_keywords(text)
+            words.extend(keywords)
+            rows.extend([row] * len(keywords))
+        
+        # Hash each word to a consistent position in the embedding dimension
+        # (a power of two, so masking the low bits picks the bucket)
+        mask = self.embedding_dim - 1
+        idxs = np.fromiter(
+            (xxhash.xxh3_64_intdigest(word.encode()) & mask for word in words),
+            dtype=np.int64,
+            count=len(words)
+        )
+        idxs += np.asarray(rows, dtype=np.int64) * self.embedding_dim
+        # Weight based on word length (longer words might be more important)
+        weights = np.minimum(np.fromiter(map(len, words), dtype=np.float32, count=len(words)) / 10.0, 1.0)
+        embeddings = np.bincount(idxs, weights=weights, minlength=len(texts) * self.embedding_dim)
+        embeddings = embeddings.astype(np.float32).reshape(len(texts), self.embedding_dim)
+        
+        # Normalize the vectors (texts without keywords keep an all-zero row)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        np.divide(embeddings, norms, out=embeddings, where=norms > 0)
+        
+        return embeddings
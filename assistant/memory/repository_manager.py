@@ -5,20 +5,133 @@ Handles cloning and managing the private memory repository.
 """
 
 import os
+import re
+import mmap
+import asyncio
+import time
+import random
 import shutil
-import json
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Callable, Optional, Tuple, TypeVar
+import orjson
 from git import Repo, GitCommandError
 import logging
 
+from .memory_index import MemoryIndex
+
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+
+# Git failures worth retrying: network and server hiccups, not auth or missing repos
+_TRANSIENT_GIT_ERROR_RE = re.compile(
+    r"timed out|could not resolve|early EOF|RPC failed|HTTP 5\d\d|connection reset",
+    re.IGNORECASE
+)
+
+# JSON memory files larger than this (in bytes) are parsed from a memory map
+MMAP_THRESHOLD = 64 * 1024
+
+# Extensions of memory files (any file inside a "memories" directory is one too)
+MEMORY_FILE_EXTENSIONS = frozenset({"json", "jsonl", "md", "txt", "yaml", "yml"})
+
+# Suffixes of memory files holding a list of memories: a JSON array, or JSON Lines
+# (one memory per line, so saving a memory appends instead of rewriting the file)
+JSON_MEMORY_SUFFIXES = (".json", ".jsonl")
+
+# Directories never searched for memory files
+EXCLUDED_DIRS = frozenset({".git", ".github", "node_modules", "__pycache__"})
+
+
+def _git_env() -> Dict[str, str]:
+    """Environment for git commands: never prompt for credentials (CI/CD)."""
+    env = os.environ.copy()
+    env['GIT_TERMINAL_PROMPT'] = '0'
+    env['GIT_ASKPASS'] = 'echo'
+    return env
+
+
+def _read_json(file_path: Path) -> Any:
+    """Parse a JSON memory file.
+    
+    Files above MMAP_THRESHOLD bytes are parsed straight from a memory map, which
+    skips copying the whole file into a bytes object first.
+    """
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size <= MMAP_THRESHOLD:
+            return orjson.loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                return orjson.loads(view)
+            finally:
+                view.release()
+
+
+def _write_json(file_path: Path, data: Any) -> None:
+    """Write a JSON memory file (UTF-8, two-space indent, like the files already in the repo).
+    
+    Non-string keys are written as strings, as the json module did.
+    """
+    file_path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+
+
+def _parse_jsonl(contents: bytes) -> List[Any]:
+    """Parse JSON Lines memory file contents (blank lines are skipped)."""
+    return [orjson.loads(line) for line in contents.splitlines() if line.strip()]
+
+
+def _dump_jsonl(items: List[Any]) -> bytes:
+    """Serialize items as JSON Lines, one item per line."""
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+    return b"".join(orjson.dumps(item, option=option) for item in items)
+
+
+def _append_jsonl(file_path: Path, items: List[Any]) -> None:
+    """Append items to a JSON Lines memory file without reading or rewriting it."""
+    data = _dump_jsonl(items)
+    with open(file_path, "a+b") as f:
+        # A hand-edited file may lack its final newline; keep the first new item on its own line
+        if f.seek(0, os.SEEK_END):
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                data = b"\n" + data
+        f.write(data)
+
+
+def _read_memory_list(file_path: Path) -> Any:
+    """Parse a JSON or JSON Lines memory file."""
+    if file_path.suffix == ".jsonl":
+        return _parse_jsonl(file_path.read_bytes())
+    return _read_json(file_path)
+
+
+def _write_memory_list(file_path: Path, memories: List[Dict[str, Any]]) -> None:
+    """Write a list of memories in the JSON or JSON Lines format of its file."""
+    if file_path.suffix == ".jsonl":
+        file_path.write_bytes(_dump_jsonl(memories))
+    else:
+        _write_json(file_path, memories)
+
 
 class MemoryRepositoryManager:
     """Manages the memory repository cloning and operations."""
     
-    def __init__(self, repo_url: str, repo_path: str, token: Optional[str] = None):
+    # Repository updates between runs of git gc
+    GC_INTERVAL = 20
+    
+    # Threads reading and parsing memory files in load_memories
+    LOAD_WORKERS = min(32, (os.cpu_count() or 4) * 4)
+    
+    # Memory files needed before load_memories streams them from git; below this
+    # the git process startup costs more than the per-file opens it saves
+    BLOB_BATCH_MIN_FILES = 512
+    
+    def __init__(self, repo_url: str, repo_path: str, token: Optional[str] = None, sparse: bool = False):
         """
         Initialize the memory repository manager.
         
@@ -26,11 +139,24 @@ class MemoryRepositoryManager:
             repo_url: URL of the memory repository
             repo_path: Local path to clone/manage the repository
             token: Authentication token for private repositories
+            sparse: Check out only the top-level files and the memories/ directory
+                when cloning. Opt-in: memory files in any other directory are then
+                not materialized and load_memories does not see them
         """
         self.repo_url = repo_url
         self.repo_path = Path(repo_path)
+        # Length of the "<repo_path>/" prefix of the paths built from repo_path
+        # (Path drops a leading "./", so a "." root adds no prefix)
+        root = str(self.repo_path)
+        self._root_prefix_len = 0 if root == "." else len(root) + 1
         self.token = token
+        self.sparse = sparse
+        # GitPython handle, only created when committing; reads use the git CLI
         self.repo: Optional[Repo] = None
+        # (fingerprint, memories) of the last load_memories call
+        self._memories_cache: Optional[Tuple[str, List[Dict[str, Any]]]] = None
+        # Content/source -> file index in .git/memory_index.db (opened on first use)
+        self._memory_index: Optional[MemoryIndex] = None
         
         # Prepare URL with token if provided
         self._prepare_repo_url()
@@ -43,6 +169,55 @@ class MemoryRepositoryManager:
                 return f"{parts[0][:10]}***@{parts[1]}"
         return url
     
+    def _git(self, *args: str) -> str:
+        """
+        Run a git CLI command without credential prompts.
+        
+        Returns:
+            The command's standard output
+            
+        Raises:
+            GitCommandError: If the command fails (the token is masked in the error)
+        """
+        try:
+            result = subprocess.run(
+                ['git', *args],
+                check=True,
+                capture_output=True,
+                text=True,
+                env=_git_env()
+            )
+        except subprocess.CalledProcessError as e:
+            command = ['git', *(self._mask_url(arg) for arg in args)]
+            stderr = e.stderr.replace(self.token, "***") if self.token else e.stderr
+            raise GitCommandError(command, e.returncode, stderr) from None
+        return result.stdout
+    
+    def _retry(self, fn: Callable[[], T], *, attempts: int = 4, base: float = 0.5) -> T:
+        """
+        Call a git network operation, retrying transient failures.
+        
+        Sleeps with exponential backoff and full jitter between attempts;
+        non-transient errors (authentication, missing repository) are raised at once.
+        
+        Args:
+            fn: Operation to run
+            attempts: Maximum number of attempts
+            base: Backoff base in seconds
+            
+        Returns:
+            The operation's result
+        """
+        for attempt in range(attempts):
+            try:
+                return fn()
+            except GitCommandError as e:
+                if attempt == attempts - 1 or not _TRANSIENT_GIT_ERROR_RE.search(str(e)):
+                    raise
+                delay = random.uniform(0, base * 2 ** attempt)
+                logger.warning(f"Transient git failure (attempt {attempt + 1}/{attempts}), retrying in {delay:.1f}s: {e}")
+                time.sleep(delay)
+    
     def _prepare_repo_url(self) -> None:
         """Prepare repository URL with authentication token if needed."""
         if not self.token:
@@ -91,6 +266,12 @@ class MemoryRepositoryManager:
         Returns:
             True if successful, False otherwise
         """
+        self.invalidate_memories_cache()
+        if self._memory_index is not None:
+            # The update may discard uncommitted files the index still lists
+            self._memory_index.set_fingerprint(None)
+            self._memory_index.close()
+            self._memory_index = None
         try:
             if force_clone and self.repo_path.exists():
                 logger.info(f"Removing existing repository at {self.repo_path}")
@@ -100,39 +281,24 @@ class MemoryRepositoryManager:
                 # Log the masked URL for security
                 masked_url = self._mask_url(self.repo_url)
                 logger.info(f"Cloning memory repository from {masked_url}")
-                logger.debug(f"Full repo URL format: https://TOKEN@github.com/user/repo")
-                # Configure Git to avoid credential prompts in CI/CD
-                import subprocess
-                import os
-                
-                # Set Git environment variables to avoid interactive prompts
-                env = os.environ.copy()
-                env['GIT_TERMINAL_PROMPT'] = '0'
-                env['GIT_ASKPASS'] = 'echo'
-                
-                # Configure Git globally to avoid prompts
-                subprocess.run(
-                    ['git', 'config', '--global', 'credential.helper', 'store'],
-                    check=False,
-                    capture_output=True,
-                    env=env
-                )
-                
-                # Clone repository
-                # Note: GitPython's clone_from doesn't support env parameter directly,
-                # so we set environment variables before calling it
-                original_env = {}
-                for key in ['GIT_TERMINAL_PROMPT', 'GIT_ASKPASS']:
-                    if key in env:
-                        original_env[key] = os.environ.get(key)
-                        os.environ[key] = env[key]
+                logger.debug("Full repo URL format: https://TOKEN@github.com/user/repo")
                 
+                # The token travels in the URL and _git_env() disables prompts, so no
+                # credential helper (or global git config change) is needed
                 try:
-                    # Log the actual URL format for debugging (masked)
-                    logger.debug(f"Attempting to clone with URL format: https://TOKEN@github.com/...")
-                    self.repo = Repo.clone_from(self.repo_url, self.repo_path)
+                    # Only HEAD is ever read: fetch a single commit of a single branch,
+                    # and only the blobs its checkout needs
+                    clone_args = ['clone', '--depth=1', '--filter=blob:none', '--single-branch']
+                    if self.sparse:
+                        clone_args.append('--no-checkout')
+                    self._retry(lambda: self._git(*clone_args, self.repo_url, str(self.repo_path)))
+                    if self.sparse:
+                        # Cone mode keeps the top-level files (e.g. dynamic_memory.json);
+                        # the checkout then fetches only the blobs inside the cone
+                        self._git('-C', str(self.repo_path), 'sparse-checkout', 'set', '--cone', 'memories')
+                        self._retry(lambda: self._git('-C', str(self.repo_path), 'checkout'))
                     logger.info(f"Repository cloned successfully to {self.repo_path}")
-                except Exception as clone_error:
+                except GitCommandError as clone_error:
                     # Log more details about the error
                     error_msg = str(clone_error)
                     logger.error(f"Failed to clone repository: {error_msg}")
@@ -150,51 +316,24 @@ class MemoryRepositoryManager:
                             if not (self.token.startswith("ghp_") or self.token.startswith("github_pat_") or len(self.token) > 20):
                                 logger.warning("Token format might be incorrect. GitHub tokens usually start with 'ghp_' or 'github_pat_'")
                     raise
-                finally:
-                    # Restore original environment
-                    for key, value in original_env.items():
-                        if value is None:
-                            os.environ.pop(key, None)
-                        else:
-                            os.environ[key] = value
             else:
                 logger.info(f"Updating existing repository at {self.repo_path}")
-                self.repo = Repo(self.repo_path)
                 
                 # Update remote URL if token changed
                 if self.token:
-                    origin = self.repo.remotes.origin
-                    current_url = origin.url
+                    current_url = self._git('-C', str(self.repo_path), 'remote', 'get-url', 'origin').strip()
                     if self.token not in current_url:
                         # Update remote URL with token
-                        new_url = self.repo_url
-                        origin.set_url(new_url)
+                        self._git('-C', str(self.repo_path), 'remote', 'set-url', 'origin', self.repo_url)
                         logger.debug("Updated remote URL with token")
                 
-                # Pull latest changes with environment to avoid prompts
-                import os
-                env = os.environ.copy()
-                env['GIT_TERMINAL_PROMPT'] = '0'
-                env['GIT_ASKPASS'] = 'echo'
-                
-                # Set environment variables for Git operations
-                original_env = {}
-                for key in ['GIT_TERMINAL_PROMPT', 'GIT_ASKPASS']:
-                    if key in env:
-                        original_env[key] = os.environ.get(key)
-                        os.environ[key] = env[key]
-                
-                try:
-                    origin = self.repo.remotes.origin
-                    origin.pull()
-                    logger.info("Repository updated successfully")
-                finally:
-                    # Restore original environment
-                    for key, value in original_env.items():
-                        if value is None:
-                            os.environ.pop(key, None)
-                        else:
-                            os.environ[key] = value
+                # Move to the remote's latest commit of the checked-out branch without
+                # fetching its history or merging
+                branch = self._git('-C', str(self.repo_path), 'rev-parse', '--abbrev-ref', 'HEAD').strip()
+                self._retry(lambda: self._git('-C', str(self.repo_path), 'fetch', '--depth=1', 'origin', branch))
+                self._git('-C', str(self.repo_path), 'reset', '--hard', 'FETCH_HEAD')
+                logger.info("Repository updated successfully")
+                self._maybe_gc()
             
             return True
             
@@ -205,34 +344,99 @@ class MemoryRepositoryManager:
             logger.error(f"Error managing repository: {e}")
             return False
     
+    async def aclone_or_update(self, force_clone: bool = False) -> bool:
+        """Clone or update the repository without blocking the event loop (see clone_or_update)."""
+        return await asyncio.to_thread(self.clone_or_update, force_clone)
+    
+    def _maybe_gc(self) -> None:
+        """
+        Garbage-collect the local repository on every GC_INTERVAL-th update.
+        
+        Each shallow update leaves the previous commits unreachable; pruning them
+        keeps the object database small. The update count is kept in .git so it
+        survives restarts.
+        """
+        counter_path = self.repo_path / ".git" / "memory_agent_gc_counter"
+        try:
+            count = int(counter_path.read_text()) + 1
+        except (OSError, ValueError):
+            count = 1
+        
+        if count >= self.GC_INTERVAL:
+            try:
+                self._git('-C', str(self.repo_path), 'gc', '--prune=now', '--quiet')
+                logger.info("Garbage-collected the memory repository")
+            except GitCommandError as e:
+                logger.warning(f"git gc failed: {e}")
+            count = 0
+        
+        try:
+            counter_path.write_text(str(count))
+        except OSError as e:
+            logger.debug(f"Could not record repository update count: {e}")
+    
+    def invalidate_memories_cache(self) -> None:
+        """Forget the memories returned by the last load_memories call."""
+        self._memories_cache = None
+    
+    def _memories_fingerprint(self) -> str:
+        """
+        Identify the repository's current contents for the load_memories cache.
+        
+        Uses the HEAD commit; outside a git checkout, falls back to the newest
+        modification time in the tree. Uncommitted edits made through this
+        manager invalidate the cache explicitly.
+        """
+        try:
+            return self._git('-C', str(self.repo_path), 'rev-parse', 'HEAD').strip()
+        except (GitCommandError, OSError):
+            mtimes = (p.stat().st_mtime_ns for p in self.repo_path.rglob('*') if ".git" not in p.parts)
+            return f"mtime:{max(mtimes, default=0)}"
+    
     def get_memory_files(self) -> List[Path]:
         """Get all memory files from the repository."""
         if not self.repo_path.exists():
             return []
         
         memory_files = []
-        # Look for common memory file patterns
-        patterns = ["*.json", "*.md", "*.txt", "memories/*", "*.yaml", "*.yml"]
-        
-        for pattern in patterns:
-            memory_files.extend(self.repo_path.rglob(pattern))
-        
-        # Filter out .git directory and other non-memory files
-        memory_files = [
-            f for f in memory_files
-            if ".git" not in str(f) and f.is_file()
-        ]
-        # Filter out duplicated memory files
-        memory_files = list(set(memory_files))
+        # Walk the tree once, skipping excluded directories instead of descending
+        # into them; a file is a memory file if it has a memory extension or sits
+        # in a "memories" directory (git metadata files such as .gitkeep aside)
+        stack = [str(self.repo_path)]
+        while stack:
+            directory = stack.pop()
+            in_memories_dir = os.path.basename(directory) == "memories"
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        if name not in EXCLUDED_DIRS:
+                            stack.append(entry.path)
+                    elif in_memories_dir:
+                        if not name.startswith(".git") and entry.is_file():
+                            memory_files.append(Path(entry.path))
+                    elif "." in name and name.rpartition(".")[2] in MEMORY_FILE_EXTENSIONS and entry.is_file():
+                        memory_files.append(Path(entry.path))
         return memory_files
     
     def load_memories(self) -> List[Dict[str, Any]]:
         """
         Load all memories from the repository.
         
+        The result is reused until the repository changes (a new HEAD commit, or
+        a memory saved, written or deleted through this manager).
+        
         Returns:
             List of memory dictionaries
         """
+        if not self.repo_path.exists():
+            return []
+        
+        fingerprint = self._memories_fingerprint()
+        if self._memories_cache is not None and self._memories_cache[0] == fingerprint:
+            logger.debug("Reusing memories loaded for the current repository state")
+            return list(self._memories_cache[1])
+        
         memories = []
         memory_files = self.get_memory_files()
         
@@ -240,55 +444,219 @@ class MemoryRepositoryManager:
         dynamic_memory_path = self.repo_path / "dynamic_memory.json"
         if dynamic_memory_path.exists() and dynamic_memory_path not in memory_files:
             try:
-                with open(dynamic_memory_path, "r", encoding="utf-8") as f:
-                    dynamic_data = json.load(f)
-                    if isinstance(dynamic_data, dict) and "integrated_info" in dynamic_data:
-                        # Add dynamic memory as a special memory
-                        memories.append({
-                            "content": dynamic_data.get("integrated_info", ""),
-                            "source": "dynamic_memory.json",
-                            "timestamp": dynamic_data.get("last_updated", ""),
-                            "file_type": "dynamic",
-                            "memory_type": "integrated"
-                        })
-                        logger.info("Loaded dynamic memory file")
+                dynamic_data = _read_json(dynamic_memory_path)
+                if isinstance(dynamic_data, dict) and "integrated_info" in dynamic_data:
+                    # Add dynamic memory as a special memory
+                    memories.append({
+                        "content": dynamic_data.get("integrated_info", ""),
+                        "source": "dynamic_memory.json",
+                        "timestamp": dynamic_data.get("last_updated", ""),
+                        "file_type": "dynamic",
+                        "memory_type": "integrated"
+                    })
+                    logger.info("Loaded dynamic memory file")
             except Exception as e:
                 logger.warning(f"Error loading dynamic memory: {e}")
         
+        # Skip dynamic_memory.json as it's handled separately
+        memory_files = [f for f in memory_files if f.name != "dynamic_memory.json"]
+        
+        # Files committed unchanged at HEAD are streamed from git in one batch;
+        # the rest (new, modified or outside a checkout) are read from disk
+        blobs = self._read_head_blobs(memory_files) if len(memory_files) >= self.BLOB_BATCH_MIN_FILES else {}
+        parsed = [
+            (file_path, self._parse_memory_file(file_path, blobs[file_path]))
+            for file_path in memory_files if file_path in blobs
+        ]
+        
+        memory_files = [f for f in memory_files if f not in blobs]
+        # Reading and parsing files is I/O-bound; overlap it across worker threads
+        # (map keeps the files' order)
+        if len(memory_files) > 1:
+            workers = min(self.LOAD_WORKERS, len(memory_files))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="memory-loader") as executor:
+                parsed.extend(zip(memory_files, executor.map(self._parse_memory_file, memory_files), strict=True))
+        else:
+            parsed.extend((file_path, self._parse_memory_file(file_path)) for file_path in memory_files)
+        
+        for _, file_memories in parsed:
+            memories.extend(file_memories)
+        
+        logger.info(f"Loaded {len(memories)} memories from repository")
+        self._memories_cache = (fingerprint, memories)
+        
+        # Every file has just been parsed; rebuild the memory index if it is stale
+        index = self._open_memory_index()
+        if index is not None and index.fingerprint() != fingerprint:
+            index.rebuild(fingerprint, [
+                (self._relative_source(file_path), file_memories)
+                for file_path, file_memories in parsed
+                if file_path.suffix in JSON_MEMORY_SUFFIXES
+            ])
+        return list(memories)
+    
+    def _open_memory_index(self) -> Optional[MemoryIndex]:
+        """The repository's memory index, or None outside a git checkout."""
+        if self._memory_index is None and (self.repo_path / ".git").is_dir():
+            self._memory_index = MemoryIndex(self.repo_path / ".git" / "memory_index.db")
+        return self._memory_index
+    
+    def _current_memory_index(self) -> Optional[MemoryIndex]:
+        """The memory index, rebuilt first if it does not match the repository."""
+        index = self._open_memory_index()
+        if index is not None and index.fingerprint() != self._memories_fingerprint():
+            self.invalidate_memories_cache()
+            self.load_memories()
+        return index
+    
+    def find_memory_files(self, memory_id: str) -> Optional[List[str]]:
+        """
+        Find the JSON memory files holding a memory, without parsing every file.
+        
+        Args:
+            memory_id: A memory's source id or its full content
+            
+        Returns:
+            Source paths (relative to repo root) of the files containing a memory
+            with that source or content, or None if the index is unavailable
+        """
+        index = self._current_memory_index()
+        if index is None:
+            return None
+        return index.files_for(memory_id)
+    
+    async def aload_memories(self) -> List[Dict[str, Any]]:
+        """Load all memories without blocking the event loop (see load_memories)."""
+        return await asyncio.to_thread(self.load_memories)
+    
+    def _read_head_blobs(self, memory_files: List[Path]) -> Dict[Path, bytes]:
+        """
+        Read the contents of memory files that are committed unchanged at HEAD.
+        
+        Blob ids come from one ``git ls-tree`` call and every blob is streamed
+        through a single ``git cat-file --batch`` process, instead of opening
+        each file.
+        
+        Args:
+            memory_files: Paths returned by get_memory_files
+            
+        Returns:
+            Contents by path; files that are untracked, modified in the working
+            tree or unreadable from git are left out (empty outside a checkout)
+        """
+        repo = str(self.repo_path)
+        try:
+            tree = self._git('-C', repo, 'ls-tree', '-r', '-z', 'HEAD')
+            status = self._git('-C', repo, 'status', '--porcelain', '-z', '--untracked-files=no')
+        except (GitCommandError, OSError):
+            return {}
+        
+        # "<mode> blob <sha>\t<path>" entries
+        blob_ids = {}
+        for entry in tree.split('\0'):
+            info, _, path = entry.partition('\t')
+            fields = info.split()
+            if len(fields) == 3 and fields[1] == 'blob':
+                blob_ids[path] = fields[2]
+        # "XY <path>" entries; renames carry their original path as an extra entry
+        for entry in status.split('\0'):
+            blob_ids.pop(entry[3:], None)
+            blob_ids.pop(entry, None)
+        
+        wanted = []
         for file_path in memory_files:
-            try:
-                # Skip dynamic_memory.json as it's handled separately
-                if file_path.name == "dynamic_memory.json":
-                    continue
-                    
-                if file_path.suffix == ".json":
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        data = json.load(f)
-                        if isinstance(data, list):
-                            # Add source information to each memory
-                            for memory in data:
-                                if "source" not in memory:
-                                    memory["source"] = str(file_path.relative_to(self.repo_path))
-                                memories.append(memory)
-                        elif isinstance(data, dict):
-                            if "source" not in data:
-                                data["source"] = str(file_path.relative_to(self.repo_path))
-                            memories.append(data)
-                
-                elif file_path.suffix in [".md", ".txt"]:
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        content = f.read()
-                        memories.append({
-                            "content": content,
-                            "source": str(file_path.relative_to(self.repo_path)),
-                            "file_type": file_path.suffix
-                        })
-                
-            except Exception as e:
-                logger.warning(f"Error loading memory from {file_path}: {e}")
+            sha = blob_ids.get(self._relative_source(file_path).replace(os.sep, '/'))
+            if sha is not None:
+                wanted.append((file_path, sha))
+        if not wanted:
+            return {}
+        
+        try:
+            process = subprocess.run(
+                ['git', '-C', repo, 'cat-file', '--batch'],
+                input=''.join(f"{sha}\n" for _, sha in wanted).encode(),
+                capture_output=True,
+                env=_git_env()
+            )
+        except OSError as e:
+            logger.debug(f"Could not stream memory files from git: {e}")
+            return {}
+        if process.returncode != 0:
+            logger.debug(f"Could not stream memory files from git: {process.stderr.decode(errors='replace')}")
+            return {}
+        
+        # Each object is "<sha> <type> <size>\n<contents>\n" ("<sha> missing\n" if absent)
+        output = process.stdout
+        blobs = {}
+        position = 0
+        for file_path, _ in wanted:
+            header_end = output.index(b"\n", position)
+            fields = output[position:header_end].split()
+            position = header_end + 1
+            if len(fields) != 3:
                 continue
+            size = int(fields[2])
+            blobs[file_path] = output[position:position + size]
+            position += size + 1
+        return blobs
+    
+    def _relative_source(self, file_path: Path) -> str:
+        """
+        Path of a file under repo_path relative to the repository root.
         
-        logger.info(f"Loaded {len(memories)} memories from repository")
+        Slices off the root prefix instead of calling Path.relative_to, which
+        builds and compares path parts for every call.
+        """
+        return str(file_path)[self._root_prefix_len:]
+    
+    def _parse_memory_file(self, file_path: Path, contents: Optional[bytes] = None) -> List[Dict[str, Any]]:
+        """
+        Parse the memories stored in one memory file.
+        
+        Args:
+            file_path: Path of a file returned by get_memory_files
+            contents: The file's contents, if already read (read from disk otherwise)
+            
+        Returns:
+            The file's memories, with their source set to the file's relative path if
+            missing (on an error, the memories parsed before it)
+        """
+        memories = []
+        source = self._relative_source(file_path)
+        try:
+            if file_path.suffix in JSON_MEMORY_SUFFIXES:
+                if contents is None:
+                    data = _read_memory_list(file_path)
+                elif file_path.suffix == ".jsonl":
+                    data = _parse_jsonl(contents)
+                else:
+                    data = orjson.loads(contents)
+                if isinstance(data, list):
+                    # Add source information to each memory
+                    for memory in data:
+                        if "source" not in memory:
+                            memory["source"] = source
+                        memories.append(memory)
+                elif isinstance(data, dict):
+                    if "source" not in data:
+                        data["source"] = source
+                    memories.append(data)
+            
+            elif file_path.suffix in [".md", ".txt"]:
+                if contents is None:
+                    with open(file_path, "r", encoding="utf-8") as f:
+                        content = f.read()
+                else:
+                    # Same newline translation as reading the file in text mode
+                    content = contents.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+                memories.append({
+                    "content": content,
+                    "source": source,
+                    "file_type": file_path.suffix
+                })
+            
+        except Exception as e:
+            logger.warning(f"Error loading memory from {file_path}: {e}")
         return memories
     
     def save_memory(self, memory: Dict[str, Any], filename: Optional[str] = None) -> bool:
@@ -302,6 +670,28 @@ class MemoryRepositoryManager:
         Returns:
             True if successful, False otherwise
         """
+        return self.save_memories([memory], filename)
+    
+    def save_memories(self, memories: List[Dict[str, Any]], filename: Optional[str] = None) -> bool:
+        """
+        Save new memories to the repository.
+        
+        Each save gets its own JSON Lines file (named by the second unless a
+        filename is given), so deleting a memory file never takes unrelated saves
+        with it. Memories are appended to an existing ``.jsonl`` file; a ``.json``
+        file is read and rewritten once for the batch.
+        Nothing is committed; follow with a single commit_and_push for the batch.
+        
+        Args:
+            memories: Memory dictionaries to save
+            filename: Optional filename (auto-generated if not provided)
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        if not memories:
+            return True
+        
         try:
             if not self.repo_path.exists():
                 logger.error("Repository not cloned")
@@ -313,30 +703,49 @@ class MemoryRepositoryManager:
             
             # Generate filename if not provided
             if not filename:
-                from datetime import datetime
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"memory_{timestamp}.json"
+                filename = f"memory_{timestamp}.jsonl"
             
             file_path = memories_dir / filename
             
-            # Load existing memories if file exists
-            existing_memories = []
-            if file_path.exists():
-                with open(file_path, "r", encoding="utf-8") as f:
-                    existing_memories = json.load(f)
-            
-            # Add new memory
-            existing_memories.append(memory)
-            
-            # Save
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(existing_memories, f, indent=2, ensure_ascii=False)
+            # Skip memories whose content is already saved (or repeated in the batch)
+            index = self._current_memory_index()
+            if index is not None:
+                seen = set()
+                new_memories = []
+                for memory in memories:
+                    content = str(memory.get("content", ""))
+                    if content not in seen and not index.contains_content(content):
+                        seen.add(content)
+                        new_memories.append(memory)
+                if len(new_memories) < len(memories):
+                    logger.info(f"Skipped {len(memories) - len(new_memories)} memory(ies) already in the repository")
+                memories = new_memories
+                if not memories:
+                    return True
+            
+            if file_path.suffix == ".jsonl":
+                _append_jsonl(file_path, memories)
+            else:
+                # Load existing memories if file exists
+                existing_memories = []
+                if file_path.exists():
+                    existing_memories = _read_json(file_path)
+                
+                # Add new memories
+                existing_memories.extend(memories)
+                
+                # Save
+                _write_json(file_path, existing_memories)
+            self.invalidate_memories_cache()
+            if index is not None:
+                index.add(self._relative_source(file_path), memories)
             
-            logger.info(f"Memory saved to {file_path}")
+            logger.info(f"{len(memories)} memory(ies) saved to {file_path}")
             return True
             
         except Exception as e:
-            logger.error(f"Error saving memory: {e}")
+            logger.error(f"Error saving memories: {e}")
             return False
     
     def commit_and_push(self, message: str = "Update memories") -> bool:
@@ -351,26 +760,33 @@ class MemoryRepositoryManager:
         """
         try:
             if not self.repo:
+                # Every git call this handle makes, including the push, never prompts
                 self.repo = Repo(self.repo_path)
+                self.repo.git.update_environment(GIT_TERMINAL_PROMPT='0', GIT_ASKPASS='echo')
             
             # Add all changes
             self.repo.git.add(A=True)
             
-            # Check if there are changes
-            if not self.repo.is_dirty() and not self.repo.untracked_files:
+            # Check if there are changes (one status call covers staged, modified and untracked files)
+            if not self.repo.git.status('--porcelain', '-z'):
                 logger.info("No changes to commit")
                 return True
             
             # Commit with timestamp
-            from datetime import datetime
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             full_message = f"{message}\n\nTimestamp: {timestamp}"
             
-            self.repo.index.commit(full_message)
+            commit = self.repo.index.commit(full_message)
+            # The memory index already reflects the committed files
+            if (
+                self._memory_index is not None and commit.parents
+                and self._memory_index.fingerprint() == commit.parents[0].hexsha
+            ):
+                self._memory_index.set_fingerprint(commit.hexsha)
             
             # Push to remote
             origin = self.repo.remotes.origin
-            origin.push()
+            self._retry(origin.push)
             
             logger.info(f"Changes committed and pushed successfully: {message[:50]}")
             return True
@@ -379,6 +795,10 @@ class MemoryRepositoryManager:
             logger.error(f"Error committing/pushing: {e}")
             return False
     
+    async def acommit_and_push(self, message: str = "Update memories") -> bool:
+        """Commit and push changes without blocking the event loop (see commit_and_push)."""
+        return await asyncio.to_thread(self.commit_and_push, message)
+    
     def delete_memory_file(self, source: str) -> bool:
         """
         Delete a memory file from the repository.
@@ -402,6 +822,9 @@ class MemoryRepositoryManager:
             
             # Delete the file
             file_path.unlink()
+            self.invalidate_memories_cache()
+            if self._memory_index is not None:
+                self._memory_index.replace(source, [])
             logger.info(f"Deleted memory file: {source}")
             return True
             
@@ -409,9 +832,63 @@ class MemoryRepositoryManager:
             logger.error(f"Error deleting memory file: {e}")
             return False
     
+    def load_memory_file(self, source: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Load the list of memories stored in a JSON or JSON Lines memory file.
+        
+        Args:
+            source: Source path of the memory file (relative to repo root)
+            
+        Returns:
+            List of memory dictionaries, or None if the file is missing or not a JSON list
+        """
+        file_path = self.repo_path / source
+        if not file_path.exists() or file_path.suffix not in JSON_MEMORY_SUFFIXES:
+            return None
+        
+        try:
+            memories = _read_memory_list(file_path)
+        except Exception as e:
+            logger.warning(f"Error loading memory file {source}: {e}")
+            return None
+        
+        if not isinstance(memories, list):
+            return None
+        return memories
+    
+    def write_memory_file(self, source: str, memories: List[Dict[str, Any]]) -> bool:
+        """
+        Write a list of memories back to a JSON or JSON Lines memory file, deleting the file if the list is empty.
+        
+        Args:
+            source: Source path of the memory file (relative to repo root)
+            memories: Memories to store
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            file_path = self.repo_path / source
+            self.invalidate_memories_cache()
+            
+            if not memories:
+                file_path.unlink()
+                logger.info(f"Deleted empty memory file: {source}")
+            else:
+                _write_memory_list(file_path, memories)
+                logger.info(f"Saved {len(memories)} memory(ies) to {source}")
+            
+            if self._memory_index is not None:
+                self._memory_index.replace(source, memories)
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error writing memory file {source}: {e}")
+            return False
+    
     def delete_memory_from_file(self, source: str, memory_id: Optional[str] = None) -> bool:
         """
-        Delete a specific memory from a JSON file, or delete the entire file if it's the only memory.
+        Delete a specific memory from a JSON or JSON Lines file, or delete the entire file if it's the only memory.
         
         Args:
             source: Source path of the memory file
@@ -427,13 +904,22 @@ class MemoryRepositoryManager:
             
             file_path = self.repo_path / source
             
-            if not file_path.exists() or file_path.suffix != ".json":
+            if not file_path.exists() or file_path.suffix not in JSON_MEMORY_SUFFIXES:
                 logger.warning(f"Memory file not found or not JSON: {source}")
                 return False
             
+            raw = file_path.read_bytes()
+            if memory_id:
+                # Skip parsing files that cannot contain the id. Only ids that JSON
+                # writes verbatim (plain ASCII, nothing escaped) can be searched for
+                # as raw bytes.
+                needle = memory_id.encode("utf-8")
+                if memory_id.isascii() and orjson.dumps(memory_id)[1:-1] == needle and needle not in raw:
+                    logger.info(f"No matching memories found to delete in {source}")
+                    return False
+            
             # Load existing memories
-            with open(file_path, "r", encoding="utf-8") as f:
-                memories = json.load(f)
+            memories = _parse_jsonl(raw) if file_path.suffix == ".jsonl" else orjson.loads(raw)
             
             if not isinstance(memories, list):
                 logger.warning(f"Memory file does not contain a list: {source}")
@@ -457,15 +943,17 @@ class MemoryRepositoryManager:
                 logger.info(f"No matching memories found to delete in {source}")
                 return False
             
+            self.invalidate_memories_cache()
             # Save updated memories or delete file if empty
             if len(memories) == 0:
                 file_path.unlink()
                 logger.info(f"Deleted empty memory file: {source}")
             else:
-                with open(file_path, "w", encoding="utf-8") as f:
-                    json.dump(memories, f, indent=2, ensure_ascii=False)
+                _write_memory_list(file_path, memories)
                 logger.info(f"Removed {removed_count} memory(ies) from {source}")
             
+            if self._memory_index is not None:
+                self._memory_index.replace(source, memories)
             return True
             
         except Exception as e:
@@ -0,0 +1,185 @@
+"""
+Semantic Answer Cache
+
+Stores answered questions in a small vector collection so that a repeated
+or near-identical question from the same user can be answered without
+running memory analysis, search or the agent again.
+"""
+
+import re
+import time
+import uuid
+import logging
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+import orjson
+from langchain_core.embeddings import Embeddings
+
+from assistant.memory.memory_store import SimpleKeywordEmbeddings
+
+# Try to use langchain-chroma if available, otherwise fall back to langchain_community
+try:
+    from langchain_chroma import Chroma
+except ImportError:
+    from langchain_community.vectorstores import Chroma
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def normalize_question(question: str) -> str:
+    """Lowercased words of a question, ignoring punctuation and spacing."""
+    return " ".join(_WORD_RE.findall(question.lower()))
+
+
+class SemanticCache:
+    """Caches question -> result pairs keyed by question embedding."""
+    
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        persist_directory: str,
+        threshold: float = 0.97,
+        ttl: float = 86400.0,
+        search_ttl: float = 3600.0,
+        exact_match: Optional[bool] = None
+    ):
+        """
+        Initialize the semantic cache.
+        
+        Args:
+            embeddings: Embedding model (shared with the memory store)
+            persist_directory: Directory to persist the cache collection
+            threshold: Minimum cosine similarity for a cached answer to be reused
+            ttl: Seconds before any cached answer expires
+            search_ttl: Seconds before answers that used web search expire
+            exact_match: Only reuse answers to the same normalized question text.
+                Defaults to True for keyword embeddings, which give reordered or
+                negated questions with the same words near-identical vectors.
+        """
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.ttl = ttl
+        self.search_ttl = search_ttl
+        if exact_match is None:
+            exact_match = isinstance(getattr(embeddings, "inner", embeddings), SimpleKeywordEmbeddings)
+        self.exact_match = exact_match
+        self.store = Chroma(
+            persist_directory=str(Path(persist_directory)),
+            embedding_function=embeddings,
+            collection_name="answer_cache",
+            collection_metadata={"hnsw:space": "cosine"}
+        )
+    
+    def embed(self, question: str) -> Optional[List[float]]:
+        """Embed a question, returning None if it has no usable embedding."""
+        try:
+            embedding = self.embeddings.embed_query(question)
+        except Exception as e:
+            logger.warning(f"Failed to embed question for semantic cache: {e}")
+            return None
+        if not any(embedding):
+            return None
+        return embedding
+    
+    def lookup(
+        self,
+        question: str,
+        embedding: Optional[List[float]] = None,
+        user: str = ""
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find a cached result for a question.
+        
+        Args:
+            question: User's question
+            embedding: Precomputed question embedding (computed if not given)
+            user: User identifier; only answers cached for the same user are reused
+        
+        Returns:
+            The cached result dictionary, or None on a miss
+        """
+        if embedding is None:
+            embedding = self.embed(question)
+        if embedding is None or not any(embedding):
+            return None
+        
+        conditions = [{"user": user}]
+        if self.exact_match:
+            conditions.append({"normalized": normalize_question(question)})
+        where = conditions[0] if len(conditions) == 1 else {"$and": conditions}
+        
+        try:
+            matches = self.store.similarity_search_by_vector_with_relevance_scores(embedding, k=1, filter=where)
+        except Exception as e:
+            logger.warning(f"Semantic cache lookup failed: {e}")
+            return None
+        if not matches:
+            return None
+        
+        doc, distance = matches[0]
+        similarity = 1.0 - distance
+        if similarity < self.threshold and not self.exact_match:
+            return None
+        
+        metadata = doc.metadata
+        # Answers built from web results go stale sooner than the rest
+        ttl = self.search_ttl if metadata.get("search_used") else self.ttl
+        if time.time() - metadata.get("cached_at", 0) > ttl:
+            self.store.delete(ids=[metadata["cache_id"]])
+            return None
+        
+        logger.info(f"Semantic cache hit (similarity {similarity:.3f}) for: {question[:50]}")
+        return orjson.loads(metadata["result"])
+    
+    def insert(
+        self,
+        question: str,
+        result: Dict[str, Any],
+        embedding: Optional[List[float]] = None,
+        user: str = ""
+    ) -> None:
+        """
+        Cache the result for a question.
+        
+        Args:
+            question: User's question
+            result: Result dictionary returned by the orchestrator
+            embedding: Precomputed question embedding (computed if not given)
+            user: User identifier the answer was built for
+        """
+        if embedding is None:
+            embedding = self.embed(question)
+        if embedding is None or not any(embedding):
+            return
+        
+        cache_id = uuid.uuid4().hex
+        try:
+            self.store._collection.upsert(
+                ids=[cache_id],
+                embeddings=[embedding],
+                documents=[question],
+                metadatas=[{
+                    "cache_id": cache_id,
+                    "user": user,
+                    "normalized": normalize_question(question),
+                    "result": orjson.dumps(result).decode(),
+                    "search_used": bool(result.get("search_used")),
+                    "cached_at": time.time()
+                }]
+            )
+        except Exception as e:
+            logger.warning(f"Failed to cache answer: {e}")
+    
+    def clear(self) -> None:
+        """Drop every cached answer (the memories they were built from have changed)."""
+        try:
+            ids = self.store._collection.get(include=[])["ids"]
+            if ids:
+                self.store._collection.delete(ids=ids)
+        except Exception as e:
+            logger.warning(f"Failed to clear semantic cache: {e}")
+            return
+        logger.debug(f"Cleared {len(ids)} cached answer(s)")
@@ -0,0 +1,106 @@
+"""
+Similarity Cache
+
+Remembers recent memory searches by query embedding. A new query whose
+embedding is close enough to a cached one reuses that search's results
+instead of querying the vector store again (a similarity-keyed LRU).
+"""
+
+import threading
+from typing import Any, List, Optional
+
+import numpy as np
+
+
+class SimilarityCache:
+    """LRU cache of search results keyed by (approximately) the query embedding."""
+    
+    def __init__(self, capacity: int = 256, tau: float = 0.92):
+        """
+        Initialize the similarity cache.
+        
+        Args:
+            capacity: Maximum number of cached searches
+            tau: Minimum cosine similarity for a cached search to be reused
+        """
+        self.capacity = capacity
+        self.tau = tau
+        self._lock = threading.Lock()
+        self.clear()
+    
+    def clear(self) -> None:
+        """Drop every cached search (e.g. after the underlying store changed)."""
+        with self._lock:
+            # Unit-normalized query embeddings, one row per slot (allocated on first insert)
+            self._keys: Optional[np.ndarray] = None
+            self._values: List[Optional[List[Any]]] = [None] * self.capacity
+            self._k = np.zeros(self.capacity, dtype=np.int64)
+            # Last-use tick per slot; 0 marks an empty slot
+            self._used = np.zeros(self.capacity, dtype=np.int64)
+            self._tick = 0
+    
+    def lookup(self, embedding: List[float], k: int) -> Optional[List[Any]]:
+        """
+        Find cached results for a query embedding.
+        
+        Args:
+            embedding: Query embedding
+            k: Number of results wanted
+        
+        Returns:
+            The first k cached results, or None on a miss
+        """
+        query = self._normalize(embedding)
+        if query is None:
+            return None
+        
+        with self._lock:
+            if self._keys is None or self._keys.shape[1] != query.shape[0]:
+                return None
+            
+            # Cosine similarity with every cached query in one matrix-vector product;
+            # empty slots and searches that returned fewer than k results never match
+            sims = self._keys @ query
+            sims[(self._used == 0) | (self._k < k)] = -np.inf
+            best = int(np.argmax(sims))
+            if sims[best] < self.tau:
+                return None
+            
+            self._tick += 1
+            self._used[best] = self._tick
+            return self._values[best][:k]
+    
+    def insert(self, embedding: List[float], k: int, results: List[Any]) -> None:
+        """
+        Cache the results of a search.
+        
+        Args:
+            embedding: Query embedding
+            k: Number of results the search asked for
+            results: Search results
+        """
+        query = self._normalize(embedding)
+        if query is None:
+            return
+        
+        with self._lock:
+            if self._keys is None or self._keys.shape[1] != query.shape[0]:
+                self._keys = np.zeros((self.capacity, query.shape[0]), dtype=np.float32)
+                self._used[:] = 0
+            
+            # Fill an empty slot, or evict the least recently used one
+            slot = int(np.argmin(self._used))
+            self._tick += 1
+            self._keys[slot] = query
+            self._values[slot] = list(results)
+            self._k[slot] = k
+            self._used[slot] = self._tick
+    
+    @staticmethod
+    def _normalize(embedding: List[float]) -> Optional[np.ndarray]:
+        """Return the embedding scaled to unit length, or None if it is all zeros."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if not norm:
+            return None
+        return vector / norm
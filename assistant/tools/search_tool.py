@@ -5,9 +5,12 @@ Uses LLM to determine if search is needed, then performs search if necessary.
 """
 
 import os
+import httpx
 import requests
 import json
+import hashlib
 import logging
+from collections import OrderedDict
 from typing import List, Dict, Any, Optional, Tuple
 from langchain_core.tools import BaseTool
 from pydantic import BaseModel, Field
@@ -16,6 +19,8 @@ from assistant.core.llm_provider import LLMProviderManager
 
 logger = logging.getLogger(__name__)
 
+SEARCH_ENDPOINT = "https://www.googleapis.com/customsearch/v1"
+
 
 class SearchInput(BaseModel):
     """Input schema for search tool."""
@@ -43,53 +48,81 @@ class GoogleSearchTool(BaseTool):
         """
         super().__init__(api_key=api_key, cse_id=cse_id)
     
+    def _params(self, query: str) -> Dict[str, Any]:
+        """Build the Custom Search request parameters."""
+        return {
+            "key": self.api_key,
+            "cx": self.cse_id,
+            "q": query,
+            "num": 5  # Get top 5 results
+        }
+    
     def _run(self, query: str) -> str:
         """Execute the search."""
         try:
-            endpoint = "https://www.googleapis.com/customsearch/v1"
-            params = {
-                "key": self.api_key,
-                "cx": self.cse_id,
-                "q": query,
-                "num": 5  # Get top 5 results
-            }
-            
-            response = requests.get(endpoint, params=params, timeout=10)
+            response = requests.get(SEARCH_ENDPOINT, params=self._params(query), timeout=10)
             
             if response.status_code != 200:
                 return f"Search failed with status {response.status_code}: {response.text}"
             
-            data = response.json()
-            results = []
+            return self._format_results(response.json())
             
-            if "items" in data:
-                for item in data["items"]:
-                    results.append({
-                        "title": item.get("title", ""),
-                        "link": item.get("link", ""),
-                        "snippet": item.get("snippet", "")
-                    })
-            
-            if not results:
-                return "No search results found."
+        except Exception as e:
+            logger.error(f"Error performing search: {e}")
+            return f"Error performing search: {str(e)}"
+    
+    async def _arun(self, query: str) -> str:
+        """Execute the search without blocking the event loop.
+        
+        Used when the agent runs asynchronously, so the HTTP round-trip
+        overlaps with other tool calls and model work instead of holding a
+        worker thread.
+        """
+        try:
+            async with httpx.AsyncClient(timeout=10) as client:
+                response = await client.get(SEARCH_ENDPOINT, params=self._params(query))
             
-            # Format results
-            formatted = "**Search Results:**\n\n"
-            for i, result in enumerate(results, 1):
-                formatted += f"{i}. **{result['title']}**\n"
-                formatted += f"   URL: {result['link']}\n"
-                formatted += f"   {result['snippet']}\n\n"
+            if response.status_code != 200:
+                return f"Search failed with status {response.status_code}: {response.text}"
             
-            return formatted
+            return self._format_results(response.json())
             
         except Exception as e:
             logger.error(f"Error performing search: {e}")
             return f"Error performing search: {str(e)}"
+    
+    @staticmethod
+    def _format_results(data: Dict[str, Any]) -> str:
+        """Format a Custom Search API response as markdown."""
+        results = []
+        
+        if "items" in data:
+            for item in data["items"]:
+                results.append({
+                    "title": item.get("title", ""),
+                    "link": item.get("link", ""),
+                    "snippet": item.get("snippet", "")
+                })
+        
+        if not results:
+            return "No search results found."
+        
+        # Format results
+        formatted = "**Search Results:**\n\n"
+        for i, result in enumerate(results, 1):
+            formatted += f"{i}. **{result['title']}**\n"
+            formatted += f"   URL: {result['link']}\n"
+            formatted += f"   {result['snippet']}\n\n"
+        
+        return formatted
 
 
 class SearchDecisionMaker:
     """Uses LLM to determine if a search is needed."""
     
+    # Maximum number of remembered decisions
+    CACHE_SIZE = 1024
+    
     def __init__(self, llm_manager: LLMProviderManager):
         """
         Initialize search decision maker.
@@ -98,11 +131,15 @@ class SearchDecisionMaker:
             llm_manager: LLM provider manager
         """
         self.llm_manager = llm_manager
+        self._decision_cache: "OrderedDict[bytes, Tuple[bool, Optional[str]]]" = OrderedDict()
     
     def should_search(self, question: str, context: Optional[str] = None) -> Tuple[bool, Optional[str]]:
         """
         Determine if a search is needed for the question.
         
+        Decisions are memoized per (question, context); the context carries the
+        user's memories, so a change in memories produces a new decision.
+        
         Args:
             question: User's question
             context: Additional context (e.g., memories)
@@ -110,6 +147,25 @@ class SearchDecisionMaker:
         Returns:
             Tuple of (should_search: bool, search_query: Optional[str])
         """
+        key = hashlib.blake2b(
+            f"{question}\0{context or ''}".encode("utf-8"), digest_size=16
+        ).digest()
+        cached = self._decision_cache.get(key)
+        if cached is not None:
+            self._decision_cache.move_to_end(key)
+            logger.debug("Reusing cached search decision")
+            return cached
+        
+        decision = self._decide(question, context)
+        if decision is not None:
+            self._decision_cache[key] = decision
+            if len(self._decision_cache) > self.CACHE_SIZE:
+                self._decision_cache.popitem(last=False)
+            return decision
+        return False, None
+    
+    def _decide(self, question: str, context: Optional[str]) -> Optional[Tuple[bool, Optional[str]]]:
+        """Run the search decision; returns None if the LLM call or parsing failed."""
         # Check if question is about GitHub repositories - should use GitHub tool, not search
         question_lower = question.lower()
         if any(keyword in question_lower for keyword in ["github repo", "github repository", "my repos", "my repositories", "check repos", "list repos"]):
@@ -190,5 +246,5 @@ Respond with JSON:
             
         except Exception as e:
             logger.error(f"Error determining search need: {e}")
-            return False, None
+            return None
 
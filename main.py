@@ -9,6 +9,7 @@ and sends a message to Feishu via webhook.
 
 import os
 import sys
+import asyncio
 import argparse
 import requests
 import json
@@ -16,7 +17,7 @@ import logging
 from datetime import datetime
 from typing import Dict, Any
 
-from assistant.core.config import Config
+from assistant.core.config import get_config
 from assistant.core.orchestrator import PersonalAssistantOrchestrator
 
 # Configure logging
@@ -90,6 +91,29 @@ def send_to_feishu(webhook_url: str, title: str, timestamp: str, text: str) -> b
         return False
 
 
+async def stream_answer(orchestrator: PersonalAssistantOrchestrator, question: str, user: str, time: str) -> Dict[str, Any]:
+    """
+    Process a question, printing the answer as it streams in.
+    
+    Args:
+        orchestrator: The assistant orchestrator
+        question: Question content
+        user: Feishu user
+        time: Time of the question
+        
+    Returns:
+        The orchestrator's result dictionary
+    """
+    result: Dict[str, Any] = {}
+    async for event in orchestrator.astream_question(question=question, user=user, time=time):
+        if event["type"] == "chunk":
+            print(event["content"], end="", flush=True)
+        else:
+            result = event["result"]
+    print()
+    return result
+
+
 def main():
     """Main entry point for the Feishu Assistant Processor."""
     parser = argparse.ArgumentParser(description="Feishu Assistant Processor")
@@ -122,7 +146,7 @@ def main():
     
     # Initialize configuration
     logger.info("Initializing configuration...")
-    config = Config()
+    config = get_config()
     
     # Validate configuration
     validation = config.validate()
@@ -143,13 +167,14 @@ def main():
         logger.info("Initializing Personal Assistant Orchestrator...")
         orchestrator = PersonalAssistantOrchestrator(config)
         
-        # Process the question
+        # Process the question, echoing the answer to the log output as it is generated
         logger.info(f"Processing question from {args.user}...")
-        result = orchestrator.process_question(
+        result = asyncio.run(stream_answer(
+            orchestrator,
             question=question,
             user=args.user,
             time=args.time
-        )
+        ))
         
         # Prepare message content
         # Only include the answer, no metadata
@@ -18,9 +18,9 @@ from pathlib import Path
 from typing import List, Dict, Any, Tuple
 from datetime import datetime
 
-from assistant.core.config import Config
+from assistant.core.config import Config, get_config
 from assistant.core.llm_provider import LLMProviderManager
-from assistant.memory.repository_manager import MemoryRepositoryManager
+from assistant.memory.repository_manager import MemoryRepositoryManager, JSON_MEMORY_SUFFIXES
 
 # Configure logging
 logging.basicConfig(
@@ -101,6 +101,8 @@ class MemoryMaintainer:
         )
         self.repo_path = Path(config.memory_repo_path)
         self.dynamic_memory_file = self.repo_path / "dynamic_memory.json"
+        # Memories of each loaded memory file, in file order (see remove_memories)
+        self._file_memories: Dict[str, List[Dict[str, Any]]] = {}
     
     def load_all_memories(self) -> List[Dict[str, Any]]:
         """Load all memories from the repository."""
@@ -116,20 +118,25 @@ class MemoryMaintainer:
             logger.warning(f"Memories directory not found: {memories_dir}")
             return memories
         
-        # Load all JSON memory files
-        for memory_file in memories_dir.glob("memory_*.json"):
+        # Load all JSON and JSON Lines memory files
+        self._file_memories = {}
+        for memory_file in memories_dir.glob("memory_*.json*"):
+            if memory_file.suffix not in JSON_MEMORY_SUFFIXES:
+                continue
             try:
                 with open(memory_file, 'r', encoding='utf-8') as f:
-                    memory_data = json.load(f)
-                    # Add file path for tracking
+                    if memory_file.suffix == ".jsonl":
+                        memory_data = [json.loads(line) for line in f if line.strip()]
+                    else:
+                        memory_data = json.load(f)
                     if isinstance(memory_data, dict):
-                        memory_data['_file_path'] = str(memory_file)
-                        memories.append(memory_data)
-                    elif isinstance(memory_data, list):
-                        for item in memory_data:
-                            if isinstance(item, dict):
-                                item['_file_path'] = str(memory_file)
-                                memories.append(item)
+                        memory_data = [memory_data]
+                    # Add file path for tracking
+                    file_memories = [item for item in memory_data if isinstance(item, dict)]
+                    for item in file_memories:
+                        item['_file_path'] = str(memory_file)
+                    self._file_memories[str(memory_file)] = file_memories
+                    memories.extend(file_memories)
             except Exception as e:
                 logger.error(f"Error loading memory file {memory_file}: {e}")
         
@@ -340,21 +347,38 @@ Provide a comprehensive, integrated summary that:
         else:
             return new_info
     
-    def delete_memory_files(self, memory_files: List[str]) -> None:
+    def remove_memories(self, memories: List[Dict[str, Any]]) -> int:
         """
-        Delete memory files from repository.
+        Remove memories from their files, keeping every other memory in those files.
+        
+        Files left without memories are deleted.
         
         Args:
-            memory_files: List of file paths to delete
+            memories: Memories returned by load_all_memories
+            
+        Returns:
+            Number of memory files deleted
         """
-        for file_path in memory_files:
-            try:
-                path = Path(file_path)
-                if path.exists():
-                    path.unlink()
-                    logger.info(f"Deleted memory file: {path.name}")
-            except Exception as e:
-                logger.error(f"Error deleting memory file {file_path}: {e}")
+        removed_by_file: Dict[str, set] = {}
+        for memory in memories:
+            if memory.get("_file_path"):
+                removed_by_file.setdefault(memory["_file_path"], set()).add(id(memory))
+        
+        deleted_files = 0
+        for file_path, removed in removed_by_file.items():
+            remaining = [
+                {key: value for key, value in memory.items() if key != "_file_path"}
+                for memory in self._file_memories.get(file_path, [])
+                if id(memory) not in removed
+            ]
+            source = str(Path(file_path).relative_to(self.repo_path))
+            if self.repo_manager.write_memory_file(source, remaining):
+                if not remaining:
+                    deleted_files += 1
+                logger.info(f"Removed {len(removed)} memory(ies) from {Path(file_path).name}")
+            else:
+                logger.error(f"Error removing memories from {file_path}")
+        return deleted_files
     
     def maintain_memories(self) -> Dict[str, Any]:
         """
@@ -396,6 +420,7 @@ Provide a comprehensive, integrated summary that:
         logger.info(f"Categorized: {len(solid_instructions)} solid instructions, {len(simple_talks)} simple talks")
         
         # Integrate simple talks into dynamic memory
+        deleted_files = 0
         if simple_talks:
             logger.info("Integrating simple talks into dynamic memory...")
             integrated_info = self.integrate_simple_talks(simple_talks)
@@ -413,17 +438,15 @@ Provide a comprehensive, integrated summary that:
             
             self.save_dynamic_memory(dynamic_memory)
             
-            # Get unique file paths to delete
-            files_to_delete = list(set(memory.get("_file_path", "") for memory in simple_talks if memory.get("_file_path")))
-            
-            # Delete simple talk memory files
-            if files_to_delete:
-                logger.info(f"Deleting {len(files_to_delete)} simple talk memory files...")
-                self.delete_memory_files(files_to_delete)
+            # Remove the simple talks from their files (a file also holding solid
+            # instructions keeps them)
+            if any(memory.get("_file_path") for memory in simple_talks):
+                logger.info(f"Removing {len(simple_talks)} simple talk memories...")
+                deleted_files = self.remove_memories(simple_talks)
                 
                 # Commit and push changes
                 try:
-                    commit_message = f"Memory maintenance: Integrated {len(simple_talks)} simple talks into dynamic memory, deleted {len(files_to_delete)} files"
+                    commit_message = f"Memory maintenance: Integrated {len(simple_talks)} simple talks into dynamic memory, deleted {deleted_files} files"
                     self.repo_manager.commit_and_push(commit_message)
                     logger.info("Changes committed and pushed to repository")
                 except Exception as e:
@@ -436,7 +459,7 @@ Provide a comprehensive, integrated summary that:
             "total_memories": len(all_memories),
             "solid_instructions": len(solid_instructions),
             "simple_talks": len(simple_talks),
-            "deleted_files": len(set(memory.get("_file_path", "") for memory in simple_talks if memory.get("_file_path"))),
+            "deleted_files": deleted_files,
             "dynamic_memory_updated": len(simple_talks) > 0
         }
         
@@ -450,7 +473,7 @@ def main():
     logger.info("Starting memory maintenance script...")
     
     # Initialize configuration
-    config = Config()
+    config = get_config()
     
     # Validate configuration
     validation = config.validate()
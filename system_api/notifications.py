@@ -1,9 +1,15 @@
 # deepseek_chat/system_api/notifications.py
 import os
+import atexit
 import subprocess
 import platform
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
+# Notification/sound backends can block for hundreds of ms; run them off the request thread
+_NOTIF_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="notifications")
+atexit.register(_NOTIF_POOL.shutdown, wait=False)
+
 def send_notification(title: str, message: str, priority: int = 3) -> bool:
     """Send a system notification with the given title and message.
     
@@ -120,4 +126,16 @@ def play_sound(sound_name: str = "notification") -> bool:
     
     except Exception as e:
         print(f"Error playing sound: {str(e)}")
-        return False
\ No newline at end of file
+        return False
+
+def notify_in_background(title: str, message: str, sound_name: Optional[str] = None) -> None:
+    """Send a notification (and optionally play a sound) without blocking the caller.
+    
+    Args:
+        title: The notification title
+        message: The notification message
+        sound_name: Optional sound to play after the notification
+    """
+    _NOTIF_POOL.submit(send_notification, title, message)
+    if sound_name:
+        _NOTIF_POOL.submit(play_sound, sound_name)
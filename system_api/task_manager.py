@@ -2,6 +2,9 @@
 import streamlit as st
 from typing import Dict, Any, List, Callable, Optional
 import datetime
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import xxhash
 
 class TaskManager:
     """Manages application tasks and UI components for Deepseek Chat."""
@@ -65,25 +68,71 @@ class TaskManager:
         self.ui_components[name](*args, **kwargs)
 
 # Task functions that will be moved from app.py
+def get_deepseek_client():
+    """Return the session's Deepseek client, recreating it if the API key changed."""
+    from api.client import DeepseekClient
+    
+    client = st.session_state.get("deepseek_client")
+    if client is None or client.api_key != st.session_state.api_key:
+        if client is not None:
+            client.close()
+        client = DeepseekClient(api_key=st.session_state.api_key)
+        st.session_state.deepseek_client = client
+    return client
+
+def get_search_client():
+    """Return the session's Google search client, recreating it if credentials changed."""
+    from api.search import GoogleSearchClient
+    
+    client = st.session_state.get("search_client")
+    if (client is None
+            or client.api_key != st.session_state.google_api_key
+            or client.cse_id != st.session_state.google_cse_id):
+        if client is not None:
+            client.close()
+        client = GoogleSearchClient(
+            api_key=st.session_state.google_api_key,
+            cse_id=st.session_state.google_cse_id
+        )
+        st.session_state.search_client = client
+    return client
+
+@st.cache_resource
+def get_memory_manager():
+    """Return the process-wide memory manager."""
+    from memory.manager import MemoryManager
+    return MemoryManager()
+
+@st.cache_resource
+def get_file_handler():
+    """Return the process-wide file upload handler."""
+    from file_handlers.uploader import FileUploadHandler
+    return FileUploadHandler()
+
+@st.cache_resource
+def get_file_creator():
+    """Return the process-wide file creation handler."""
+    from file_handlers.creator import FileCreationHandler
+    return FileCreationHandler()
+
 def initialize_session_state():
     """Initialize all session state variables."""
     if "messages" not in st.session_state:
         st.session_state.messages = []
 
+    # Managers are created once per server process and shared by all sessions
     if "memory_manager" not in st.session_state:
-        from memory.manager import MemoryManager
-        st.session_state.memory_manager = MemoryManager()
+        st.session_state.memory_manager = get_memory_manager()
 
     if "file_handler" not in st.session_state:
-        from file_handlers.uploader import FileUploadHandler
-        st.session_state.file_handler = FileUploadHandler()
+        st.session_state.file_handler = get_file_handler()
 
     if "file_creator" not in st.session_state:
-        from file_handlers.creator import FileCreationHandler
-        st.session_state.file_creator = FileCreationHandler()
+        st.session_state.file_creator = get_file_creator()
 
+    # Uploaded/created files are keyed by a stable id for O(1) removal and stable widget keys
     if "uploaded_files" not in st.session_state:
-        st.session_state.uploaded_files = []
+        st.session_state.uploaded_files = {}
 
     if "current_upload_id" not in st.session_state:
         st.session_state.current_upload_id = None
@@ -107,18 +156,25 @@ def initialize_session_state():
         st.session_state.search_results = None
 
     if "created_files" not in st.session_state:
-        st.session_state.created_files = []
+        st.session_state.created_files = {}
         
     if "welcome_message" not in st.session_state:
-        from api.client import DeepseekClient
-        from utils.helpers import generate_welcome_message
-        client = DeepseekClient(api_key=st.session_state.api_key)
-        st.session_state.welcome_message = generate_welcome_message(st.session_state.memory_manager, client)
+        memories = st.session_state.memory_manager.get_all_memories()
+        st.session_state.welcome_message = _cached_welcome_message(
+            tuple((m["timestamp"], m["content"]) for m in memories),
+            st.session_state.memory_manager,
+            get_deepseek_client()
+        )
+
+@st.cache_data(show_spinner=False, ttl=3600)
+def _cached_welcome_message(memory_signature: tuple, _memory_manager, _client) -> str:
+    """Generate the welcome message once per memory set (and at most hourly for the greeting)."""
+    from utils.helpers import generate_welcome_message
+    return generate_welcome_message(_memory_manager, _client)
 
 def process_user_message(prompt: str, model: str, temperature: float, search_toggle: bool):
     """Process a user message and generate a response."""
-    from api.client import DeepseekClient
-    from api.search import GoogleSearchClient
+    from api.client import get_message_content, prefilter_search_need
     from utils.helpers import create_system_prompt, truncate_messages_to_token_limit
     from utils.parsers import parse_file_creations, extract_response_without_files, check_for_directory_structure
     
@@ -132,58 +188,66 @@ def process_user_message(prompt: str, model: str, temperature: float, search_tog
     memory_prompt = st.session_state.memory_manager.get_memory_prompt()
     
     try:
-        # Initialize Deepseek client
-        client = DeepseekClient(api_key=st.session_state.api_key)
+        # Reuse the session's Deepseek client
+        client = get_deepseek_client()
         
-        # Check if search is needed
-        if search_toggle and st.session_state.google_api_key and st.session_state.google_cse_id:
-            with st.spinner("Evaluating search needs..."):
-                search_needed, search_query = client.detect_search_need(prompt)
-                
-                if search_needed and search_query:
-                    st.info(f"Searching for information on: {search_query}")
-                    
-                    # Perform search
-                    search_client = GoogleSearchClient(
-                        api_key=st.session_state.google_api_key,
-                        cse_id=st.session_state.google_cse_id
-                    )
-                    
-                    search_results = search_client.search(search_query)
-                    formatted_results = search_client.format_search_results(search_results)
-                    
-                    # Add search results to conversation context
-                    st.session_state.messages.append({
-                        "role": "system",
-                        "content": f"[Search Results] {formatted_results}"
-                    })
-                    
-                    # Display search results
-                    st.session_state.search_results = formatted_results
-        
-        # Prepare messages for API call
-        api_messages = []
+        def build_api_messages():
+            # Add system message with memory
+            api_messages = [create_system_prompt(memory_prompt, include_file_creation=True)]
+            
+            # Add truncated chat history to stay within token limits
+            conversation_messages = truncate_messages_to_token_limit(st.session_state.messages, max_tokens=7000)
+            for msg in conversation_messages:
+                if msg["role"] != "system" or msg["content"].startswith("[Search Results]") or msg["content"].startswith("[File Context]"):
+                    api_messages.append(msg)
+            return api_messages
         
-        # Add system message with memory
-        api_messages.append(create_system_prompt(memory_prompt, include_file_creation=True))
+        # Settle obvious cases locally: skip search tooling for clearly non-factual prompts,
+        # force a search for clearly time-sensitive ones
+        search_enabled = bool(search_toggle and st.session_state.google_api_key and st.session_state.google_cse_id)
+        search_hint = prefilter_search_need(prompt) if search_enabled else None
+        if search_hint is False:
+            search_enabled = False
         
-        # Add truncated chat history to stay within token limits
-        conversation_messages = truncate_messages_to_token_limit(st.session_state.messages, max_tokens=7000)
-        for msg in conversation_messages:
-            if msg["role"] != "system" or msg["content"].startswith("[Search Results]") or msg["content"].startswith("[File Context]"):
-                api_messages.append(msg)
-            
         # Call API
-        with st.spinner("Thinking..."):
-            response = client.chat_completion(
-                messages=api_messages,
-                model=model,
-                temperature=temperature,
-                max_tokens=2000
-            )
+        if search_enabled:
+            # One call; the model requests a web search via tool calling only when needed
+            with st.spinner("Thinking..."):
+                response, search_query, formatted_results = client.turn(
+                    build_api_messages(),
+                    search_client=get_search_client(),
+                    model=model,
+                    temperature=temperature,
+                    max_tokens=2000,
+                    on_search=lambda query: st.info(f"Searching for information on: {query}"),
+                    force_search=search_hint is True,
+                    # The system prompt embeds the current time, so it never repeats
+                    cache=False
+                )
+            
+            if formatted_results:
+                # Add search results to conversation context
+                st.session_state.messages.append({
+                    "role": "system",
+                    "content": f"[Search Results] {formatted_results}"
+                })
+                
+                # Display search results
+                st.session_state.search_results = formatted_results
             
-        # Extract assistant's message
-        assistant_message = response.get("choices", [{}])[0].get("message", {}).get("content", "")
+            assistant_message = get_message_content(response)
+            with st.chat_message("assistant"):
+                st.write(assistant_message)
+        else:
+            # Stream tokens to the UI as they arrive
+            with st.chat_message("assistant"):
+                assistant_message = st.write_stream(client.chat_completion_stream(
+                    messages=build_api_messages(),
+                    model=model,
+                    temperature=temperature,
+                    max_tokens=2000,
+                    cache=False
+                ))
         
         # Check for file creation in the response
         files_to_create = parse_file_creations(assistant_message)
@@ -193,12 +257,14 @@ def process_user_message(prompt: str, model: str, temperature: float, search_tog
         if files_to_create or is_project:
             files_list = project_files if is_project else files_to_create
             
-            for file_info in files_list:
-                created_file = st.session_state.file_creator.create_file(
-                    file_info["filename"],
-                    file_info["content"]
-                )
-                st.session_state.created_files.append(created_file)
+            # Writes are IO-bound; create files concurrently (map preserves order)
+            file_creator = st.session_state.file_creator
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                created = list(executor.map(
+                    lambda file_info: file_creator.create_file(file_info["filename"], file_info["content"]),
+                    files_list
+                ))
+            st.session_state.created_files.update((uuid.uuid4().hex, file_info) for file_info in created)
             
             # Create zip if it's a project structure
             if is_project and project_files:
@@ -231,10 +297,8 @@ def process_user_message(prompt: str, model: str, temperature: float, search_tog
 
 def extract_memory_from_conversation(model: str):
     """Extract memory from the current conversation."""
-    from api.client import DeepseekClient
-    
     try:
-        client = DeepseekClient(api_key=st.session_state.api_key)
+        client = get_deepseek_client()
         with st.spinner("Analyzing conversation..."):
             suggested_memory = client.extract_memory(
                 [m for m in st.session_state.messages if m["role"] != "system"],
@@ -253,15 +317,28 @@ def process_file_upload(uploaded_file):
         st.session_state.current_upload_id = None
         return False
         
-    # Generate a unique ID for this upload to track if it's been processed
-    upload_id = f"{uploaded_file.name}_{hash(uploaded_file.getvalue())}"
+    # Generate a unique ID for this upload to track if it's been processed.
+    # Name, size and Streamlit's file_id are cheap to compare; only hash the bytes when they change.
+    sig = st.session_state.get("_last_upload_sig")
+    file_id = getattr(uploaded_file, "file_id", None)
+    if sig and (sig["name"], sig["size"], sig["file_id"]) == (uploaded_file.name, uploaded_file.size, file_id):
+        upload_id = sig["id"]
+    else:
+        digest = xxhash.xxh3_64(uploaded_file.getbuffer()).hexdigest()
+        upload_id = f"{uploaded_file.name}_{digest}"
+        st.session_state._last_upload_sig = {
+            "name": uploaded_file.name,
+            "size": uploaded_file.size,
+            "file_id": file_id,
+            "id": upload_id
+        }
     
     # Only process the file if it hasn't been processed before
     if st.session_state.current_upload_id != upload_id:
         try:
             st.session_state.current_upload_id = upload_id
             file_info = st.session_state.file_handler.save_uploaded_file(uploaded_file)
-            st.session_state.uploaded_files.append(file_info)
+            st.session_state.uploaded_files[uuid.uuid4().hex] = file_info
             
             # Add file context to conversation
             file_context = st.session_state.file_handler.format_file_context(file_info)
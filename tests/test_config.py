@@ -134,3 +134,34 @@ class TestConfig:
                 if var in os.environ:
                     del os.environ[var]
 
+    
+    def test_invalid_provider(self):
+        """Test that an unknown provider is rejected at construction."""
+        os.environ["LLM_PROVIDER"] = "not-a-provider"
+        
+        try:
+            with pytest.raises(ValueError, match="LLM_PROVIDER"):
+                Config()
+        finally:
+            del os.environ["LLM_PROVIDER"]
+    
+    def test_validate_cached(self):
+        """Test that validation is cached until invalidated."""
+        os.environ["LLM_PROVIDER"] = "deepseek"
+        os.environ["DEEPSEEK_API_KEY"] = "test-key"
+        if "FEISHU_WEBHOOK_URL" in os.environ:
+            del os.environ["FEISHU_WEBHOOK_URL"]
+        
+        try:
+            config = Config()
+            validation = config.validate()
+            assert not validation["valid"]
+            assert config.validate() is validation
+            
+            config.feishu_webhook_url = "https://test.url"
+            config.invalidate_validation()
+            assert config.validate()["valid"]
+        finally:
+            for var in ["LLM_PROVIDER", "DEEPSEEK_API_KEY"]:
+                if var in os.environ:
+                    del os.environ[var]
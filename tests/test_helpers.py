@@ -0,0 +1,34 @@
+"""
+Tests for utils/helpers.py functionality.
+"""
+
+from utils.helpers import truncate_messages_to_token_limit
+
+
+class TestTruncateMessages:
+    """Test conversation truncation to a token budget."""
+    
+    def test_under_limit_returns_messages_unchanged(self):
+        """Test that a conversation within the budget is returned as is."""
+        messages = [
+            {"role": "system", "content": "sys"},
+            {"role": "user", "content": "hello"},
+        ]
+        
+        assert truncate_messages_to_token_limit(messages, max_tokens=100) is messages
+    
+    def test_keeps_newest_messages_in_chronological_order(self):
+        """Test that system messages come first and kept messages stay oldest-to-newest."""
+        messages = [
+            {"role": "system", "content": "s" * 40},
+            {"role": "user", "content": "a" * 40},
+            {"role": "assistant", "content": "b" * 40},
+            {"role": "user", "content": "c" * 40},
+            {"role": "assistant", "content": "d" * 40},
+            {"role": "user", "content": "e" * 40},
+        ]
+        
+        # 10 tokens each: system + latest user leave room for two more messages
+        result = truncate_messages_to_token_limit(messages, max_tokens=45)
+        
+        assert [msg["content"][0] for msg in result] == ["s", "c", "d", "e"]
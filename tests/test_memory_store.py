@@ -8,6 +8,10 @@ import shutil
 from pathlib import Path
 from assistant.core.config import Config
 from assistant.memory.memory_store import MemoryStore, SimpleKeywordEmbeddings
+from assistant.memory.semantic_cache import SemanticCache
+from assistant.memory.embedding_cache import CachedEmbeddings
+from assistant.memory.similarity_cache import SimilarityCache
+from assistant.memory.memory_index import MemoryIndex
 
 
 class TestMemoryStore:
@@ -82,7 +86,226 @@ class TestMemoryStore:
         results = store.search_memories("Python programming", k=1)
         # Results might be empty if embeddings fail, but should not raise error
         assert isinstance(results, list)
+    
+    def test_keyword_index_reloaded(self, temp_dir, config):
+        """Test that a new store indexes the memories persisted by an earlier one."""
+        MemoryStore(config, persist_directory=temp_dir).add_memories([
+            {"content": "User prefers Python over Java", "source": "interaction_1"},
+            {"content": "User is working on a robotics project", "source": "interaction_2"}
+        ])
+        
+        store = MemoryStore(config, persist_directory=temp_dir)
+        results = store.search_memories("robotics project", k=1)
+        assert [doc.metadata["source"] for doc in results] == ["interaction_2"]
+    
+    def test_add_memories_skips_stored_chunks(self, temp_dir, config):
+        """Test that re-adding the same memories does not duplicate them."""
+        memories = [{"content": "User prefers Python over Java", "source": "interaction_1"}]
+        MemoryStore(config, persist_directory=temp_dir).add_memories(memories)
+        
+        store = MemoryStore(config, persist_directory=temp_dir)
+        store.add_memories(memories)
+        assert len(store.get_all_memories()) == 1
+    
+    def test_get_all_memories(self, temp_dir, config):
+        """Test listing every stored memory."""
+        store = MemoryStore(config, persist_directory=temp_dir)
+        assert store.get_all_memories() == []
+        
+        store.add_memories([
+            {"content": "User prefers Python over Java", "source": "interaction_1"},
+            {"content": "User is working on a robotics project", "source": "interaction_2"}
+        ])
+        
+        sources = sorted(doc.metadata["source"] for doc in store.get_all_memories())
+        assert sources == ["interaction_1", "interaction_2"]
+    
+    def test_embed_query_cached(self, temp_dir, config):
+        """Test that repeated queries reuse the cached embedding."""
+        store = MemoryStore(config, persist_directory=temp_dir)
+        
+        first = store.embed_query("Python programming")
+        assert store.embed_query("Python programming") is first
+        assert store.embed_query("Java programming") is not first
+
+
+class TestSemanticCache:
+    """Test the semantic answer cache."""
+    
+    @pytest.fixture
+    def temp_dir(self):
+        """Create a temporary directory for testing."""
+        temp_path = tempfile.mkdtemp()
+        yield temp_path
+        shutil.rmtree(temp_path)
+    
+    def test_lookup_hit_and_miss(self, temp_dir):
+        """Test that near-identical questions reuse the cached result."""
+        cache = SemanticCache(SimpleKeywordEmbeddings(), persist_directory=temp_dir)
+        question = "What is my favourite programming language?"
+        
+        assert cache.lookup(question) is None
+        
+        cache.insert(question, {"answer": "Python", "search_used": False})
+        
+        assert cache.lookup("what is my favourite programming language")["answer"] == "Python"
+        assert cache.lookup("How tall is the Eiffel tower?") is None
+    
+    def test_search_results_expire(self, temp_dir):
+        """Test that answers based on web search expire."""
+        cache = SemanticCache(SimpleKeywordEmbeddings(), persist_directory=temp_dir, search_ttl=-1)
+        cache.insert("weather in tokyo today", {"answer": "Sunny", "search_used": True})
+        
+        assert cache.lookup("weather in tokyo today") is None
+    
+    def test_all_results_expire(self, temp_dir):
+        """Test that answers not based on web search expire too."""
+        cache = SemanticCache(SimpleKeywordEmbeddings(), persist_directory=temp_dir, ttl=-1)
+        cache.insert("what time is it", {"answer": "Noon", "search_used": False})
+        
+        assert cache.lookup("what time is it") is None
+    
+    def test_reordered_and_negated_questions_miss(self, temp_dir):
+        """Test that keyword embeddings only reuse answers to the same question text."""
+        cache = SemanticCache(SimpleKeywordEmbeddings(), persist_directory=temp_dir)
+        cache.insert("Is Python faster than Java?", {"answer": "No", "search_used": False})
+        cache.insert("Should I delete the old branch?", {"answer": "Yes", "search_used": False})
+        
+        assert cache.lookup("Is Java faster than Python?") is None
+        assert cache.lookup("Should I not delete the old branch?") is None
+        assert cache.lookup("is python faster than java")["answer"] == "No"
+    
+    def test_results_are_per_user(self, temp_dir):
+        """Test that one user's cached answer is not served to another."""
+        cache = SemanticCache(SimpleKeywordEmbeddings(), persist_directory=temp_dir)
+        cache.insert("What is my name?", {"answer": "Alice", "search_used": False}, user="alice")
+        
+        assert cache.lookup("What is my name?", user="bob") is None
+        assert cache.lookup("What is my name?", user="alice")["answer"] == "Alice"
+    
+    def test_clear(self, temp_dir):
+        """Test that clearing drops every cached answer."""
+        cache = SemanticCache(SimpleKeywordEmbeddings(), persist_directory=temp_dir)
+        cache.insert("What is my name?", {"answer": "Alice", "search_used": False}, user="alice")
+        
+        cache.clear()
+        assert cache.lookup("What is my name?", user="alice") is None
+
 
+class TestCachedEmbeddings:
+    """Test the embedding cache adapter."""
+    
+    class CountingEmbeddings(SimpleKeywordEmbeddings):
+        """Keyword embeddings that count the texts they embed."""
+        
+        def __init__(self):
+            super().__init__()
+            self.embedded = []
+        
+        def embed_documents(self, texts):
+            self.embedded.extend(texts)
+            return super().embed_documents(texts)
+        
+        def embed_query(self, text):
+            self.embedded.append(text)
+            return super().embed_query(text)
+    
+    @pytest.fixture
+    def temp_dir(self):
+        """Create a temporary directory for testing."""
+        temp_path = tempfile.mkdtemp()
+        yield temp_path
+        shutil.rmtree(temp_path)
+    
+    def test_only_uncached_texts_are_embedded(self):
+        """Test that cached texts are not sent to the model again."""
+        inner = self.CountingEmbeddings()
+        embeddings = CachedEmbeddings(inner)
+        
+        first = embeddings.embed_query("Python programming")
+        result = embeddings.embed_documents(["Python programming", "Java programming"])
+        
+        assert result[0] == first
+        assert inner.embedded == ["Python programming", "Java programming"]
+    
+    def test_cache_persists_to_disk(self, temp_dir):
+        """Test that vectors survive a new cache instance on the same file."""
+        cache_path = Path(temp_dir) / "embeddings.sqlite3"
+        first = CachedEmbeddings(self.CountingEmbeddings(), cache_path=cache_path).embed_query("Python")
+        
+        inner = self.CountingEmbeddings()
+        assert CachedEmbeddings(inner, cache_path=cache_path).embed_query("Python") == first
+        assert inner.embedded == []
+    
+    def test_short_model_output_raises(self):
+        """Test that a model returning too few vectors is an error, not None embeddings."""
+        inner = self.CountingEmbeddings()
+        inner.embed_documents = lambda texts: [inner.embed_query(texts[0])]
+        
+        with pytest.raises(ValueError):
+            CachedEmbeddings(inner).embed_documents(["Python", "Java"])
+
+
+class TestSimilarityCache:
+    """Test the similarity-keyed search cache."""
+    
+    def test_similar_query_hits(self):
+        """Test that near-duplicate queries reuse cached results."""
+        cache = SimilarityCache(tau=0.9)
+        cache.insert([1.0, 0.0, 0.0], 5, ["a", "b", "c"])
+        
+        assert cache.lookup([0.99, 0.05, 0.0], 2) == ["a", "b"]
+        assert cache.lookup([0.0, 1.0, 0.0], 2) is None
+        # A search for fewer results cannot answer a larger k
+        assert cache.lookup([1.0, 0.0, 0.0], 10) is None
+    
+    def test_evicts_least_recently_used(self):
+        """Test that the least recently used search is evicted when full."""
+        cache = SimilarityCache(capacity=2, tau=0.99)
+        cache.insert([1.0, 0.0], 1, ["x"])
+        cache.insert([0.0, 1.0], 1, ["y"])
+        cache.lookup([1.0, 0.0], 1)
+        cache.insert([1.0, 1.0], 1, ["z"])
+        
+        assert cache.lookup([1.0, 0.0], 1) == ["x"]
+        assert cache.lookup([0.0, 1.0], 1) is None
+
+
+class TestMemoryIndex:
+    """Test the memory file index."""
+    
+    @pytest.fixture
+    def temp_dir(self):
+        """Create a temporary directory for testing."""
+        temp_path = tempfile.mkdtemp()
+        yield temp_path
+        shutil.rmtree(temp_path)
+    
+    def test_files_for_content_and_source(self, temp_dir):
+        """Test finding the files that hold a memory by content or source."""
+        index = MemoryIndex(Path(temp_dir) / "index.db")
+        index.rebuild("head", [
+            ("memories/a.json", [{"content": "User prefers Python", "source": "interaction_1"}]),
+            ("memories/b.jsonl", [{"content": "User prefers Python", "source": "interaction_2"}])
+        ])
+        
+        assert index.fingerprint() == "head"
+        assert index.files_for("User prefers Python") == ["memories/a.json", "memories/b.jsonl"]
+        assert index.files_for("interaction_2") == ["memories/b.jsonl"]
+        
+        index.replace("memories/a.json", [])
+        assert index.files_for("User prefers Python") == ["memories/b.jsonl"]
+        assert not index.contains_content("User prefers Java")
+    
+    def test_close(self, temp_dir):
+        """Test that a closed index reports itself unavailable."""
+        index = MemoryIndex(Path(temp_dir) / "index.db")
+        index.rebuild("head", [("memories/a.json", [{"content": "User prefers Python"}])])
+        
+        index.close()
+        index.close()
+        assert index.files_for("User prefers Python") is None
+        assert index.fingerprint() is None
 
 class TestSimpleKeywordEmbeddings:
     """Test simple keyword embeddings fallback."""
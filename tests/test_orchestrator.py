@@ -0,0 +1,43 @@
+"""
+Tests for orchestrator memory deletion matching.
+"""
+
+from assistant.core.orchestrator import (
+    DELETE_STOP_WORDS,
+    _MEMORY_REQUEST_RE,
+    _key_terms,
+    _matches_description,
+    _memory_key_terms,
+)
+
+
+class TestDeleteMatching:
+    """Test matching deletion descriptions against memories."""
+    
+    def test_key_terms(self):
+        """Test that key terms are whole lowercased words, keeping version numbers intact."""
+        terms = _key_terms("Any memory asserting PyTorch version 1.13.1, stable") - DELETE_STOP_WORDS
+        assert terms == {"pytorch", "1.13.1"}
+    
+    def test_matches_whole_terms(self):
+        """Test that half of the key terms must appear as whole terms of the memory."""
+        memory_terms = _memory_key_terms({"content": "User runs pytorch-lightning 1.13.1", "source": "interaction_3"})
+        
+        assert _matches_description(frozenset({"pytorch", "1.13.1"}), memory_terms)
+        assert _matches_description(frozenset({"pytorch", "tensorflow"}), memory_terms)
+        assert not _matches_description(frozenset({"pytorch", "tensorflow", "jax"}), memory_terms)
+    
+    def test_substrings_do_not_match(self):
+        """Test that a key term inside a longer word no longer matches."""
+        memory_terms = _memory_key_terms({"content": "User writes pythonic code", "source": ""})
+        assert not _matches_description(frozenset({"python"}), memory_terms)
+
+
+class TestMemoryRequests:
+    """Test recognising questions that ask to change memories."""
+    
+    def test_memory_requests_bypass_cache(self):
+        """Test that remember/forget requests are recognised and ordinary questions are not."""
+        assert _MEMORY_REQUEST_RE.search("Please remember that I use vim")
+        assert _MEMORY_REQUEST_RE.search("Forget my old address")
+        assert not _MEMORY_REQUEST_RE.search("Is Python faster than Java?")
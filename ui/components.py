@@ -1,6 +1,16 @@
 # deepseek_chat/ui/components.py
+import html
+import os
 import streamlit as st
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
+
+CSS_PATH = os.path.join(os.path.dirname(__file__), "style.css")
+
+@st.cache_data(show_spinner=False)
+def load_css() -> str:
+    """Read the app stylesheet once and wrap it in a <style> block."""
+    with open(CSS_PATH, "r", encoding="utf-8") as f:
+        return f"<style>\n{f.read()}</style>"
 
 def render_sidebar():
     """Render the sidebar with settings and memory management."""
@@ -41,7 +51,7 @@ def render_sidebar():
             if not st.session_state.created_files:
                 st.write("No files created yet.")
             else:
-                for i, file_info in enumerate(st.session_state.created_files):
+                for i, file_info in enumerate(st.session_state.created_files.values()):
                     st.write(f"**{i+1}.** {file_info['filename']} ({file_info.get('size', 'N/A')} bytes)")
         
         st.divider()
@@ -85,18 +95,31 @@ def render_memory_management():
         if not all_memories:
             st.write("No memories stored.")
         else:
-            for i, memory in enumerate(all_memories):
+            memory_items = _render_memory_items(
+                tuple((m["content"], m["source"], m["timestamp"]) for m in all_memories)
+            )
+            for i, item_html in enumerate(memory_items):
                 # Use a container with custom styling instead of nested expanders
                 with st.container():
-                    st.markdown(f"<div class='memory-item'>", unsafe_allow_html=True)
-                    st.write(f"**Memory {i+1}:** {memory['content'][:30]}...")
-                    st.write(f"**Content:** {memory['content']}")
-                    st.write(f"**Source:** {memory['source']}")
-                    st.write(f"**Timestamp:** {memory['timestamp']}")
+                    st.markdown(item_html, unsafe_allow_html=True)
                     if st.button(f"Delete Memory #{i+1}", key=f"delete_{i}"):
                         st.session_state.memory_manager.remove_memory(i)
                         st.rerun()
-                    st.markdown("</div>", unsafe_allow_html=True)
+
+@st.cache_data(show_spinner=False)
+def _render_memory_items(memories: Tuple[Tuple[str, str, str], ...]) -> List[str]:
+    """Pre-render each memory as an HTML block; cached on the memory contents."""
+    items = []
+    for i, (content, source, timestamp) in enumerate(memories):
+        items.append(
+            "<div class='memory-item'>"
+            f"<p><b>Memory {i+1}:</b> {html.escape(content[:30])}...</p>"
+            f"<p><b>Content:</b> {html.escape(content)}</p>"
+            f"<p><b>Source:</b> {html.escape(str(source))}</p>"
+            f"<p><b>Timestamp:</b> {html.escape(str(timestamp))}</p>"
+            "</div>"
+        )
+    return items
 
 def render_chat_interface():
     """Render the main chat interface."""
@@ -192,12 +215,12 @@ def render_file_upload():
         
         if st.session_state.uploaded_files:
             with st.expander("Uploaded Files"):
-                for i, file_info in enumerate(st.session_state.uploaded_files):
+                for i, (uid, file_info) in enumerate(st.session_state.uploaded_files.items()):
                     st.write(f"**{i+1}.** {file_info['filename']} ({file_info['type']})")
                     
                     # Add button to remove file
-                    if st.button(f"Remove", key=f"remove_file_{i}"):
-                        st.session_state.uploaded_files.pop(i)
+                    if st.button(f"Remove", key=f"remove_file_{uid}"):
+                        del st.session_state.uploaded_files[uid]
                         st.rerun()
 
 def render_controls():
@@ -212,5 +235,5 @@ def render_controls():
 
     with col_controls2:
         if st.session_state.created_files and st.button("Clear Created Files"):
-            st.session_state.created_files = []
+            st.session_state.created_files = {}
             st.rerun()
@@ -39,54 +39,48 @@ def create_system_prompt(memory_prompt: str = "", include_file_creation: bool =
 
 def truncate_messages_to_token_limit(messages: List[Dict[str, str]], 
                                      max_tokens: int = 7000) -> List[Dict[str, str]]:
-    """Truncate messages to stay within token limits."""
-    system_messages = [msg for msg in messages if msg["role"] == "system"]
-    non_system_messages = [msg for msg in messages if msg["role"] != "system"]
+    """Truncate messages to stay within token limits.
     
-    # Estimate tokens (rough approximation: 4 chars ≈ 1 token)
-    total_chars = sum(len(msg["content"]) for msg in messages)
-    estimated_tokens = total_chars // 4
+    Returns system messages first, then the kept conversation (the newest messages
+    that fit, plus the latest user message) in chronological order.
+    """
+    # Estimate tokens once per message (rough approximation: 4 chars ≈ 1 token).
+    # len() is O(1), so this needs no per-message cache; a cached count stored on
+    # the message dict would also be sent to the API with the message.
+    estimates = [len(msg["content"]) // 4 for msg in messages]
     
-    if estimated_tokens <= max_tokens:
+    if sum(estimates) <= max_tokens:
         return messages
     
-    # Keep system messages and truncate conversation history
-    result = system_messages.copy()
-    
-    # Always keep the latest user message if it exists
-    latest_user_message = None
-    for i in reversed(range(len(non_system_messages))):
-        if non_system_messages[i]["role"] == "user":
-            latest_user_message = non_system_messages.pop(i)
-            break
-            
-    # Add messages until we approach the limit
-    remaining_tokens = max_tokens - (sum(len(msg["content"]) for msg in system_messages) // 4)
-    if latest_user_message:
-        remaining_tokens -= len(latest_user_message["content"]) // 4
-    
-    # Add messages from newest to oldest until we approach the limit
-    for msg in reversed(non_system_messages):
-        msg_tokens = len(msg["content"]) // 4
-        if remaining_tokens - msg_tokens > 0:
-            result.append(msg)
-            remaining_tokens -= msg_tokens
-        else:
+    # Always keep system messages and the latest user message if it exists
+    keep = [msg["role"] == "system" for msg in messages]
+    for i in reversed(range(len(messages))):
+        if messages[i]["role"] == "user":
+            keep[i] = True
             break
     
-    # Add back the latest user message if we had one
-    if latest_user_message:
-        result.append(latest_user_message)
+    remaining_tokens = max_tokens - sum(est for est, kept in zip(estimates, keep, strict=True) if kept)
     
-    # Sort messages to maintain proper conversation flow
-    result.sort(key=lambda msg: 0 if msg["role"] == "system" else 1)
+    # Walk from newest to oldest with a running total until we approach the limit
+    for i in reversed(range(len(messages))):
+        if keep[i]:
+            continue
+        if remaining_tokens - estimates[i] > 0:
+            keep[i] = True
+            remaining_tokens -= estimates[i]
+        else:
+            break
     
-    return result
+    # System messages first, then the kept conversation in its original order
+    system_messages = [msg for msg, kept in zip(messages, keep, strict=True) if kept and msg["role"] == "system"]
+    conversation = [msg for msg, kept in zip(messages, keep, strict=True) if kept and msg["role"] != "system"]
+    return system_messages + conversation
 
 # Add this function after the existing imports
 def generate_welcome_message(memory_manager,client):
     """Generate a welcome message based on memories and current time."""
     import datetime
+    from api.client import get_message_content
     
     current_hour = datetime.datetime.now().hour
     
@@ -125,5 +119,5 @@ def generate_welcome_message(memory_manager,client):
         max_tokens=100
     )
     
-    welcome_message = response.get("choices", [{}])[0].get("message", {}).get("content", "")
+    welcome_message = get_message_content(response)
     return welcome_message or f"{greeting}! How can I assist you today?"